@@ -0,0 +1 @@
+"""py4spice benchmark suite, run with `python -m benchmarks`"""
@@ -0,0 +1,67 @@
+"""Run the benchmarks and compare them with the stored baseline.
+
+python -m benchmarks                  # run all, compare with baseline.json
+python -m benchmarks -k step_info     # only names containing "step_info"
+python -m benchmarks --save           # store the results as the baseline
+python -m benchmarks --rows 1000000   # bigger synthetic data
+"""
+
+import argparse
+import sys
+
+from . import (
+    bench_netlist,
+    bench_results,
+    bench_simulate,
+    bench_step_info,
+    bench_waveforms,
+)
+from .harness import Config, compare, load_baseline, run_all, save_baseline
+
+# importing the modules registers their benchmarks
+BENCH_MODULES = (
+    bench_netlist,
+    bench_results,
+    bench_simulate,
+    bench_step_info,
+    bench_waveforms,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="py4spice benchmarks")
+    parser.add_argument("-k", dest="pattern", default="", help="name filter")
+    parser.add_argument("--rows", type=int, default=Config().rows)
+    parser.add_argument("--cols", type=int, default=Config().cols)
+    parser.add_argument("--table-rows", type=int, default=Config().table_rows)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed slowdown vs baseline before failing (0.5 = 50%%)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=2.0,
+        help="slowdowns below this many ms are noise, never a regression",
+    )
+    args = parser.parse_args()
+
+    config = Config(args.rows, args.cols, args.table_rows)
+    results = run_all(config, args.pattern)
+
+    if args.save:
+        save_baseline(results)
+        return 0
+
+    print()
+    regressions = compare(
+        results, load_baseline(), args.tolerance, args.min_delta / 1e3
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Netlist reading, composition and editing"""
+
+from functools import reduce
+from operator import add
+from pathlib import Path
+
+import py4spice as spi
+
+from .generators import netlist_fragments
+from .harness import Config, benchmark, scratch_dir
+
+FRAGMENTS = 50
+
+
+def fragments(config: Config) -> list[spi.Netlist]:
+    """setup: FRAGMENTS fragments sharing config.table_rows lines"""
+    return netlist_fragments(FRAGMENTS, max(config.table_rows // FRAGMENTS, 1))
+
+
+def fragment_file(config: Config) -> Path:
+    """setup: one netlist file of config.table_rows lines"""
+    filename = scratch_dir("netlist") / "big.cir"
+    (netlist_fragments(1, config.table_rows)[0]).write_to_file(filename)
+    return filename
+
+
+@benchmark("netlist.read_file", fragment_file)
+def read_file(filename: Path) -> None:
+    spi.Netlist(filename)
+
+
+@benchmark("netlist.concatenate", fragments)
+def concatenate(nets: list[spi.Netlist]) -> None:
+    reduce(add, nets)
+
+
+@benchmark("netlist.del_slash", fragments)
+def del_slash(nets: list[spi.Netlist]) -> None:
+    reduce(add, nets).del_slash()
+
+
+@benchmark("netlist.write_file", fragments)
+def write_file(nets: list[spi.Netlist]) -> None:
+    reduce(add, nets).write_to_file(scratch_dir("netlist") / "top.cir")
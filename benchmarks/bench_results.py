@@ -0,0 +1,51 @@
+"""SimResults.from_file for every analysis type"""
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+import py4spice as spi
+
+from .generators import write_table, write_wrdata
+from .harness import Config, benchmark, scratch_dir
+
+PLOT_TYPES: list[spi.AnaType] = ["tran", "ac", "dc", "noise"]
+TABLE_TYPES: list[spi.AnaType] = ["op", "tf", "sens"]
+
+
+def plot_file(analysis_type: spi.AnaType) -> Callable[[Config], Path]:
+    """setup: write a wrdata file of config.rows x config.cols"""
+
+    def setup(config: Config) -> Path:
+        directory = scratch_dir(f"results_{analysis_type}")
+        return write_wrdata(directory, analysis_type, config.rows, config.cols)
+
+    return setup
+
+
+def table_file(analysis_type: spi.AnaType) -> Callable[[Config], Path]:
+    """setup: write a table file of config.table_rows entries"""
+
+    def setup(config: Config) -> Path:
+        directory = scratch_dir(f"results_{analysis_type}")
+        return write_table(directory, analysis_type, config.table_rows)
+
+    return setup
+
+
+def load(analysis_type: spi.AnaType, filename: Path) -> Any:
+    return spi.SimResults.from_file(analysis_type, filename)
+
+
+for _type in PLOT_TYPES:
+    benchmark(f"sim_results.from_file[{_type}]", plot_file(_type))(partial(load, _type))
+
+for _type in TABLE_TYPES:
+    benchmark(f"sim_results.from_file[{_type}]", table_file(_type))(
+        partial(load, _type)
+    )
+
+
+@benchmark("sim_results.table_for_print[op]", table_file("op"), repeat=3)
+def table_for_print(filename: Path) -> None:
+    spi.SimResults.from_file("op", filename).table_for_print()
@@ -0,0 +1,48 @@
+"""End-to-end Simulate throughput against a fake ngspice executable"""
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+from .harness import Config, benchmark, scratch_dir
+
+RUNS = 20  # simulations per timed repeat
+
+
+class SimSetup:
+    """fake executable, netlist and analyses shared by the repeats"""
+
+    def __init__(self, config: Config) -> None:
+        directory = scratch_dir("simulate")
+        self.ngspice_exe = write_fake_ngspice(
+            directory / "ngspice", points=config.rows // 100
+        )
+
+        vectors = spi.Vectors(" ".join(f"v{i}" for i in range(config.cols)))
+        self.analyses = [spi.Analyses("tr1", "tran", "tran 1n 1u", vectors, directory)]
+        control = spi.Control()
+        for analysis in self.analyses:
+            control.insert_lines(analysis.lines_for_cntl())
+
+        self.netlist_filename = directory / "top.cir"
+        netlist = spi.Netlist("* bench\nr1 in out 1k") + spi.Netlist(str(control))
+        netlist.write_to_file(self.netlist_filename)
+        self.transcript = directory / "transcript.log"
+
+    def simulate(self, index: int) -> spi.Simulate:
+        return spi.Simulate(
+            self.ngspice_exe, self.netlist_filename, self.transcript, f"sim{index}"
+        )
+
+
+@benchmark(f"simulate.run[x{RUNS}]", SimSetup, repeat=3)
+def run(setup: SimSetup) -> None:
+    for index in range(RUNS):
+        setup.simulate(index).run()
+
+
+@benchmark(f"simulate.end_to_end[x{RUNS}]", SimSetup, repeat=3)
+def end_to_end(setup: SimSetup) -> None:
+    for index in range(RUNS):
+        setup.simulate(index).run()
+        for analysis in setup.analyses:
+            spi.SimResults.from_file(analysis.cmd_type, analysis.results_filename)
@@ -0,0 +1,49 @@
+"""Every StepInfo measurement on a synthetic second-order step response"""
+
+import numpy as np
+
+import py4spice as spi
+
+from .harness import Config, benchmark
+
+PROPERTIES = [
+    "yinit",
+    "yfinal",
+    "ydelta",
+    "ylo",
+    "ymid",
+    "yhi",
+    "xlo",
+    "xmid",
+    "xhi",
+    "risetime",
+    "peak",
+    "peaktime",
+    "xinit",
+    "settlingtime",
+]
+
+
+def step_info(config: Config) -> spi.StepInfo:
+    """setup: underdamped step at t=1us sampled on non-uniform timesteps"""
+    rng = np.random.default_rng(2)
+    time = np.cumsum(rng.uniform(0.5, 1.5, config.rows))
+    time *= 10e-6 / time[-1]
+    after = np.clip(time - 1e-6, 0, None)
+    wave = 5 * (1 - np.exp(-after / 1e-6) * np.cos(2 * np.pi * after / 2e-6))
+    return spi.StepInfo(time, wave, float(time[0]), float(time[-1]), 10_000)
+
+
+def measure(name: str) -> None:
+    @benchmark(f"step_info.{name}", step_info)
+    def _measure(meas: spi.StepInfo) -> None:
+        getattr(meas, name)
+
+
+for _name in PROPERTIES:
+    measure(_name)
+
+
+@benchmark("step_info.y_at_x", step_info)
+def y_at_x(meas: spi.StepInfo) -> None:
+    meas.y_at_x(5e-6)
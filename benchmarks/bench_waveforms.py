@@ -0,0 +1,42 @@
+"""Waveforms construction, x_range and vec_subset"""
+
+import copy
+
+import py4spice as spi
+
+from .bench_results import plot_file
+from .generators import vector_names
+from .harness import Config, benchmark
+
+
+def tran_results(config: Config) -> spi.SimResults:
+    """setup: transient results of config.rows x config.cols"""
+    return spi.SimResults.from_file("tran", plot_file("tran")(config))
+
+
+def tran_waveforms(config: Config) -> spi.Waveforms:
+    """setup: Waveforms of the transient results"""
+    results = tran_results(config)
+    return spi.Waveforms(results.header, results.data_plot)
+
+
+@benchmark("waveforms.init[npts=1000]", tran_results)
+def init_default(results: spi.SimResults) -> None:
+    spi.Waveforms(results.header, results.data_plot)
+
+
+@benchmark("waveforms.init[npts=rows]", tran_results)
+def init_full(results: spi.SimResults) -> None:
+    spi.Waveforms(results.header, results.data_plot, npts=results.data_plot.shape[0])
+
+
+@benchmark("waveforms.x_range", tran_waveforms)
+def x_range(waves: spi.Waveforms) -> None:
+    begin, end = waves.data[0, 0], waves.data[-1, 0]
+    copy.deepcopy(waves).x_range(begin + (end - begin) / 4, end - (end - begin) / 4)
+
+
+@benchmark("waveforms.vec_subset", tran_waveforms)
+def vec_subset(waves: spi.Waveforms) -> None:
+    keep = vector_names(len(waves.header) - 1)[::2]
+    copy.deepcopy(waves).vec_subset(keep)
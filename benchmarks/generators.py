@@ -0,0 +1,81 @@
+"""Synthetic ngspice result files and netlists for benchmarks"""
+
+import io
+from pathlib import Path
+
+import numpy as np
+
+import py4spice as spi
+
+# x-axis column name ngspice writes for each analysis type
+X_NAMES: dict[str, str] = {
+    "tran": "time",
+    "ac": "frequency",
+    "noise": "frequency",
+    "dc": "v-sweep",
+}
+
+
+def vector_names(cols: int) -> list[str]:
+    """names for synthetic vectors"""
+    return [f"v{i}" for i in range(cols)]
+
+
+def wrdata_text(analysis_type: str, rows: int, cols: int, seed: int = 0) -> str:
+    """Text the way ngspice `wrdata` writes it with wr_singlescale and
+    wr_vecnames set. ac and noise vectors are complex: two columns (real,
+    imaginary) with the same name."""
+    rng = np.random.default_rng(seed)
+    if analysis_type in ("ac", "noise"):
+        x_axis = np.logspace(-2, 6, rows)
+    else:
+        # non-uniform timesteps, like a real transient
+        x_axis = np.cumsum(rng.uniform(0.5, 1.5, rows)) * 1e-9
+    columns = [x_axis]
+    names = [X_NAMES.get(analysis_type, "x")]
+    phase = 2 * np.pi * x_axis / x_axis[-1]
+    for i, name in enumerate(vector_names(cols)):
+        columns.append(np.sin(phase * (i + 1)) + 0.01 * rng.standard_normal(rows))
+        names.append(name)
+        if analysis_type in ("ac", "noise"):
+            columns.append(np.cos(phase * (i + 1)))
+            names.append(name)
+    text = io.StringIO()
+    text.write(" ".join(names) + "\n")
+    np.savetxt(text, np.column_stack(columns), fmt="% .6e")
+    return text.getvalue()
+
+
+def table_text(rows: int) -> str:
+    """Text the way ngspice `print line all > file` writes an op table"""
+    values = np.random.default_rng(1).normal(0, 5, rows)
+    return "".join(f"n{i} = {value:.6e}\n" for i, value in enumerate(values))
+
+
+def write_wrdata(
+    directory: Path, analysis_type: str, rows: int, cols: int, seed: int = 0
+) -> Path:
+    """write a synthetic plot-data results file and return its name"""
+    filename = directory / f"{analysis_type}_{rows}x{cols}.txt"
+    filename.write_text(wrdata_text(analysis_type, rows, cols, seed))
+    return filename
+
+
+def write_table(directory: Path, analysis_type: str, rows: int) -> Path:
+    """write a synthetic table results file and return its name"""
+    filename = directory / f"{analysis_type}_{rows}.txt"
+    filename.write_text(table_text(rows))
+    return filename
+
+
+def netlist_fragments(count: int, lines: int) -> list[spi.Netlist]:
+    """resistor ladder fragments"""
+    return [
+        spi.Netlist(
+            "\n".join(
+                f"R{frag}_{i} n{frag}_{i} n{frag}_{i + 1} {1 + i % 9}k"
+                for i in range(lines)
+            )
+        )
+        for frag in range(count)
+    ]
@@ -0,0 +1,207 @@
+"""Minimal benchmark harness: registration, timing and baseline comparison"""
+
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+BASELINE_FILENAME = Path(__file__).parent / "baseline.json"
+
+# a benchmark repeats until its timed runs add up to MIN_TIME seconds (at
+# least `repeat` and at most MAX_REPEAT times): the minimum of a millisecond
+# benchmark needs hundreds of runs to settle
+MIN_TIME: float = 0.5
+MAX_REPEAT: int = 1000
+# the repeats are split in ROUNDS; the spread of the rounds' minima is the
+# run-to-run noise of a benchmark
+ROUNDS: int = 5
+# a slowdown must exceed this many times the noise to be a regression
+NOISE_FACTOR: float = 3.0
+# fixed workload timed with every run; baselines are scaled by its ratio so a
+# baseline recorded on a faster or slower machine still compares
+CALIBRATION = "harness.calibration"
+
+# scratch space for generated files, removed when the process exits
+_SCRATCH = tempfile.TemporaryDirectory(prefix="py4spice_bench_")
+
+
+def scratch_dir(name: str) -> Path:
+    """a fresh directory for one benchmark's files"""
+    directory = Path(_SCRATCH.name) / name
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+class Config:
+    """Sizes of the synthetic data the benchmarks run on"""
+
+    def __init__(
+        self, rows: int = 100_000, cols: int = 20, table_rows: int = 10_000
+    ) -> None:
+        self.rows = rows  # points in a wrdata file
+        self.cols = cols  # vectors in a wrdata file
+        self.table_rows = table_rows  # entries in an op/tf/sens table
+
+
+class Benchmark:
+    """A timed function. setup(config) runs once, untimed, and its result is
+    passed to func on every timed repeat (see MIN_TIME)."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        setup: Optional[Callable[[Config], Any]],
+        repeat: int,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+
+    def run(self, config: Config) -> list[list[float]]:
+        """run the benchmark and return the time of each repeat (seconds),
+        per round"""
+        state = self.setup(config) if self.setup is not None else None
+        return self.run_state(state)
+
+    def run_state(self, state: Any) -> list[list[float]]:
+        """the timed part of run()"""
+        repeat = -(-self.repeat // ROUNDS)  # per round, rounded up
+        rounds: list[list[float]] = []
+        for _ in range(ROUNDS):
+            times: list[float] = []
+            while len(times) < repeat or (
+                sum(times) < MIN_TIME / ROUNDS and len(times) < MAX_REPEAT // ROUNDS
+            ):
+                start = time.perf_counter()
+                self.func(state)
+                times.append(time.perf_counter() - start)
+            rounds.append(times)
+        return rounds
+
+
+REGISTRY: list[Benchmark] = []
+
+
+def benchmark(
+    name: str,
+    setup: Optional[Callable[[Config], Any]] = None,
+    repeat: int = 5,
+) -> Callable[[Callable[[Any], Any]], Callable[[Any], Any]]:
+    """decorator that registers a benchmark function"""
+
+    def register(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        REGISTRY.append(Benchmark(name, func, setup, repeat))
+        return func
+
+    return register
+
+
+def _calibration_workload(data: np.ndarray) -> None:
+    """interpreter and numpy work, like the benchmarks"""
+    words = " ".join(str(i) for i in range(20_000)).split()
+    table = {word: float(word) for word in words}
+    np.sort(data * sum(table.values()))
+
+
+def calibrate() -> dict[str, float]:
+    """time the fixed calibration workload, like a benchmark"""
+    data = np.random.default_rng(0).random(200_000)
+    rounds = Benchmark(CALIBRATION, _calibration_workload, None, 5).run_state(data)
+    minima = [min(times) for times in rounds]
+    return {"min": min(minima), "median": statistics.median(minima), "spread": 0.0}
+
+
+def run_all(config: Config, pattern: str = "") -> dict[str, dict[str, float]]:
+    """run registered benchmarks whose name contains pattern, and the
+    calibration workload before and after them (the faster one counts)
+
+    Returns:
+        dict: name -> {"min": seconds, "median": seconds, "spread": seconds},
+        spread being the range of the minima of the rounds
+    """
+    results: dict[str, dict[str, float]] = {CALIBRATION: calibrate()}
+    for bench in REGISTRY:
+        if pattern not in bench.name:
+            continue
+        rounds = bench.run(config)
+        times = [t for times in rounds for t in times]
+        minima = [min(times) for times in rounds]
+        results[bench.name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "spread": max(minima) - min(minima),
+        }
+        print(
+            f"{bench.name:<45} min {min(times) * 1e3:10.3f} ms"
+            f"  +/- {(max(minima) - min(minima)) * 1e3:.3f} ms"
+        )
+    after = calibrate()
+    if after["min"] < results[CALIBRATION]["min"]:
+        results[CALIBRATION] = after
+    print(f"{CALIBRATION:<45} min {results[CALIBRATION]['min'] * 1e3:10.3f} ms")
+    return results
+
+
+def load_baseline(filename: Path = BASELINE_FILENAME) -> dict[str, dict[str, float]]:
+    """stored results, empty if there are none"""
+    if not filename.exists():
+        return {}
+    with open(filename, "r", encoding="utf-8") as file:
+        baseline: dict[str, dict[str, float]] = json.load(file)
+    return baseline
+
+
+def save_baseline(
+    results: dict[str, dict[str, float]], filename: Path = BASELINE_FILENAME
+) -> None:
+    """store results (merged with existing ones) as the new baseline. Kept
+    entries are scaled to the new calibration, so all entries stay relative
+    to one machine speed."""
+    baseline = load_baseline(filename)
+    if CALIBRATION in baseline and CALIBRATION in results:
+        speed = results[CALIBRATION]["min"] / baseline[CALIBRATION]["min"]
+        for name, entry in baseline.items():
+            if name not in results:
+                baseline[name] = {key: value * speed for key, value in entry.items()}
+    baseline.update(results)
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(dict(sorted(baseline.items())), file, indent=2)
+        file.write("\n")
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    min_delta: float = 0.0,
+) -> list[str]:
+    """Names of benchmarks whose minimum is slower than baseline * (1 +
+    tolerance) and slower by more than min_delta seconds and NOISE_FACTOR
+    times the spread of the rounds (the larger of this run's and the
+    baseline's): a 2x on a 1 ms benchmark can be scheduler noise. Baselines
+    are first scaled by the calibration ratio of this machine to the
+    baseline's."""
+    speed = 1.0
+    if CALIBRATION in results and CALIBRATION in baseline:
+        speed = results[CALIBRATION]["min"] / baseline[CALIBRATION]["min"]
+        print(f"{'machine speed vs baseline':<45} {1 / speed:6.2f}x")
+    regressions: list[str] = []
+    for name, result in results.items():
+        if name not in baseline or name == CALIBRATION:
+            continue
+        expected = baseline[name]["min"] * speed
+        ratio = result["min"] / expected
+        slower = result["min"] - expected
+        noise = max(result.get("spread", 0.0), baseline[name].get("spread", 0.0))
+        flag = ""
+        if ratio > 1 + tolerance and slower > max(min_delta, NOISE_FACTOR * noise):
+            regressions.append(name)
+            flag = "  <-- REGRESSION"
+        print(f"{name:<45} {ratio:6.2f}x baseline{flag}")
+    return regressions
@@ -598,15 +598,14 @@ def part5(
     my_plt.png()  # create png file and send to results directory
     spi.display_plots()
 
-    ac1_numpys: list[numpy_flt] = ac1_waves.x_axis_and_sigs(
-        my_vectors_dict[Ky.VEC_AC_OUT_GAIN].list_out()
-    )
-    fbegin, fend, npoints = (10e-3, 10e3, 1000000)
-    my_meas: spi.StepInfo = spi.StepInfo(
-        ac1_numpys[0], ac1_numpys[1], fbegin, fend, npoints
+    # measure on the native (log-spaced) ac points
+    my_meas: spi.FreqInfo = spi.FreqInfo.from_columns(
+        sim_results[0].header,
+        sim_results[0].data_plot,
+        my_vectors_dict[Ky.VEC_OUT].list_out(),
     )
 
-    f_peak: float = my_meas.peaktime
+    f_peak: float = float(my_meas.resonant_freq[0])
     formatted_answer: str = f"freq at peak gain: {f_peak:.5g} Hz"
     spi.print_section("Part 5 calculations", formatted_answer)
 
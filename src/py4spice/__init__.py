@@ -1,4 +1,12 @@
-"""__init__.py"""
+"""__init__.py
+
+Plotting (matplotlib) is loaded the first time one of its names is used, see
+__getattr__ below, so `import py4spice` stays fast for processes that only
+simulate and measure.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 from .analyses import Analyses
 from .control import Control
@@ -9,35 +17,112 @@ from .globals_types import (
     PLOT_DATA,
     TIME_AXIS,
     FREQ_AXIS,
+    Outcome,
 )
+from .experiments import ExperimentResult, ExperimentRunner
+from .freq_info import FreqInfo
+from .incremental import IncrementalRunner
+from .job_queue import JobQueue, QueueJob, SqliteQueue
 from .kicad_netlist import KicadNetlist
 from .step_info import StepInfo
+from .supervisor import Supervisor, run_batch
 from .netlist import Netlist
-from .plot import display_plots
-from .plot import Plot
+from .op_diff import OpDiff
+from .periodic_info import PeriodicInfo
 from .print_section import print_section
-from .simulate import Simulate
+from .profiling import Collector, profile
+from .resample import Resampler
+from .scheduler import CostModel, run_parallel
+from .sensitivity import Sensitivity, SensitivityResult
+from .simulate import RunResult, Simulate
 from .sim_results import SimResults
+from .shared_results import ResultsHandle, parse_parallel, share
+from .sim_stats import SimStats
+from .table_data import TableData
 from .vectors import Vectors
-from .waveforms import Waveforms
+from .waveforms import Waveforms, WaveformsView
+from .waveform_compare import WaveformComparison, compare_waveforms
+from .worker_pool import AlterJob, WorkerJob, WorkerPool
+from .workspace import RunWorkspace, merge_transcripts
+
+if TYPE_CHECKING:
+    from .plot import Plot, display_plots
+    from .render import PlotSpec, render_pngs
+
+# names loaded on first use: name -> module
+_LAZY_NAMES: dict[str, str] = {
+    "display_plots": ".plot",
+    "Plot": ".plot",
+    "PlotSpec": ".render",
+    "render_pngs": ".render",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """import the module of a lazy name the first time it is used"""
+    if name in _LAZY_NAMES:
+        value = getattr(import_module(_LAZY_NAMES[name], __name__), name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
 
 __all__ = (
+    "AlterJob",
     "Analyses",
+    "Collector",
+    "compare_waveforms",
     "Control",
+    "CostModel",
+    "ExperimentResult",
+    "ExperimentRunner",
+    "FreqInfo",
+    "IncrementalRunner",
+    "JobQueue",
     "KicadNetlist",
     "Netlist",
+    "OpDiff",
+    "PeriodicInfo",
     "display_plots",
     "Plot",
+    "PlotSpec",
+    "merge_transcripts",
     "print_section",
+    "profile",
+    "parse_parallel",
+    "QueueJob",
+    "render_pngs",
+    "Resampler",
+    "ResultsHandle",
+    "RunResult",
+    "RunWorkspace",
+    "run_batch",
+    "run_parallel",
+    "share",
+    "Sensitivity",
+    "SensitivityResult",
     "Simulate",
     "SimResults",
+    "SimStats",
+    "SqliteQueue",
     "StepInfo",
+    "Supervisor",
+    "TableData",
     "Vectors",
+    "WaveformComparison",
     "Waveforms",
+    "WaveformsView",
+    "WorkerJob",
+    "WorkerPool",
     "numpy_flt",
     "AnaType",
     "TABLE_DATA",
     "PLOT_DATA",
     "TIME_AXIS",
     "FREQ_AXIS",
+    "Outcome",
 )
@@ -1,6 +1,8 @@
 import time
 from pathlib import Path
 
+from .profiling import stage
+
 
 class Control:
     """Generate control file to for a simulation"""
@@ -40,7 +42,17 @@ class Control:
         """
         self.middle.extend(lines)
 
+    def add_stats(self) -> None:
+        """have ngspice print solver statistics (rusage) before it quits, for
+        Simulate.stats"""
+        if "rusage all" not in self.ending:
+            self.ending.insert(self.ending.index("quit"), "rusage all")
+
     def content_to_file(self, cntl_filename: Path) -> None:
         """write content to file"""
         content: list[str] = self.beginning + self.middle + self.ending
-        self.__list_to_file(cntl_filename, content)
+        with stage("control.write", file=str(cntl_filename)) as rec:
+            self.__list_to_file(cntl_filename, content)
+            rec.add(
+                bytes_written=sum(len(line) + 1 for line in content), rows=len(content)
+            )
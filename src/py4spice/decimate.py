@@ -0,0 +1,71 @@
+"""Reduce the number of points in a trace before it is plotted"""
+
+import numpy as np
+
+from .globals_types import numpy_flt
+
+
+def is_sorted(x_data: numpy_flt) -> bool:
+    """True if the x-axis never decreases (needed to decimate a trace)"""
+    return bool(np.all(x_data[1:] >= x_data[:-1]))
+
+
+def minmax(
+    x_data: numpy_flt,
+    y_data: numpy_flt,
+    x_lo: float,
+    x_hi: float,
+    buckets: int,
+    log: bool = False,
+) -> tuple[numpy_flt, numpy_flt]:
+    """Peak-preserving decimation of a trace to the points visible on screen.
+
+    The x range (x_lo to x_hi) is split into buckets (one per pixel column).
+    Only the first and last points, plus the minimum and maximum of each bucket,
+    are kept, so every peak that would be drawn is still drawn. One point
+    beyond each end of the range is kept so lines run to the edge of the plot.
+
+    Args:
+        x_data (numpy_flt): sorted x-axis
+        y_data (numpy_flt): y values
+        x_lo (float): left edge of the visible range
+        x_hi (float): right edge of the visible range
+        buckets (int): number of buckets, typically the width in pixels
+        log (bool): buckets are evenly spaced in log10(x)
+
+    Returns:
+        tuple[numpy_flt, numpy_flt]: decimated x and y
+    """
+    start = max(int(np.searchsorted(x_data, x_lo, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x_data, x_hi, side="right")) + 1, x_data.size)
+    x_win = x_data[start:stop]
+    y_win = y_data[start:stop]
+
+    # nothing to gain, or NaNs that min/max cannot be matched against
+    if x_win.size <= 4 * buckets or not np.all(np.isfinite(y_win)):
+        return x_win, y_win
+
+    if log and x_lo > 0 and x_win[0] > 0:
+        position = np.log10(x_win)
+        lo, hi = np.log10(x_lo), np.log10(x_hi)
+    else:
+        position = x_win
+        lo, hi = x_lo, x_hi
+    if hi <= lo:
+        return x_win, y_win
+
+    # bucket number of every point, points outside the range get their own
+    bucket = np.floor((position - lo) * (buckets / (hi - lo)))
+    bucket = np.clip(bucket, -1, buckets).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    counts = np.diff(np.append(starts, x_win.size))
+
+    keep = [np.array([0, x_win.size - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(y_win, starts)
+        # first point in each bucket equal to the bucket's extreme value
+        hits = np.flatnonzero(y_win == np.repeat(extreme, counts))
+        keep.append(hits[np.searchsorted(hits, starts)])
+
+    index = np.unique(np.concatenate(keep))
+    return x_win[index], y_win[index]
@@ -0,0 +1,305 @@
+"""Projects described in a TOML file instead of hand-written part functions.
+
+The spec names the netlist fragments, analyses and measurements of every
+experiment; ExperimentRunner builds the netlists, simulates the experiments in
+parallel and only when their inputs changed (IncrementalRunner), and measures
+the results. Settings come from circuits/config.toml:
+
+    [PROJECT]
+    CONFIG_STR = "../../config.toml"    # relative to this file
+    SECTION = "SEC_1_04_04"             # PROJ_PATH_STR comes from here
+    TITLE = "* linear regulator section 1.4.4"  # default "* <experiment>"
+    COMMON = ["dut.cir", "supplies.cir", "models.cir"]  # in every experiment
+    WORKERS = 4
+
+    [EXPERIMENTS.part2]
+    fragments = ["load_resistive.cir", "stimulus_15v_ramp.cir"]
+    lines = ["cout out 0 10u"]          # netlist lines of this experiment only
+    analyses = [{ name = "tr1", type = "tran", cmd = "tran 1e-9 20e-6" }]
+
+    [[EXPERIMENTS.part2.measurements]]
+    name = "step"
+    analysis = "tr1"
+    kind = "step"
+    signal = "out"
+    xbegin = 9e-6
+    xend = 12e-6
+
+Instead of CONFIG_STR and SECTION, the spec can have a [GLOBAL] table like
+config.toml's and PROJ_PATH_STR in [PROJECT]. Fragment files are relative to
+the netlists directory; each one is read once, however many experiments use
+it. Results of experiment <name>, and its netlist <name>.cir, go to
+<results dir>/<name>/; the netlists directory is only read. An .include in a
+fragment therefore needs an absolute path.
+
+Measurement kinds:
+    table     values of an op/tf analysis (keys, default all)
+    step      StepInfo of signal between xbegin and xend (npts, properties)
+    freq      FreqInfo of signal's "-mag"/"-phase" columns (properties)
+    periodic  PeriodicInfo of signal between xbegin and xend (properties)
+
+    runner = ExperimentRunner.from_file(Path("experiments.toml"))
+    for result in runner.run().values():
+        print_section(result.name, result.table_for_print())
+"""
+
+import tomllib
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .analyses import Analyses
+from .control import Control
+from .freq_info import FreqInfo
+from .incremental import IncrementalRunner
+from .netlist import Netlist
+from .periodic_info import PeriodicInfo
+from .scheduler import CostModel
+from .sim_results import SimResults
+from .simulate import RunResult
+from .step_info import StepInfo
+from .vectors import Vectors
+
+MEASUREMENT_KINDS = ("table", "step", "freq", "periodic")
+
+# StepInfo properties measured when a step measurement lists none
+STEP_PROPERTIES: list[str] = [
+    "yinit",
+    "yfinal",
+    "ydelta",
+    "risetime",
+    "peak",
+    "peaktime",
+    "settlingtime",
+]
+
+
+class Experiment:
+    """One simulation of a spec: its netlist fragments, analyses and
+    measurements"""
+
+    def __init__(
+        self,
+        name: str,
+        fragments: list[Netlist],
+        analyses: list[Analyses],
+        measurements: list[dict[str, Any]],
+    ) -> None:
+        self.name = name
+        self.fragments = fragments
+        self.analyses = analyses
+        self.measurements = measurements
+        for spec in measurements:
+            if spec.get("kind") not in MEASUREMENT_KINDS:
+                raise ValueError(
+                    f"{name}: measurement kind must be one of {MEASUREMENT_KINDS}"
+                )
+            if spec.get("analysis") not in [a.name for a in analyses]:
+                raise ValueError(f"{name}: no analysis {spec.get('analysis')!r}")
+
+    @property
+    def netlist(self) -> Netlist:
+        """top netlist: fragments, control block and .end"""
+        control = Control()
+        for analysis in self.analyses:
+            control.insert_lines(analysis.lines_for_cntl())
+        top = Netlist()
+        for fragment in self.fragments:
+            top = top + fragment
+        return top + Netlist(str(control)) + Netlist(".end")
+
+
+class ExperimentResult:
+    """Results and measurements of an experiment"""
+
+    def __init__(
+        self,
+        name: str,
+        run_result: Optional[RunResult],
+        results: dict[str, SimResults],
+        measurements: dict[str, float],
+    ) -> None:
+        self.name = name
+        self.run_result = run_result  # None: results of a previous run
+        self.results = results  # analysis name -> SimResults
+        self.measurements = measurements  # "<measurement>.<property>" -> value
+
+    @property
+    def ok(self) -> bool:
+        return self.run_result is None or self.run_result.ok
+
+    def table_for_print(self) -> str:
+        """measurements, one per line"""
+        if not self.measurements:
+            return ""
+        width = max(len(key) for key in self.measurements) + 2
+        return "".join(
+            f"{key:<{width}}{value:.4g}\n" for key, value in self.measurements.items()
+        )
+
+
+def _signal(results: SimResults, spec: dict[str, Any]) -> tuple[Any, Any]:
+    """x-axis and the column of spec["signal"]"""
+    column = results.header.index(spec["signal"])
+    return results.data_plot[:, 0], results.data_plot[:, column]
+
+
+def measure(results: SimResults, spec: dict[str, Any]) -> dict[str, float]:
+    """Apply one measurement of a spec to the results of its analysis.
+
+    Returns:
+        dict[str, float]: "<name>.<property>" -> value, NaN where a property
+        cannot be measured
+    """
+    name = spec["name"]
+    kind = spec["kind"]
+    values: dict[str, Any] = {}
+    if kind == "table":
+        keys = spec.get("keys", list(results.data_table))
+        values = {key: results.data_table[key] for key in keys}
+    elif kind == "step":
+        x_array, y_array = _signal(results, spec)
+        step = StepInfo(
+            x_array, y_array, spec["xbegin"], spec["xend"], spec.get("npts", 10000)
+        )
+        for prop in spec.get("properties", STEP_PROPERTIES):
+            try:
+                values[prop] = getattr(step, prop)
+            except ValueError:  # no threshold crossing
+                values[prop] = np.nan
+    elif kind == "freq":
+        freq = FreqInfo.from_columns(
+            results.header, results.data_plot, [spec["signal"]]
+        )
+        values = freq.measurements()
+    else:
+        x_array, y_array = _signal(results, spec)
+        periodic = PeriodicInfo(
+            x_array, y_array, spec["xbegin"], spec["xend"], spec.get("npts")
+        )
+        values = periodic.measurements()
+
+    if kind in ("freq", "periodic"):
+        wanted = spec.get("properties", list(values))
+        values = {prop: np.asarray(values[prop]).ravel()[0] for prop in wanted}
+    return {f"{name}.{key}": float(value) for key, value in values.items()}
+
+
+class ExperimentRunner:
+    """Builds, simulates and measures the experiments of a spec"""
+
+    def __init__(self, spec: dict[str, Any], spec_path: Path) -> None:
+        """
+        Args:
+            spec (dict): parsed TOML spec (see the module docstring)
+            spec_path (Path): directory of the spec, for relative paths
+        """
+        project = spec["PROJECT"]
+        settings = dict(spec.get("GLOBAL", {}))
+        if "CONFIG_STR" in project:
+            with open(spec_path / project["CONFIG_STR"], "rb") as config_file:
+                config = tomllib.load(config_file)
+            settings = {**config["GLOBAL"], **settings}
+            project = {**config[project["SECTION"]], **project}
+
+        proj_path = spec_path / project["PROJ_PATH_STR"]
+        self.ngspice_exe = Path(settings["NGSPICE_EXE_STR"])
+        self.netlists_path = proj_path / settings["NETLISTS_DIR_STR"]
+        self.results_path = proj_path / settings["RESULTS_DIR_STR"]
+        self.results_path.mkdir(parents=True, exist_ok=True)
+        self.transcript_filename = self.results_path / settings["SIM_TRANSCRIPT_STR"]
+        self.workers: int = project.get("WORKERS", 1)
+        self.timeout: int = project.get("TIMEOUT", 20)
+        self.cost_model = CostModel(self.results_path / "costs.json")
+
+        self._fragments: dict[str, Netlist] = {}  # file name -> Netlist
+        common = [self.fragment(name) for name in project.get("COMMON", [])]
+
+        self.experiments: dict[str, Experiment] = {}
+        for name, table in spec.get("EXPERIMENTS", {}).items():
+            # the first line of a netlist is its title
+            title = Netlist(project.get("TITLE", f"* {name}"))
+            fragments = [title, Netlist("")] + common
+            fragments += [self.fragment(f) for f in table.get("fragments", [])]
+            if table.get("lines"):
+                fragments.append(Netlist("\n".join(table["lines"])))
+            results_loc = self.results_path / name
+            analyses = [
+                Analyses(
+                    a["name"],
+                    a["type"],
+                    a["cmd"],
+                    Vectors(a.get("vectors", "all")),
+                    results_loc,
+                )
+                for a in table.get("analyses", [])
+            ]
+            measurements = table.get("measurements", [])
+            self.experiments[name] = Experiment(name, fragments, analyses, measurements)
+
+    @classmethod
+    def from_file(cls, spec_filename: Path) -> "ExperimentRunner":
+        with open(spec_filename, "rb") as spec_file:
+            spec = tomllib.load(spec_file)
+        return cls(spec, spec_filename.parent)
+
+    def fragment(self, filename: str) -> Netlist:
+        """a netlist fragment, read from the netlists directory once"""
+        if filename not in self._fragments:
+            self._fragments[filename] = Netlist(self.netlists_path / filename)
+        return self._fragments[filename]
+
+    def runner(self, names: Optional[list[str]] = None) -> IncrementalRunner:
+        """IncrementalRunner with the experiments (all, or names) as steps"""
+        runner = IncrementalRunner(
+            self.ngspice_exe,
+            self.results_path / "manifest.json",
+            self.transcript_filename,
+            self.timeout,
+        )
+        for name in names or list(self.experiments):
+            experiment = self.experiments[name]
+            (self.results_path / name).mkdir(parents=True, exist_ok=True)
+            for analysis in experiment.analyses:
+                analysis.results_loc.mkdir(parents=True, exist_ok=True)
+            runner.add(
+                name,
+                experiment.netlist,
+                experiment.analyses,
+                self.results_path / name / f"{name}.cir",
+            )
+        return runner
+
+    def run(
+        self, names: Optional[list[str]] = None, force: bool = False
+    ) -> dict[str, ExperimentResult]:
+        """Simulate the experiments whose inputs changed (all with force), on
+        WORKERS parallel simulations, then measure every experiment.
+
+        Args:
+            names (list[str]): experiments to run, default all
+            force (bool): simulate even if the results are up to date
+
+        Returns:
+            dict[str, ExperimentResult]: per experiment, in spec order. A
+            failed one has no results and no measurements.
+        """
+        runner = self.runner(names)
+        outcomes = runner.run(force, self.workers, self.cost_model)
+        experiment_results: dict[str, ExperimentResult] = {}
+        for name, run_result in outcomes.items():
+            if run_result is not None and not run_result.ok:
+                experiment_results[name] = ExperimentResult(name, run_result, {}, {})
+                continue
+            experiment = self.experiments[name]
+            results = dict(
+                zip([a.name for a in experiment.analyses], runner.results(name))
+            )
+            measurements: dict[str, float] = {}
+            for spec in experiment.measurements:
+                measurements.update(measure(results[spec["analysis"]], spec))
+            experiment_results[name] = ExperimentResult(
+                name, run_result, results, measurements
+            )
+        return experiment_results
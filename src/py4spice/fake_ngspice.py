@@ -0,0 +1,446 @@
+"""Stand-in for the ngspice executable, for testing and load-testing py4spice
+without the simulator.
+
+It reads a netlist the same way `ngspice -b netlist.cir` does, runs the
+commands of the .control block and writes deterministic, synthetic results for
+`wrdata` and `print line ... > file`, in the formats ngspice uses. The values
+do not come from solving the circuit; they only depend on the analysis, the
+vector name and the element values, so two runs of the same netlist give the
+same results and changing an element changes them.
+
+Size and speed are configurable: points per analysis and a delay (latency) per
+analysis, so pools, caches and parsers can be load-tested at scale:
+
+    python -m py4spice.fake_ngspice -b top.cir --points 10000 --latency 0.05
+
+With -p it reads commands from stdin like `ngspice -p` (see WorkerPool).
+
+Simulate needs an executable file; write_fake_ngspice() creates one. The
+fake uses the standard library only and that executable skips
+py4spice/__init__, so a run costs little more than starting the interpreter,
+like ngspice itself; numpy would add more than 100 ms to every run.
+
+Failures are injected with a comment line in the netlist:
+
+    *fake: nonconvergence        every analysis fails with "timestep too small"
+    *fake: nonconvergence gmin   ... unless an .options line sets gmin
+    *fake: crash                 exits with code 1 after loading the circuit
+    *fake: hang                  never finishes (for timeouts)
+"""
+
+import argparse
+import math
+import random
+import stat
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, TextIO
+
+from .netlist import spice_number
+
+# points written per analysis unless a command fixes the count
+DEFAULT_POINTS: int = 1000
+
+# elements whose first two words after the name are nodes
+TWO_TERMINAL = "rclvidb"
+
+
+def _seed(*parts: str) -> int:
+    """deterministic seed from strings (hash() is randomized per process)"""
+    return zlib.crc32("|".join(parts).encode())
+
+
+def _linspace(start: float, stop: float, count: int) -> list[float]:
+    if count == 1:
+        return [start]
+    step = (stop - start) / (count - 1)
+    return [start + i * step for i in range(count)]
+
+
+class FakeNgspice:
+    """A minimal ngspice command interpreter that makes up results"""
+
+    def __init__(
+        self,
+        points: int = DEFAULT_POINTS,
+        latency: float = 0.0,
+        out: TextIO = sys.stdout,
+    ) -> None:
+        self.points = points
+        self.latency = latency
+        self.out = out
+        self.title = ""
+        self.elements: dict[str, list[str]] = {}  # name -> words of the line
+        self.control: list[str] = []
+        self.x_name = ""
+        self.x_axis: list[float] = []
+        # x_axis scaled to 0..1 and a ripple on it, shared by all vectors
+        self._wave: tuple[list[float], list[float]] = ([], [])
+        self.complex_data = False
+        self.table = False  # last analysis gives a table (op, tf, sens)
+        self.analysis = ""
+        self.finished = False
+        self.options: dict[str, str] = {}  # from .options lines
+        self.fault: list[str] = []  # words of a "*fake:" line
+        self.failed = False  # last analysis did not converge
+        self.started = time.perf_counter()
+        self.analysis_time = 0.0
+        self.counts: dict[str, int] = dict.fromkeys(
+            ("iterations", "tran_iterations", "timepoints", "accepted", "rejected"), 0
+        )
+
+    # ---- circuit ----------------------------------------------------------
+
+    def load_circuit(self, lines: list[str]) -> None:
+        """Read a netlist: title, element lines and the .control block"""
+        self.title = lines[0].strip() if lines else ""
+        self.elements = {}
+        self.control = []
+        self.options = {}
+        self.fault = []
+        in_control = False
+        for raw in lines[1:]:
+            line = raw.strip()
+            lowered = line.lower()
+            if lowered.startswith("*fake:"):
+                self.fault = lowered[len("*fake:") :].split()
+            elif lowered.startswith((".option", ".options")):
+                for word in lowered.split()[1:]:
+                    key, _, value = word.partition("=")
+                    self.options[key] = value
+            elif lowered.startswith(".control"):
+                in_control = True
+            elif lowered.startswith(".endc"):
+                in_control = False
+            elif in_control:
+                self.control.append(line)
+            elif line and line[0].isalpha():
+                words = line.split()
+                self.elements[words[0].lower()] = words
+        self.write(f"\nCircuit: {self.title}\n")
+        if self.fault[:1] == ["crash"]:
+            sys.stderr.write("Fatal error: fake crash\n")
+            sys.exit(1)
+        if self.fault[:1] == ["hang"]:
+            while True:
+                time.sleep(1)
+
+    @property
+    def nodes(self) -> list[str]:
+        """node names in order of appearance, ground excluded"""
+        found: dict[str, None] = {}
+        for words in self.elements.values():
+            kind = words[0][0].lower()
+            count = 2 if kind in TWO_TERMINAL else 4 if kind in "eg" else 0
+            if kind == "x":  # subcircuit: every word but the last is a node
+                count = len([w for w in words[1:-1] if "=" not in w])
+            for node in words[1 : 1 + count]:
+                if node != "0":
+                    found[node.lower()] = None
+        return list(found)
+
+    @property
+    def branches(self) -> list[str]:
+        """branch currents of voltage sources and inductors"""
+        return [f"{name}#branch" for name in self.elements if name[0] in "vl"]
+
+    @property
+    def fingerprint(self) -> str:
+        """element values, so altered circuits give different results"""
+        return " ".join(" ".join(words[1:]) for words in self.elements.values())
+
+    def element_value(self, name: str) -> float:
+        """numeric value of an element (last word that is a number)"""
+        for word in reversed(self.elements[name][1:]):
+            try:
+                return spice_number(word)
+            except ValueError:
+                continue
+        raise ValueError(f"{name} has no numeric value")
+
+    # ---- output -------------------------------------------------------------
+
+    def write(self, text: str) -> None:
+        self.out.write(text)
+
+    def vector_names(self, words: list[str]) -> list[str]:
+        """expand "all" to every node and branch"""
+        names: list[str] = []
+        for word in words:
+            names.extend(self.nodes + self.branches if word == "all" else [word])
+        return names
+
+    def vector(self, name: str) -> list[complex] | list[float]:
+        """synthetic values of a vector for the last analysis (complex for ac)"""
+        rng = random.Random(_seed(self.analysis, name, self.fingerprint))
+        amp, rate, ripple = (
+            rng.uniform(0.5, 10.0),
+            rng.uniform(2, 8),
+            rng.uniform(0, 0.1),
+        )
+        x_axis = self.x_axis
+        if self.complex_data:  # single pole roll-off
+            pole = 10 ** rng.uniform(1, 5)
+            return [amp / (1 + 1j * x / pole) for x in x_axis]
+        if self.analysis == "dc":
+            scale = rate / 4 / (max(abs(x) for x in x_axis) + 1e-30)
+            return [amp * math.tanh(x * scale) for x in x_axis]
+        if len(self._wave[0]) != len(x_axis):
+            span = x_axis[-1] - x_axis[0] if len(x_axis) > 1 else 1.0
+            phases = [(x - x_axis[0]) / span for x in x_axis]
+            self._wave = phases, [math.sin(2 * math.pi * 25 * p) for p in phases]
+        return [
+            amp * (1 - math.exp(-rate * phase)) + ripple * wave
+            for phase, wave in zip(*self._wave)
+        ]
+
+    def table_values(self, names: list[str]) -> list[tuple[str, float]]:
+        """synthetic values for a table analysis"""
+        rows = []
+        for name in names:
+            rng = random.Random(_seed(self.analysis, name, self.fingerprint))
+            rows.append((name, rng.uniform(-15, 15)))
+        return rows
+
+    def wrdata(self, filename: str, words: list[str]) -> None:
+        """columns the way wrdata writes them with wr_singlescale, wr_vecnames"""
+        names = self.vector_names(words)
+        header = [self.x_name]
+        columns: list[list[float]] = [self.x_axis]
+        for name in names:
+            values = self.vector(name)
+            if self.complex_data:  # real and imaginary columns, same name
+                header.extend([name, name])
+                columns.extend([[v.real for v in values], [v.imag for v in values]])
+            else:
+                header.append(name)
+                columns.append([v.real for v in values])
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(" ".join(f"{name:<16}" for name in header).rstrip() + "\n")
+            row_format = "\t".join(["% .9e"] * len(columns)) + "\n"
+            file.writelines(row_format % row for row in zip(*columns))
+
+    def print_line(self, filename: Optional[str], words: list[str]) -> None:
+        """`print line` of table results: one "name = value" per line"""
+        if self.table:
+            rows = self.table_values(self.table_names(words))
+        else:  # print of plot data: last point of each vector
+            rows = [(n, self.vector(n)[-1].real) for n in self.vector_names(words)]
+        text = "".join(f"{name} = {value:.6e}\n" for name, value in rows)
+        if filename is None:
+            self.write(text)
+            return
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def table_names(self, words: list[str]) -> list[str]:
+        if self.analysis == "tf" and "all" in words:
+            return [
+                "transfer_function",
+                "output_impedance_at_v(out)",
+                "input_impedance",
+            ]
+        if self.analysis == "sens" and "all" in words:
+            return [f"{name}" for name in self.elements if name[0] in "rclvi"]
+        return self.vector_names(words)
+
+    # ---- analyses -----------------------------------------------------------
+
+    def run_analysis(self, words: list[str]) -> None:
+        """set up the x-axis of an analysis command"""
+        kind = words[0]
+        self.analysis = kind
+        self._wave = ([], [])
+        self.complex_data = kind in ("ac", "noise")
+        self.table = kind in ("op", "tf", "sens")
+        points = self.points
+        if kind == "tran":
+            stop = spice_number(words[2])
+            start = spice_number(words[3]) if len(words) > 3 else 0.0
+            self.x_name, self.x_axis = "time", _linspace(start, stop, points)
+        elif kind in ("ac", "noise"):
+            # ac dec|oct|lin n fstart fstop, noise v(out) src dec n fstart fstop
+            sweep = words[1:] if kind == "ac" else words[3:]
+            fstart, fstop = spice_number(sweep[2]), spice_number(sweep[3])
+            if sweep[0] == "lin":
+                points = int(spice_number(sweep[1]))
+                self.x_axis = _linspace(fstart, fstop, points)
+            else:
+                per = 1 if sweep[0] == "dec" else math.log10(2)
+                decades = math.log10(fstop / fstart) / per
+                points = int(spice_number(sweep[1]) * decades) + 1
+                exponents = _linspace(math.log10(fstart), math.log10(fstop), points)
+                self.x_axis = [10.0**exponent for exponent in exponents]
+            self.x_name = "frequency"
+        elif kind == "dc":
+            start, stop, step = (spice_number(w) for w in words[2:5])
+            points = round((stop - start) / step) + 1
+            self.x_name = "v-sweep"
+            self.x_axis = _linspace(start, stop, max(points, 2))
+        else:
+            self.x_name, self.x_axis = "", [0.0]
+            points = 1
+
+        started = time.perf_counter()
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self.analysis_time += time.perf_counter() - started
+        self.count_solver_work(kind, points)
+        self.write("\nDoing analysis at TEMP = 27.000000 and TNOM = 27.000000\n")
+        self.failed = self.fault[:1] == ["nonconvergence"] and not (
+            set(self.fault[1:]) & set(self.options)
+        )
+        if self.failed:
+            self.write(
+                f"doAnalyses: {kind.upper()}:  Timestep too small; "
+                "time = 1e-09, timestep = 1.25e-21: cause unrecorded.\n\n"
+                f"{kind} simulation(s) aborted\n"
+            )
+            return
+        if not self.table:
+            self.write(f"\nNo. of Data Rows : {points}\n")
+
+    def count_solver_work(self, kind: str, points: int) -> None:
+        """made-up solver statistics: a few iterations per point, and for tran
+        some rejected timepoints that grow with the element values"""
+        rng = random.Random(_seed(kind, self.fingerprint))
+        per_point = rng.randrange(2, 5)
+        self.counts["iterations"] += per_point * points
+        if kind == "tran":
+            rejected = rng.randrange(0, max(points // 10, 1))
+            self.counts["tran_iterations"] += per_point * points
+            self.counts["timepoints"] += points + rejected
+            self.counts["accepted"] += points
+            self.counts["rejected"] += rejected
+
+    def rusage(self) -> None:
+        """statistics in the format of ngspice `rusage all`"""
+        counts = self.counts
+        elapsed = time.perf_counter() - self.started
+        equations = len(self.nodes) + len(self.branches)
+        self.write(
+            f"Total analysis time (seconds) = {self.analysis_time:.3f}\n"
+            f"Total elapsed time (seconds) = {elapsed:.3f} \n\n"
+            f"Maximum ngspice program size =   {20 + equations / 1e3:.3f} MB.\n"
+            f"Current ngspice program size =   {20 + equations / 1e3:.3f} MB.\n\n"
+            f"Total iterations = {counts['iterations']}\n"
+            f"Transient iterations = {counts['tran_iterations']}\n"
+            f"Circuit Equations = {equations}\n"
+            f"Transient timepoints = {counts['timepoints']}\n"
+            f"Accepted timepoints = {counts['accepted']}\n"
+            f"Rejected timepoints = {counts['rejected']}\n"
+        )
+
+    # ---- commands -----------------------------------------------------------
+
+    def execute(self, line: str) -> None:
+        """Run one control-block or interactive command"""
+        words = line.split()
+        if not words or line.lstrip().startswith(("*", "#")):
+            return
+        command = words[0].lower()
+        if command in ("tran", "ac", "dc", "op", "tf", "sens", "noise", "disto", "pz"):
+            self.run_analysis([command] + words[1:])
+        elif command in ("wrdata", "print") and self.failed:
+            self.write(f"Error({command}): no such vector\n")
+        elif command == "wrdata":
+            self.wrdata(words[1], words[2:])
+        elif command == "print":
+            args = words[2:] if len(words) > 1 and words[1] == "line" else words[1:]
+            filename = None
+            if ">" in args:
+                filename = args[args.index(">") + 1]
+                args = args[: args.index(">")]
+            self.print_line(filename, args)
+        elif command == "echo":
+            self.write(" ".join(words[1:]) + "\n")
+        elif command == "alter":
+            # alter r1 = 10k  or  alter r1 10k
+            name, value = words[1].lower(), words[-1]
+            if name in self.elements:
+                self.elements[name][-1] = value
+        elif command == "rusage":
+            self.rusage()
+        elif command == "source":
+            self.source(Path(words[1]))
+        elif command in ("quit", "exit"):
+            self.finished = True
+        # set, option, reset, destroy, remcirc, ... are accepted and ignored
+
+    def run_control(self) -> None:
+        """execute the .control block of the loaded circuit"""
+        for line in self.control:
+            if self.finished:
+                return
+            self.execute(line)
+
+    def source(self, filename: Path) -> None:
+        """load a netlist file and run its .control block"""
+        with open(filename, "r", encoding="utf-8") as file:
+            self.load_circuit(file.read().splitlines())
+        self.run_control()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """command line entry point, arguments like ngspice"""
+    parser = argparse.ArgumentParser(description="fake ngspice for testing")
+    parser.add_argument("-b", "--batch", action="store_true")
+    parser.add_argument("-p", "--pipe", action="store_true")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("netlist", nargs="?")
+    args = parser.parse_args(argv)
+
+    spice = FakeNgspice(args.points, args.latency)
+    spice.write("\nNote: fake ngspice, results are synthetic\n")
+    if args.netlist is not None:
+        spice.source(Path(args.netlist))
+    elif args.batch:  # ngspice -b < netlist
+        spice.load_circuit(sys.stdin.read().splitlines())
+        spice.run_control()
+    elif args.pipe:  # ngspice -p: one command per line until quit
+        for line in sys.stdin:
+            spice.execute(line.strip())
+            sys.stdout.flush()
+            if spice.finished:
+                break
+    return 0
+
+
+def write_fake_ngspice(
+    filename: Path, points: int = DEFAULT_POINTS, latency: float = 0.0
+) -> Path:
+    """Write an executable script that runs the fake ngspice with this Python.
+    Pass the returned path to Simulate as ngspice_exe.
+
+    The script imports this module without running py4spice/__init__ (and
+    with it numpy), so every run starts in tens of milliseconds.
+
+    Args:
+        filename (Path): script to create
+        points (int): points per analysis
+        latency (float): seconds of delay per analysis
+
+    Returns:
+        Path: filename, now executable
+    """
+    package_dir = Path(__file__).resolve().parent
+    filename.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, types\n"
+        "# an empty py4spice package: import the fake without __init__\n"
+        'package = types.ModuleType("py4spice")\n'
+        f"package.__path__ = [{str(package_dir)!r}]\n"
+        'sys.modules["py4spice"] = package\n'
+        "from py4spice.fake_ngspice import main\n"
+        f'sys.exit(main(["--points", "{points}", "--latency", "{latency}"]'
+        " + sys.argv[1:]))\n"
+    )
+    filename.chmod(filename.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return filename
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Frequency-response measurements"""
+
+from typing import Optional
+
+import numpy as np
+
+from .globals_types import numpy_flt
+
+
+def _as_columns(array: numpy_flt) -> numpy_flt:
+    """make sure a 1D signal is a 2D array with a single column"""
+    array = np.asarray(array, dtype=np.float64)
+    if array.ndim == 1:
+        return array[:, np.newaxis]
+    return array
+
+
+def _first_falling(
+    values: numpy_flt, level: numpy_flt
+) -> tuple[np.ndarray, numpy_flt, np.ndarray]:
+    """Locate the first point in each column where values fall through level
+
+    Args:
+        values (numpy_flt): 2D array, one column per signal
+        level (numpy_flt): threshold for each column
+
+    Returns:
+        tuple: (index before crossing, fraction between index and index + 1,
+        boolean of whether a crossing was found)
+    """
+    delta = values - level
+    crossing = (delta[:-1] >= 0) & (delta[1:] < 0)
+    index = np.argmax(crossing, axis=0)
+    cols = np.arange(values.shape[1])
+    found = crossing[index, cols]
+
+    before = delta[index, cols]
+    after = delta[index + 1, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(found, before / (before - after), np.nan)
+    return index, fraction, found
+
+
+def _at_fraction(
+    values: numpy_flt, index: np.ndarray, fraction: numpy_flt
+) -> numpy_flt:
+    """Linear interpolation of each column at (index + fraction)"""
+    cols = np.arange(values.shape[1])
+    before = values[index, cols]
+    after = values[index + 1, cols]
+    result: numpy_flt = before + fraction * (after - before)
+    return result
+
+
+class FreqInfo:
+    """Measurements of frequency responses, typically from an "ac" analysis.
+
+    Gain is in dB and phase in degrees (the way SimResults stores "-mag" and
+    "-phase" columns). Gain and phase can be a single signal or a 2D array with
+    one column per signal/sweep run that share the frequency axis. Every
+    measurement returns one value per column, with NaN where it does not exist.
+    Crossings are interpolated on the native points in log-frequency.
+    """
+
+    def __init__(
+        self,
+        freq: numpy_flt,
+        gain_db: numpy_flt,
+        phase_deg: Optional[numpy_flt] = None,
+    ) -> None:
+        self.freq: numpy_flt = np.asarray(freq, dtype=np.float64)
+        self.gain_db: numpy_flt = _as_columns(gain_db)
+        self.phase_deg: Optional[numpy_flt] = None
+        if phase_deg is not None:
+            # unwrap so crossings are not confused by +/-180 degree jumps
+            phase = np.unwrap(np.deg2rad(_as_columns(phase_deg)), axis=0)
+            phase = np.rad2deg(phase)
+            # start each column between -180 and 180 degrees
+            phase -= 360.0 * np.round(phase[0] / 360.0)
+            self.phase_deg = phase
+        self.bw_drop_db = 3.0
+
+        if self.gain_db.shape[0] != self.freq.shape[0]:
+            raise ValueError("gain_db must have one row per frequency point")
+        if self.phase_deg is not None and self.phase_deg.shape != self.gain_db.shape:
+            raise ValueError("phase_deg must have the same shape as gain_db")
+
+    @classmethod
+    def from_columns(
+        cls, header: list[str], data: numpy_flt, signals: list[str]
+    ) -> "FreqInfo":
+        """Create from a header and 2D array with "<sig>-mag" and "<sig>-phase"
+        columns, for example SimResults.header and SimResults.data_plot.
+
+        Args:
+            header (list[str]): column names, x-axis first
+            data (numpy_flt): 2D array, frequency in column 0
+            signals (list[str]): signal names without the "-mag"/"-phase" suffix
+
+        Returns:
+            FreqInfo: one column per signal
+        """
+        mag_cols = [header.index(f"{signal}-mag") for signal in signals]
+        phase_names = [f"{signal}-phase" for signal in signals]
+        phase: Optional[numpy_flt] = None
+        if all(name in header for name in phase_names):
+            phase = data[:, [header.index(name) for name in phase_names]]
+        return cls(data[:, 0], data[:, mag_cols], phase)
+
+    @property
+    def signal_count(self) -> int:
+        """number of signals (columns) measured"""
+        return int(self.gain_db.shape[1])
+
+    @property
+    def log_freq(self) -> numpy_flt:
+        """log10 of the frequency axis, used for interpolation"""
+        return np.log10(self.freq)
+
+    def _freq_at(self, index: np.ndarray, fraction: numpy_flt) -> numpy_flt:
+        """frequency of crossings, interpolated in log-frequency"""
+        log_f = self.log_freq
+        freq: numpy_flt = np.power(
+            10.0, log_f[index] + fraction * np.diff(log_f)[index]
+        )
+        return freq
+
+    def _require_phase(self) -> numpy_flt:
+        if self.phase_deg is None:
+            raise ValueError("phase_deg is needed for this measurement")
+        return self.phase_deg
+
+    @property
+    def dc_gain(self) -> numpy_flt:
+        """gain (dB) at the lowest frequency"""
+        dc_gain: numpy_flt = self.gain_db[0].copy()
+        return dc_gain
+
+    @property
+    def bandwidth(self) -> numpy_flt:
+        """frequency where gain first drops bw_drop_db (3 dB) below the dc gain"""
+        level = self.dc_gain - self.bw_drop_db
+        index, fraction, _ = _first_falling(self.gain_db, level)
+        return self._freq_at(index, fraction)
+
+    @property
+    def unity_gain_freq(self) -> numpy_flt:
+        """frequency where gain first falls through 0 dB (crossover)"""
+        index, fraction, _ = _first_falling(self.gain_db, np.zeros(self.signal_count))
+        return self._freq_at(index, fraction)
+
+    @property
+    def phase_margin(self) -> numpy_flt:
+        """180 degrees plus the phase at the unity gain frequency"""
+        phase = self._require_phase()
+        index, fraction, _ = _first_falling(self.gain_db, np.zeros(self.signal_count))
+        return 180.0 + _at_fraction(phase, index, fraction)
+
+    @property
+    def phase_crossover_freq(self) -> numpy_flt:
+        """frequency where phase first falls through -180 degrees"""
+        phase = self._require_phase()
+        level = np.full(self.signal_count, -180.0)
+        index, fraction, _ = _first_falling(phase, level)
+        return self._freq_at(index, fraction)
+
+    @property
+    def gain_margin(self) -> numpy_flt:
+        """dB the gain is below 0 dB at the phase crossover frequency"""
+        phase = self._require_phase()
+        level = np.full(self.signal_count, -180.0)
+        index, fraction, _ = _first_falling(phase, level)
+        return -_at_fraction(self.gain_db, index, fraction)
+
+    @property
+    def peak_gain(self) -> numpy_flt:
+        """maximum gain (dB)"""
+        peak: numpy_flt = self.gain_db.max(axis=0)
+        return peak
+
+    @property
+    def peaking(self) -> numpy_flt:
+        """dB the maximum gain is above the dc gain"""
+        return self.peak_gain - self.dc_gain
+
+    @property
+    def resonant_freq(self) -> numpy_flt:
+        """frequency of maximum gain, refined with a parabola in log-frequency"""
+        index = np.argmax(self.gain_db, axis=0)
+        log_f = self.log_freq
+        result = log_f[index].copy()
+
+        # only refine peaks that have a point on each side
+        inner = (index > 0) & (index < self.freq.size - 1)
+        cols = np.arange(self.signal_count)[inner]
+        i = index[inner]
+        x0, x1, x2 = log_f[i - 1], log_f[i], log_f[i + 1]
+        y0 = self.gain_db[i - 1, cols]
+        y1 = self.gain_db[i, cols]
+        y2 = self.gain_db[i + 1, cols]
+
+        # vertex of the parabola through the three points
+        num = (x1 - x0) ** 2 * (y1 - y2) - (x1 - x2) ** 2 * (y1 - y0)
+        den = (x1 - x0) * (y1 - y2) - (x1 - x2) * (y1 - y0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vertex = x1 - 0.5 * num / den
+        vertex = np.where(np.isfinite(vertex), vertex, x1)
+        result[inner] = np.clip(vertex, x0, x2)
+        freq: numpy_flt = np.power(10.0, result)
+        return freq
+
+    def measurements(self) -> dict[str, numpy_flt]:
+        """All measurements in a dictionary. Phase-based ones need phase_deg."""
+        result: dict[str, numpy_flt] = {
+            "dc_gain": self.dc_gain,
+            "bandwidth": self.bandwidth,
+            "unity_gain_freq": self.unity_gain_freq,
+            "peak_gain": self.peak_gain,
+            "peaking": self.peaking,
+            "resonant_freq": self.resonant_freq,
+        }
+        if self.phase_deg is not None:
+            result["phase_margin"] = self.phase_margin
+            result["phase_crossover_freq"] = self.phase_crossover_freq
+            result["gain_margin"] = self.gain_margin
+        return result
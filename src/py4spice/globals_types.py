@@ -17,3 +17,6 @@ PLOT_DATA: list[AnaType] = ["ac", "dc", "disto", "noise", "pz", "sp", "tran"]
 TIME_AXIS: list[AnaType] = ["tran"]
 SIG_AXIS: list[AnaType] = ["dc"]
 FREQ_AXIS: list[AnaType] = ["ac", "noise"]
+
+# Outcome of a simulation run (implicit alias, mypy infers it)
+Outcome = Literal["ok", "timeout", "error", "nonconvergence"]
@@ -0,0 +1,194 @@
+"""Rerun only the simulations whose inputs changed, like a build system.
+
+Each simulation is a Step: the top netlist (fragments and Control block
+concatenated), its analyses and the files it came from (Netlist.sources,
+including .include/.lib files). Its key is a content hash of the netlist text
+and of every source file. A manifest next to the results remembers the key and
+the results-file hashes of the last successful run; a step is stale when its
+key changed or a results file is missing or was modified.
+
+    runner = IncrementalRunner(ngspice_exe, results_path / "manifest.json",
+                               transcript_filename)
+    runner.add("sim1", top1, analyses1, netlists_path / "top1.cir")
+    runner.add("sim4", top4, analyses4, netlists_path / "top4.cir")
+    runner.run()  # simulates stale steps only
+    results = runner.results("sim4")
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .analyses import Analyses
+from .netlist import Netlist
+from .scheduler import CostModel, run_parallel
+from .sim_results import SimResults
+from .simulate import RunResult, Simulate
+from .supervisor import Supervisor
+
+# (path, modification time, size) -> hash, so unchanged files are read once
+_HASH_CACHE: dict[tuple[str, int, int], str] = {}
+
+
+def file_hash(filename: Path) -> str:
+    """sha256 of a file's content, "" if it does not exist"""
+    try:
+        status = filename.stat()
+    except OSError:
+        return ""
+    cache_key = (str(filename), status.st_mtime_ns, status.st_size)
+    if cache_key not in _HASH_CACHE:
+        _HASH_CACHE[cache_key] = hashlib.sha256(filename.read_bytes()).hexdigest()
+    return _HASH_CACHE[cache_key]
+
+
+class Step:
+    """One simulation of an IncrementalRunner"""
+
+    def __init__(
+        self,
+        name: str,
+        netlist: Netlist,
+        analyses: list[Analyses],
+        netlist_filename: Path,
+    ) -> None:
+        self.name = name
+        self.netlist = netlist
+        self.analyses = analyses
+        self.netlist_filename = netlist_filename
+
+    @property
+    def sources(self) -> list[Path]:
+        return self.netlist.sources
+
+    @property
+    def key(self) -> str:
+        """hash of the netlist text and its source files. Control's
+        timestamp comment is left out, it changes on every run."""
+        digest = hashlib.sha256()
+        for line in self.netlist.data:
+            if not line.startswith("* timestamp:"):
+                digest.update(line.encode() + b"\n")
+        for source in self.sources:
+            digest.update(f"{source}={file_hash(source)}\n".encode())
+        return digest.hexdigest()
+
+    def results_hashes(self) -> dict[str, str]:
+        return {
+            str(a.results_filename): file_hash(a.results_filename)
+            for a in self.analyses
+        }
+
+
+class IncrementalRunner:
+    """Simulates the stale steps and keeps the results of the others"""
+
+    def __init__(
+        self,
+        ngspice_exe: Path,
+        manifest_filename: Path,
+        transcript_filename: Path,
+        timeout: int = 20,
+    ) -> None:
+        self.ngspice_exe = ngspice_exe
+        self.manifest_filename = manifest_filename
+        self.transcript_filename = transcript_filename
+        self.timeout = timeout
+        self.steps: dict[str, Step] = {}
+        self.manifest: dict[str, dict[str, object]] = {}
+        if manifest_filename.exists():
+            self.manifest = json.loads(manifest_filename.read_text())
+
+    def add(
+        self,
+        name: str,
+        netlist: Netlist,
+        analyses: list[Analyses],
+        netlist_filename: Path,
+    ) -> Step:
+        """register a simulation: netlist is written to netlist_filename
+        when the step runs"""
+        step = Step(name, netlist, analyses, netlist_filename)
+        self.steps[name] = step
+        return step
+
+    def is_stale(self, name: str) -> bool:
+        step = self.steps[name]
+        entry = self.manifest.get(name)
+        if entry is None or entry.get("key") != step.key:
+            return True
+        hashes = step.results_hashes()
+        return "" in hashes.values() or entry.get("results") != hashes
+
+    def stale(self) -> list[str]:
+        """names of the steps that need to run"""
+        return [name for name in self.steps if self.is_stale(name)]
+
+    def dependents(self, source: Path) -> list[str]:
+        """names of the steps that depend on a source file"""
+        resolved = source.resolve()
+        return [name for name, step in self.steps.items() if resolved in step.sources]
+
+    def graph(self) -> dict[str, list[str]]:
+        """dependency graph: source file -> names of the steps using it"""
+        graph: dict[str, list[str]] = {}
+        for name, step in self.steps.items():
+            for source in step.sources:
+                graph.setdefault(str(source), []).append(name)
+        return graph
+
+    def run(
+        self,
+        force: bool = False,
+        workers: int = 1,
+        cost_model: Optional[CostModel] = None,
+    ) -> dict[str, Optional[RunResult]]:
+        """Simulate the stale steps (all with force). With several workers
+        they run in parallel, slowest estimated first (see run_parallel).
+
+        Returns:
+            dict[str, Optional[RunResult]]: per step, in the order added; None
+            if it was up to date
+        """
+        outcomes: dict[str, Optional[RunResult]] = {name: None for name in self.steps}
+        names = [name for name in self.steps if force or self.is_stale(name)]
+        supervisors = []
+        for name in names:
+            step = self.steps[name]
+            step.netlist.write_to_file(step.netlist_filename)
+            sim = Simulate(
+                self.ngspice_exe,
+                step.netlist_filename,
+                self.transcript_filename,
+                name,
+                self.timeout,
+            )
+            supervisors.append(Supervisor(sim, step.analyses))
+
+        for name, result in zip(names, run_parallel(supervisors, workers, cost_model)):
+            step = self.steps[name]
+            outcomes[name] = result
+            if result.ok:
+                self.manifest[name] = {
+                    "key": step.key,
+                    "sources": [str(source) for source in step.sources],
+                    "results": step.results_hashes(),
+                }
+            else:
+                self.manifest.pop(name, None)
+        self.save()
+        return outcomes
+
+    def save(self) -> None:
+        self.manifest_filename.write_text(json.dumps(self.manifest, indent=2))
+
+    def results(self, name: str, dtype: npt.DTypeLike = np.float64) -> list[SimResults]:
+        """results of a step's analyses, fresh or from a previous run"""
+        return [
+            SimResults.from_file(a.cmd_type, a.results_filename, dtype)
+            for a in self.steps[name].analyses
+        ]
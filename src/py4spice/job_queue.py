@@ -0,0 +1,377 @@
+"""Sweeps spread over worker processes on any host through a job queue.
+
+The submitter puts self-contained jobs (netlist text and analyses) in a queue;
+workers pull them, simulate with their own ngspice and put back compact
+results: the arrays in npz form plus JSON metadata, not text files.
+
+JobQueue is the interface; SqliteQueue implements it with one SQLite file,
+which works for processes on one machine or hosts sharing a file system that
+supports locking. Start workers with:
+
+    py4spice-worker sweep.db --ngspice /usr/bin/ngspice
+
+or python -m py4spice.job_queue. Paths in the netlists (.include, .lib) must
+exist on every worker host.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from .analyses import Analyses
+from .globals_types import Outcome
+from .netlist import Netlist
+from .sim_results import SimResults
+from .supervisor import Supervisor
+from .vectors import Vectors
+from .workspace import RunWorkspace
+
+
+class QueueJob:
+    """A simulation that a worker on another host can run: the circuit as text
+    (no .control block, no .end) and its analyses"""
+
+    def __init__(self, name: str, netlist: Netlist | str, analyses: list[Analyses]):
+        self.name = name
+        lines = str(netlist).split("\n")
+        self.netlist = "\n".join(line for line in lines if line.strip() != ".end")
+        self.analyses = analyses
+
+    def to_json(self) -> str:
+        analyses = [[a.name, a.cmd_type, a.cmd, str(a.vector)] for a in self.analyses]
+        return json.dumps(
+            {"name": self.name, "netlist": self.netlist, "analyses": analyses}
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "QueueJob":
+        spec = json.loads(text)
+        analyses = [
+            Analyses(name, cmd_type, cmd, Vectors(vector), Path("."))
+            for name, cmd_type, cmd, vector in spec["analyses"]
+        ]
+        return cls(spec["name"], spec["netlist"], analyses)
+
+
+def pack_results(results: dict[str, SimResults]) -> tuple[bytes, dict[str, Any]]:
+    """SimResults of a job as npz bytes (plot data) and JSON-able metadata
+    (analysis types, headers and table data)"""
+    buffer = io.BytesIO()
+    arrays = {name: r.data_plot for name, r in results.items() if r.data_plot.size}
+    arrays.update(
+        {f"{name}.x": r.x_axis for name, r in results.items() if r.x_axis is not None}
+    )
+    np.savez_compressed(buffer, **arrays)  # type: ignore
+    metadata = {
+        name: {
+            "analysis_type": r.analysis_type,
+            "header": r.header,
+            "table": r.data_table.to_dict(),
+        }
+        for name, r in results.items()
+    }
+    return buffer.getvalue(), metadata
+
+
+def unpack_results(blob: bytes, metadata: dict[str, Any]) -> dict[str, SimResults]:
+    """inverse of pack_results"""
+    arrays = np.load(io.BytesIO(blob))
+    return {
+        name: SimResults(
+            meta["analysis_type"],
+            meta["header"],
+            arrays[name] if name in arrays.files else np.array([]),
+            meta["table"],
+            arrays[f"{name}.x"] if f"{name}.x" in arrays.files else None,
+        )
+        for name, meta in metadata.items()
+    }
+
+
+class QueueResult:
+    """What a worker sent back for a job"""
+
+    def __init__(
+        self,
+        job_id: int,
+        name: str,
+        outcome: Outcome,
+        message: str,
+        worker: str,
+        stats: dict[str, float],
+        results: dict[str, SimResults],
+    ) -> None:
+        self.job_id = job_id
+        self.name = name
+        self.outcome: Outcome = outcome
+        self.message = message
+        self.worker = worker  # host:pid
+        self.stats = stats  # SimStats values
+        self.results = results  # analysis name -> SimResults, if ok
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == "ok"
+
+
+class JobQueue(ABC):
+    """Interface of a job queue. A queue over SSH or a message broker only
+    needs the abstract methods."""
+
+    @abstractmethod
+    def submit(self, job: QueueJob) -> int:
+        """add a job, returns its id"""
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[tuple[int, QueueJob]]:
+        """take the next queued job for worker, None if there is none"""
+
+    @abstractmethod
+    def finish(
+        self,
+        job_id: int,
+        worker: str,
+        outcome: Outcome,
+        message: str,
+        stats: dict[str, float],
+        results: dict[str, SimResults],
+    ) -> bool:
+        """Store the result of a job claimed by worker.
+
+        Returns:
+            bool: False if the job is no longer worker's (its lease expired
+                and another worker claimed it); nothing is stored then
+        """
+
+    @abstractmethod
+    def result(self, job_id: int) -> Optional[QueueResult]:
+        """result of a job, None while it is queued or running"""
+
+    @abstractmethod
+    def pending(self) -> int:
+        """jobs queued or running"""
+
+    def submit_all(self, jobs: Iterable[QueueJob]) -> list[int]:
+        return [self.submit(job) for job in jobs]
+
+    def wait(
+        self, job_ids: list[int], timeout: Optional[float] = None, poll: float = 0.2
+    ) -> list[QueueResult]:
+        """Wait for jobs to finish and return their results in order.
+
+        Raises:
+            TimeoutError: not all done within timeout seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results: dict[int, QueueResult] = {}
+        while True:
+            for job_id in job_ids:
+                if job_id not in results:
+                    result = self.result(job_id)
+                    if result is not None:
+                        results[job_id] = result
+            if len(results) == len(job_ids):
+                return [results[job_id] for job_id in job_ids]
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{len(job_ids) - len(results)} jobs not done")
+            time.sleep(poll)
+
+
+class SqliteQueue(JobQueue):
+    """JobQueue in a SQLite file. Jobs claimed by a worker that has not
+    finished them within lease seconds (it died) are queued again."""
+
+    def __init__(self, filename: Path, lease: float = 600) -> None:
+        self.filename = filename
+        self.lease = lease
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spec TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                worker TEXT,
+                claimed REAL,
+                outcome TEXT,
+                metadata TEXT,
+                results BLOB
+            )"""
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def submit(self, job: QueueJob) -> int:
+        cursor = self.connection.execute(
+            "INSERT INTO jobs (spec) VALUES (?)", (job.to_json(),)
+        )
+        return int(cursor.lastrowid or 0)
+
+    def claim(self, worker: str) -> Optional[tuple[int, QueueJob]]:
+        now = time.time()
+        # BEGIN IMMEDIATE: only one worker at a time gets to pick a job
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute(
+                "UPDATE jobs SET state = 'queued' WHERE state = 'running' "
+                "AND claimed < ?",
+                (now - self.lease,),
+            )
+            row = self.connection.execute(
+                "SELECT id, spec FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, claimed = ? "
+                    "WHERE id = ?",
+                    (worker, now, row[0]),
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return int(row[0]), QueueJob.from_json(row[1])
+
+    def finish(
+        self,
+        job_id: int,
+        worker: str,
+        outcome: Outcome,
+        message: str,
+        stats: dict[str, float],
+        results: dict[str, SimResults],
+    ) -> bool:
+        blob, metadata = pack_results(results)
+        document = json.dumps({"message": message, "stats": stats, "results": metadata})
+        cursor = self.connection.execute(
+            "UPDATE jobs SET state = 'done', outcome = ?, metadata = ?, results = ? "
+            "WHERE id = ? AND worker = ? AND state = 'running'",
+            (outcome, document, blob, job_id, worker),
+        )
+        return cursor.rowcount == 1
+
+    def result(self, job_id: int) -> Optional[QueueResult]:
+        row = self.connection.execute(
+            "SELECT spec, worker, outcome, metadata, results FROM jobs "
+            "WHERE id = ? AND state = 'done'",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        spec, worker, outcome, document, blob = row
+        meta = json.loads(document)
+        return QueueResult(
+            job_id,
+            json.loads(spec)["name"],
+            outcome,
+            meta["message"],
+            worker,
+            meta["stats"],
+            unpack_results(blob, meta["results"]),
+        )
+
+    def pending(self) -> int:
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state != 'done'"
+        ).fetchone()
+        return int(row[0])
+
+
+def run_job(
+    job: QueueJob, ngspice_exe: Path, timeout: int = 20
+) -> tuple[Outcome, str, dict[str, float], dict[str, SimResults]]:
+    """Simulate a job in a scratch workspace (RAM-backed where possible)"""
+    with RunWorkspace(job.name, use_shm=True) as work:
+        analyses = work.rebase(job.analyses)
+        netlist = (
+            Netlist(job.netlist)
+            + Netlist(str(work.control(job.analyses)))
+            + Netlist(".end")
+        )
+        sim = work.simulate(ngspice_exe, netlist, timeout)
+        result = Supervisor(sim, analyses).run()
+        results: dict[str, SimResults] = {}
+        if result.ok:
+            results = {analysis.name: sim.results(analysis) for analysis in analyses}
+        return result.outcome, result.message, result.stats.values, results
+
+
+def work(
+    queue: JobQueue,
+    ngspice_exe: Path,
+    max_jobs: Optional[int] = None,
+    idle_exit: float = 0.0,
+    timeout: int = 20,
+    poll: float = 0.2,
+) -> int:
+    """Worker loop: claim, simulate and finish jobs.
+
+    Args:
+        queue (JobQueue): where jobs come from
+        ngspice_exe (Path): ngspice of this host
+        max_jobs (int): stop after this many jobs
+        idle_exit (float): stop when no job arrived for this many seconds
+        timeout (int): seconds per simulation
+        poll (float): seconds between looks at an empty queue
+
+    Returns:
+        int: number of jobs done
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    idle_since = time.monotonic()
+    while max_jobs is None or done < max_jobs:
+        claimed = queue.claim(worker)
+        if claimed is None:
+            if time.monotonic() - idle_since >= idle_exit:
+                break
+            time.sleep(poll)
+            continue
+        job_id, job = claimed
+        try:
+            outcome, message, stats, results = run_job(job, ngspice_exe, timeout)
+        except (OSError, LookupError, ValueError, subprocess.SubprocessError) as err:
+            # a broken job must not stop the worker
+            outcome, message, stats, results = "error", repr(err), {}, {}
+        queue.finish(job_id, worker, outcome, message, stats, results)
+        done += 1
+        idle_since = time.monotonic()
+    return done
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """command line entry point of a worker"""
+    parser = argparse.ArgumentParser(description="py4spice sweep worker")
+    parser.add_argument("queue", type=Path, help="SQLite queue file")
+    parser.add_argument("--ngspice", type=Path, default=Path("ngspice"))
+    parser.add_argument("--max-jobs", type=int, default=None)
+    parser.add_argument(
+        "--idle-exit", type=float, default=0.0, help="seconds to wait for jobs"
+    )
+    parser.add_argument("--timeout", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    queue = SqliteQueue(args.queue)
+    try:
+        done = work(queue, args.ngspice, args.max_jobs, args.idle_exit, args.timeout)
+    finally:
+        queue.close()
+    print(f"{done} jobs done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
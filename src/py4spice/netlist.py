@@ -1,15 +1,85 @@
+import re
 from pathlib import Path
 from typing import Optional
 
+from .profiling import stage
+
+# SPICE scale factors, longest first so "meg" and "mil" win over "m"
+SCALE_FACTORS: dict[str, float] = {
+    "meg": 1e6,
+    "mil": 25.4e-6,
+    "t": 1e12,
+    "g": 1e9,
+    "k": 1e3,
+    "m": 1e-3,
+    "u": 1e-6,
+    "n": 1e-9,
+    "p": 1e-12,
+    "f": 1e-15,
+}
+# a literal "." first lets re skip ahead; included_files checks the line start
+_INCLUDE = re.compile(r"\.(?i:include|inc|lib)[ \t]+[\"']?([^\"'\s]+)")
+_NUMBER = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmunpf])?")
+
+
+def spice_number(text: str) -> float:
+    """Convert a SPICE number such as "4.7k", "10uF" or "1meg" to a float.
+    Letters after the scale factor (units) are ignored, like ngspice does.
+
+    Raises:
+        ValueError: text does not start with a number
+    """
+    match = _NUMBER.match(text.strip().lower())
+    if match is None:
+        raise ValueError(f"not a SPICE number: {text!r}")
+    value = float(match.group(1))
+    if match.group(2) is not None:
+        value *= SCALE_FACTORS[match.group(2)]
+    return value
+
+
+def included_files(text: str, directory: Path) -> list[Path]:
+    """Existing files named by .include and .lib lines of text, and the files
+    they include in turn, resolved like ngspice: relative to the directory of
+    the including file. Each file is listed and read once, so include cycles
+    end."""
+    found: dict[Path, None] = {}
+    pending = [(text, directory)]
+    while pending:
+        text, directory = pending.pop(0)
+        for match in _INCLUDE.finditer(text):
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            if text[line_start : match.start()].strip(" \t"):
+                continue  # not a dot command
+            path = directory / match.group(1)
+            if not path.is_file():
+                continue
+            resolved = path.resolve()
+            if resolved not in found:
+                found[resolved] = None
+                pending.append((resolved.read_text(errors="replace"), resolved.parent))
+    return list(found)
+
 
 class Netlist:
     """Manipulates SPICE netlists"""
 
     def __init__(self, filename_or_string: Optional[Path | str] = None) -> None:
         self.data: list[str] = []
+        # files the netlist was read from or includes, for dependency tracking
+        self.sources: list[Path] = []
         if isinstance(filename_or_string, Path):
-            with open(filename_or_string, "r") as file:
-                self.data = [line.rstrip("\n").lower() for line in file.readlines()]
+            with stage("netlist.read", file=str(filename_or_string)) as rec:
+                with open(filename_or_string, "r") as file:
+                    text = file.read()
+                self.data = text.lower().split("\n") if text else []
+                if text.endswith("\n"):
+                    del self.data[-1]
+                rec.add(bytes_read=len(text), rows=len(self.data))
+            source = filename_or_string.resolve()
+            # before lowercasing, file names are case-sensitive
+            includes = included_files(text, filename_or_string.parent)
+            self.sources = list(dict.fromkeys([source] + includes))
         if isinstance(filename_or_string, str):
             self.data = filename_or_string.lower().split("\n")
 
@@ -18,13 +88,20 @@ class Netlist:
 
     def write_to_file(self, filename: Path) -> None:
         """ "Write netlist object data to a file"""
-        with open(filename, "w") as file:
-            file.write("\n".join(self.data))
+        with stage("netlist.write", file=str(filename)) as rec:
+            text = "\n".join(self.data)
+            with open(filename, "w") as file:
+                file.write(text)
+            rec.add(bytes_written=len(text), rows=len(self.data))
 
     def __add__(self, other: "Netlist") -> "Netlist":
         """Concatenate netlists with + operator"""
-        combined_data = self.data + other.data
-        return Netlist("\n".join(combined_data))
+        with stage("netlist.add") as rec:
+            combined_data = self.data + other.data
+            rec.add(rows=len(combined_data))
+            combined = Netlist("\n".join(combined_data))
+            combined.sources = list(dict.fromkeys(self.sources + other.sources))
+            return combined
 
     def delete_line(self, index: int) -> None:
         del self.data[index]
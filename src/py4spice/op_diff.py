@@ -0,0 +1,145 @@
+"""Compare operating points (or any table results) of many runs at once.
+
+The tables of all runs are aligned by name into one 2D array, one row per
+run, NaN where a run lacks a name. Deltas against a reference run, the
+tolerance test and the ranking are whole-array operations, so 100 corners of
+50k nodes and device currents take seconds, not minutes.
+
+    diff = OpDiff([op_typ, op_slow, op_fast], labels=["typ", "slow", "fast"])
+    print_section("op differences", diff.report(limit=30))
+"""
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .globals_types import numpy_flt
+from .sim_results import SimResults
+from .table_data import TableData, aligned_columns, eng_format
+
+
+def _as_table(run: SimResults | Mapping[str, float]) -> TableData:
+    if isinstance(run, SimResults):
+        return run.data_table
+    return TableData.from_mapping(run)
+
+
+def align(
+    tables: Sequence[TableData],
+) -> tuple[npt.NDArray[np.str_], numpy_flt]:
+    """Union of the names of tables (first-seen order) and their values.
+
+    Names are placed through a hash index of the union. Tables with the same
+    names in the same order as the previous one (corners of one netlist)
+    reuse its positions.
+
+    Returns:
+        tuple[NDArray[str_], numpy_flt]: names, values with one row per table
+        and NaN where a table has no such name
+    """
+    index: dict[str, int] = {}
+    for number, table in enumerate(tables):
+        if number and np.array_equal(table.name_array, tables[number - 1].name_array):
+            continue  # nothing new
+        for name in table.name_array.tolist():
+            index.setdefault(name, len(index))
+
+    values = np.full((len(tables), len(index)), np.nan)
+    previous: Optional[npt.NDArray[np.str_]] = None
+    positions = np.zeros(0, dtype=np.intp)
+    for row, table in enumerate(tables):
+        if previous is None or not np.array_equal(table.name_array, previous):
+            names = table.name_array.tolist()
+            positions = np.fromiter(map(index.__getitem__, names), np.intp, len(names))
+            previous = table.name_array
+        values[row, positions] = table.value_array
+    return np.array(list(index), dtype=np.str_), values
+
+
+class OpDiff:
+    """Deltas of many runs against a reference run.
+
+    An entry is out of tolerance in a run when
+    |value - reference| > atol + rtol * |reference|, like numpy.isclose, or
+    when it exists in only one of the two.
+    """
+
+    def __init__(
+        self,
+        runs: Sequence[SimResults | Mapping[str, float]],
+        labels: Optional[list[str]] = None,
+        reference: int = 0,
+        rtol: float = 1e-3,
+        atol: float = 1e-9,
+    ) -> None:
+        """
+        Args:
+            runs: op (tf, sens) results: SimResults, TableData or dicts
+            labels (list[str]): run names for the report, default run0, run1 ...
+            reference (int): index of the run the others are compared to
+            rtol (float): relative tolerance
+            atol (float): absolute tolerance, in the units of each entry
+        """
+        self.labels = labels or [f"run{i}" for i in range(len(runs))]
+        if len(self.labels) != len(runs):
+            raise ValueError("need one label per run")
+        self.reference = reference
+        self.rtol = rtol
+        self.atol = atol
+        self.names, self.values = align([_as_table(run) for run in runs])
+
+        ref = self.values[reference]
+        self.delta: numpy_flt = self.values - ref
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.relative: numpy_flt = self.delta / np.abs(ref)
+        allowed = atol + rtol * np.abs(ref)
+        with np.errstate(invalid="ignore"):
+            # how many times the tolerance each delta is; inf if one side is missing
+            excess = np.abs(self.delta) / allowed
+        missing = np.isnan(self.values) != np.isnan(ref)
+        self.excess: numpy_flt = np.where(missing, np.inf, np.nan_to_num(excess))
+        self.out_of_tolerance: npt.NDArray[np.bool_] = self.excess > 1.0
+
+    def flagged(self) -> list[str]:
+        """names out of tolerance in at least one run, worst first"""
+        worst = self.excess.max(axis=0)
+        order = np.argsort(-worst, kind="stable")
+        order = order[worst[order] > 1.0]
+        flagged: list[str] = self.names[order].tolist()
+        return flagged
+
+    def run_summary(self) -> dict[str, int]:
+        """number of entries out of tolerance per run"""
+        counts = self.out_of_tolerance.sum(axis=1)
+        return dict(zip(self.labels, counts.tolist()))
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """Entries out of tolerance, worst first: name, reference value, the
+        run with the largest excess, its value and deltas.
+
+        Args:
+            limit (int): at most this many entries, None for all
+
+        Returns:
+            str: aligned table, one entry per line
+        """
+        worst_run = self.excess.argmax(axis=0)
+        worst = self.excess[worst_run, np.arange(self.names.size)]
+        order = np.argsort(-worst, kind="stable")
+        order = order[worst[order] > 1.0][:limit]
+        if order.size == 0:
+            return "no differences out of tolerance\n"
+
+        runs = worst_run[order]
+        relative = self.relative[runs, order] * 100
+        columns = [
+            self.names[order],
+            eng_format(self.values[self.reference, order]),
+            np.array(self.labels, dtype=np.str_)[runs],
+            eng_format(self.values[runs, order]),
+            eng_format(self.delta[runs, order]),
+            np.char.mod("%.3g%%", relative),
+        ]
+        header = ["name", self.labels[self.reference], "run", "value", "delta", "rel"]
+        return aligned_columns(header, columns)
@@ -0,0 +1,194 @@
+"""Measurements of periodic signals from transient results"""
+
+from functools import cached_property
+from typing import Callable, Optional
+
+import numpy as np
+
+from .globals_types import numpy_flt
+from .resample import Resampler
+
+# windows applied before the FFT
+WINDOWS: dict[str, Callable[[int], numpy_flt]] = {
+    "rect": np.ones,
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+}
+
+
+class PeriodicInfo:
+    """Measurements of one or more periodic signals that share an x-axis.
+
+    The signals are resampled once onto npts evenly spaced points between xbegin
+    and xend, then all columns go through one windowed numpy.fft.rfft call.
+    Every measurement returns one value per signal (column).
+    """
+
+    def __init__(
+        self,
+        x_array_in: numpy_flt,
+        y_arrays_in: numpy_flt,
+        xbegin: float,
+        xend: float,
+        npts: Optional[int] = None,
+        window: str = "hann",
+    ) -> None:
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of {list(WINDOWS)}")
+        self.xbegin = xbegin
+        self.xend = xend
+        self.window = window
+        self.harmonics = 10  # highest harmonic included in thd
+
+        x_in = np.asarray(x_array_in, dtype=np.float64)
+        y_in = np.asarray(y_arrays_in, dtype=np.float64)
+        if y_in.ndim == 1:
+            y_in = y_in[:, np.newaxis]
+
+        # default: as many points as the simulator produced inside the range
+        if npts is None:
+            inside = np.searchsorted(x_in, [xbegin, xend])
+            npts = max(int(inside[1] - inside[0]), 16)
+        self.npts = npts
+
+        self.x_array_lin: numpy_flt = np.linspace(xbegin, xend, npts)
+        self.y_array_lin: numpy_flt = Resampler(x_in, self.x_array_lin)(y_in)
+
+    @property
+    def signal_count(self) -> int:
+        """number of signals (columns) measured"""
+        return int(self.y_array_lin.shape[1])
+
+    @property
+    def x_step(self) -> float:
+        """spacing of the evenly spaced points"""
+        return float(self.x_array_lin[1] - self.x_array_lin[0])
+
+    @property
+    def ymin(self) -> numpy_flt:
+        """minimum of each signal"""
+        result: numpy_flt = self.y_array_lin.min(axis=0)
+        return result
+
+    @property
+    def ymax(self) -> numpy_flt:
+        """maximum of each signal"""
+        result: numpy_flt = self.y_array_lin.max(axis=0)
+        return result
+
+    @property
+    def ripple(self) -> numpy_flt:
+        """peak-to-peak value of each signal"""
+        return self.ymax - self.ymin
+
+    @cached_property
+    def average(self) -> numpy_flt:
+        """mean value of each signal"""
+        result: numpy_flt = self.y_array_lin.mean(axis=0)
+        return result
+
+    @property
+    def rms(self) -> numpy_flt:
+        """root mean square of each signal (dc included)"""
+        result: numpy_flt = np.sqrt(np.mean(self.y_array_lin**2, axis=0))
+        return result
+
+    @property
+    def ac_rms(self) -> numpy_flt:
+        """root mean square of each signal with the average removed"""
+        result: numpy_flt = self.y_array_lin.std(axis=0)
+        return result
+
+    @property
+    def duty_cycle(self) -> numpy_flt:
+        """fraction of the time each signal is above halfway of its range"""
+        mid = (self.ymin + self.ymax) / 2
+        result: numpy_flt = np.mean(self.y_array_lin > mid, axis=0)
+        return result
+
+    @cached_property
+    def spectrum(self) -> tuple[numpy_flt, numpy_flt]:
+        """Amplitude spectrum of every signal
+
+        Returns:
+            tuple[numpy_flt, numpy_flt]: frequencies and amplitudes (one column
+            per signal). Amplitudes are corrected for the window, so a sine
+            of amplitude A shows as A in its bin. Bin 0 is the average.
+        """
+        window = WINDOWS[self.window](self.npts)
+        data = self.y_array_lin - self.average
+        data *= window[:, np.newaxis]
+        amplitude: numpy_flt = np.abs(np.fft.rfft(data, axis=0))
+        amplitude *= 2.0 / window.sum()
+        amplitude[0] = np.abs(self.average)
+        freqs: numpy_flt = np.fft.rfftfreq(self.npts, self.x_step).astype(np.float64)
+        return freqs, amplitude
+
+    @cached_property
+    def _fundamental(self) -> tuple[numpy_flt, numpy_flt]:
+        """fundamental frequency and its (fractional) bin for each signal"""
+        freqs, amplitude = self.spectrum
+        cols = np.arange(self.signal_count)
+        peak = np.argmax(amplitude[1:], axis=0) + 1  # skip the dc bin
+
+        # refine the peak with a parabola through log amplitudes
+        below = np.log(amplitude[peak - 1, cols] + 1e-300)
+        center = np.log(amplitude[peak, cols] + 1e-300)
+        above = np.log(amplitude[np.minimum(peak + 1, freqs.size - 1), cols] + 1e-300)
+        den = below - 2 * center + above
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offset = np.where(den < 0, 0.5 * (below - above) / den, 0.0)
+        fractional_bin = peak + np.clip(offset, -0.5, 0.5)
+        return fractional_bin * (freqs[1] - freqs[0]), fractional_bin
+
+    @property
+    def frequency(self) -> numpy_flt:
+        """fundamental frequency of each signal"""
+        return self._fundamental[0]
+
+    @property
+    def period(self) -> numpy_flt:
+        """period of the fundamental of each signal"""
+        result: numpy_flt = 1.0 / self.frequency
+        return result
+
+    @property
+    def thd(self) -> numpy_flt:
+        """total harmonic distortion (ratio, not percent) of each signal,
+        using harmonics 2 through self.harmonics"""
+        _, amplitude = self.spectrum
+        fundamental_bin = self._fundamental[1]
+        nbins = amplitude.shape[0]
+        cols = np.arange(self.signal_count)
+
+        # bins of each harmonic, one row per harmonic
+        orders = np.arange(1, self.harmonics + 1)[:, np.newaxis]
+        centers = np.rint(orders * fundamental_bin).astype(int)
+
+        # window leakage spreads a tone over neighbouring bins, take the largest
+        levels = np.zeros(centers.shape)
+        for offset in (-1, 0, 1):
+            bins = centers + offset
+            valid = (bins > 0) & (bins < nbins)
+            found = amplitude[np.clip(bins, 0, nbins - 1), cols]
+            levels = np.maximum(levels, np.where(valid, found, 0.0))
+
+        harmonic_power = np.sum(levels[1:] ** 2, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result: numpy_flt = np.sqrt(harmonic_power) / levels[0]
+        return result
+
+    def measurements(self) -> dict[str, numpy_flt]:
+        """All summary measurements in a dictionary"""
+        return {
+            "average": self.average,
+            "rms": self.rms,
+            "ac_rms": self.ac_rms,
+            "ripple": self.ripple,
+            "ymin": self.ymin,
+            "ymax": self.ymax,
+            "frequency": self.frequency,
+            "duty_cycle": self.duty_cycle,
+            "thd": self.thd,
+        }
@@ -1,80 +1,53 @@
 """Matplotlib plot of numpy results from simulation"""
 
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Optional
 
 import matplotlib.figure as fig
 import matplotlib.pyplot as plt
-from cycler import cycler
 from matplotlib.axes import Axes
 
+from . import decimate
 from .globals_types import numpy_flt
+from .profiling import is_profiling, stage
+from .render import (
+    FIG_SIZE,
+    OSCILLOSCOPE_STYLE,
+    Scale,
+    draw_traces,
+    label_axes,
+    pixel_width,
+)
 
-# type aliases
-Scale = Literal["linear", "log"]
-
-# size of figures to display. set size to match screen monitor size
-FIG_SIZE: tuple[float, float] = (16, 8)
+# backends that never show a window: a saved figure is not needed any more
+NON_INTERACTIVE_BACKENDS = ("agg", "cairo", "pdf", "pgf", "ps", "svg", "template")
 
 
 def oscilloscope_colors() -> None:
     """Set style properties to look like dark oscilloscope screen"""
-
-    plt.rcParams["lines.color"] = "#d8b200"
-    plt.rcParams["patch.edgecolor"] = "#d8b200"
-
-    plt.rcParams["text.color"] = "#d8b200"
-
-    plt.rcParams["axes.facecolor"] = "black"
-    plt.rcParams["axes.edgecolor"] = "#d8b200"
-    plt.rcParams["axes.labelcolor"] = "#d8b200"
-
-    plt.rcParams["axes.prop_cycle"] = cycler(
-        color=["#00FF00", "#00ffff", "#ff00ff", "#ffd200"]
-    )
-
-    plt.rcParams["axes.grid"] = True
-    plt.rcParams["axes.grid.axis"] = "both"
-    plt.rcParams["grid.linestyle"] = "dotted"
-    plt.rcParams["xtick.minor.visible"] = True
-    plt.rcParams["ytick.minor.visible"] = True
-
-    plt.rcParams["xtick.color"] = "#d8b200"
-    plt.rcParams["ytick.color"] = "#d8b200"
-
-    plt.rcParams["grid.color"] = "#d8b200"
-
-    plt.rcParams["figure.facecolor"] = "#282828"
-    plt.rcParams["figure.edgecolor"] = "black"
-
-    plt.rcParams["savefig.facecolor"] = "black"
-    plt.rcParams["savefig.edgecolor"] = "black"
-
-    plt.rcParams["legend.edgecolor"] = "#d8b200"
-    plt.rcParams["legend.facecolor"] = "#282828"
-
-    plt.rcParams["boxplot.boxprops.color"] = "white"
-    plt.rcParams["boxplot.capprops.color"] = "white"
-    plt.rcParams["boxplot.flierprops.color"] = "white"
-    plt.rcParams["boxplot.flierprops.markeredgecolor"] = "white"
-    plt.rcParams["boxplot.whiskerprops.color"] = "white"
+    plt.rcParams.update(OSCILLOSCOPE_STYLE)  # type: ignore
 
 
 def create_plot(
-    x_data: numpy_flt, y_data: list[numpy_flt], y_names: list[str]
+    x_data: numpy_flt,
+    y_data: list[numpy_flt],
+    y_names: list[str],
+    decimated: bool = True,
 ) -> tuple[fig.Figure, Axes]:
-    """Create line plot from simulation results"""
+    """Create line plot from simulation results. If decimated, each trace is
+    reduced to the min/max points of every pixel column before plotting."""
 
-    # set style to look like an oscilloscope
-    oscilloscope_colors()
+    with stage("plot.create") as rec:
+        # set style to look like an oscilloscope
+        oscilloscope_colors()
 
-    fig_axe: tuple[fig.Figure, Axes] = plt.subplots(figsize=FIG_SIZE)  # type: ignore
-    axe: Axes = fig_axe[1]
+        fig_axe: tuple[fig.Figure, Axes] = plt.subplots(figsize=FIG_SIZE)  # type: ignore
+        axe: Axes = fig_axe[1]
 
-    for index, y_array in enumerate(y_data):
-        axe.plot(x_data, y_array, label=y_names[index])  # type: ignore
+        draw_traces(axe, x_data, y_data, y_names, pixel_width(fig_axe[0]), decimated)
 
-    plt.legend(title="Signals:")  # type: ignore
+        plt.legend(title="Signals:")  # type: ignore
+        rec.add(rows=x_data.size * len(y_data))
 
     return fig_axe
 
@@ -88,17 +61,35 @@ class Plot:
         signals: list[numpy_flt],
         sig_names: list[str],
         results_path: Path,
+        decimated: bool = True,
     ) -> None:
         self.name = name
         self.signals = signals
         self.sig_names = sig_names
         self.results_path: Path = results_path
+        self.decimated: bool = decimated and decimate.is_sorted(signals[0])
 
         # create initial plot
-        self.fig_axe = create_plot(self.signals[0], self.signals[1:], self.sig_names)
+        self.fig_axe = create_plot(
+            self.signals[0], self.signals[1:], self.sig_names, self.decimated
+        )
         self.fig: fig.Figure = self.fig_axe[0]
         self.axe: Axes = self.fig_axe[1]
 
+    def redecimate(self) -> None:
+        """Decimate the traces again for the current x-axis limits and scale.
+        Called after the visible range changes so zoomed-in detail is kept."""
+        if not self.decimated:
+            return
+        x_lo, x_hi = self.axe.get_xlim()
+        log = self.axe.get_xscale() == "log"
+        buckets = pixel_width(self.fig)
+        for line, y_array in zip(self.axe.get_lines(), self.signals[1:]):
+            x_plot, y_plot = decimate.minmax(
+                self.signals[0], y_array, x_lo, x_hi, buckets, log
+            )
+            line.set_data(x_plot, y_plot)
+
     def set_title(self, title: str) -> None:
         """title for plot"""
         self.axe.set_title(title)  # type: ignore
@@ -112,21 +103,8 @@ class Plot:
             x_info (tuple[str, str, Scale]): (measure, units, scale)
             y_info (tuple[str, str, Scale]): (measure, units, scale)
         """
-        x_measure = x_info[0]
-        y_measure = y_info[0]
-        x_units = x_info[1]
-        y_units = y_info[1]
-        x_scale: Scale = x_info[2]
-        if x_scale not in ["linear", "log"]:
-            x_scale = "linear"
-        y_scale: Scale = y_info[2]
-        if y_scale not in ["linear", "log"]:
-            y_scale = "linear"
-
-        self.axe.set_xlabel(f"{x_measure} ({x_units})")  # type: ignore
-        self.axe.set_ylabel(f"{y_measure} ({y_units})")  # type: ignore
-        self.axe.set_xscale(x_scale)  # type: ignore
-        self.axe.set_yscale(y_scale)  # type: ignore
+        label_axes(self.axe, x_info, y_info)
+        self.redecimate()
 
     def zoom(
         self,
@@ -146,10 +124,25 @@ class Plot:
         if ymax is not None:
             self.axe.set_ylim(top=ymax)
 
+        if xmin is not None or xmax is not None:
+            self.redecimate()
+
     def png(self) -> None:
-        """Create a png of the plot and store in the "results_loc" dir"""
+        """Create a png of the plot and store in the "results_loc" dir. With
+        a non-interactive backend (headless batch runs) the figure is closed
+        afterwards, so pyplot does not pile up figures; otherwise it is kept
+        for display_plots()."""
         plot_filename: Path = self.results_path / f"{self.name}.png"
-        self.fig.savefig(str(plot_filename))  # type: ignore
+        with stage("plot.png", file=str(plot_filename)) as rec:
+            self.fig.savefig(str(plot_filename))  # type: ignore
+            if is_profiling():
+                rec.add(bytes_written=plot_filename.stat().st_size)
+        if plt.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+            self.close()
+
+    def close(self) -> None:
+        """Release the figure from pyplot once it is no longer needed"""
+        plt.close(self.fig)
 
 
 def display_plots() -> None:
@@ -0,0 +1,228 @@
+"""Opt-in timing of the stages of a simulation flow.
+
+Netlist assembly, file writes, the ngspice run, result parsing, resampling and
+plotting each record a stage when a Collector is active:
+
+    with spi.profile() as prof:
+        ...  # build netlists, simulate, load results, plot
+    print(prof.summary())
+    prof.to_chrome_trace(Path("trace.json"))  # open in chrome://tracing
+
+When no collector is active a stage costs one global lookup and returns a
+shared record that counts nothing.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator, Optional
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+
+def _children_cpu() -> float:
+    """CPU seconds used by finished child processes (ngspice)"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return float(usage.ru_utime + usage.ru_stime)
+
+
+class StageRecord:
+    """Time and data volume of one stage"""
+
+    def __init__(self, name: str, args: dict[str, Any]) -> None:
+        self.name = name
+        self.args = args  # extra details, shown in the trace viewer
+        self.start = 0.0  # perf_counter seconds
+        self.wall = 0.0  # seconds
+        self.cpu = 0.0  # seconds of this thread
+        self.child_cpu = 0.0  # seconds of child processes that finished
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.rows = 0
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    def add(self, bytes_read: int = 0, bytes_written: int = 0, rows: int = 0) -> None:
+        """count data handled by the stage"""
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+        self.rows += rows
+
+
+class Collector:
+    """Collects StageRecords from every thread while profiling is on"""
+
+    def __init__(self) -> None:
+        self.records: list[StageRecord] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def append(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def totals(self) -> dict[str, dict[str, float]]:
+        """sums per stage name, in order of first appearance"""
+        totals: dict[str, dict[str, float]] = {}
+        for rec in self.records:
+            total = totals.setdefault(
+                rec.name,
+                dict.fromkeys(
+                    ("calls", "wall", "cpu", "child_cpu", "read", "written", "rows"),
+                    0.0,
+                ),
+            )
+            total["calls"] += 1
+            total["wall"] += rec.wall
+            total["cpu"] += rec.cpu
+            total["child_cpu"] += rec.child_cpu
+            total["read"] += rec.bytes_read
+            total["written"] += rec.bytes_written
+            total["rows"] += rec.rows
+        return totals
+
+    def summary(self) -> str:
+        """table of the totals per stage, slowest first"""
+        totals = sorted(self.totals().items(), key=lambda item: -item[1]["wall"])
+        width = max([len(name) for name, _ in totals] + [5])
+        lines = [
+            (
+                f"{'stage':<{width}} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} "
+                f"{'child ms':>10} {'read MB':>9} {'write MB':>9} {'rows':>10}"
+            )
+        ]
+        for name, total in totals:
+            lines.append(
+                f"{name:<{width}} {int(total['calls']):>6} "
+                f"{total['wall'] * 1e3:>10.2f} {total['cpu'] * 1e3:>10.2f} "
+                f"{total['child_cpu'] * 1e3:>10.2f} {total['read'] / 1e6:>9.3f} "
+                f"{total['written'] / 1e6:>9.3f} {int(total['rows']):>10}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """records as Chrome trace events ("X" complete events, microseconds)"""
+        events = []
+        for rec in self.records:
+            args = dict(rec.args)
+            args.update(
+                cpu_ms=rec.cpu * 1e3,
+                child_cpu_ms=rec.child_cpu * 1e3,
+                bytes_read=rec.bytes_read,
+                bytes_written=rec.bytes_written,
+                rows=rec.rows,
+            )
+            events.append(
+                {
+                    "name": rec.name,
+                    "cat": rec.name.split(".")[0],
+                    "ph": "X",
+                    "ts": (rec.start - self.origin) * 1e6,
+                    "dur": rec.wall * 1e6,
+                    "pid": rec.pid,
+                    "tid": rec.tid,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_chrome_trace(self, filename: Path) -> None:
+        """write the trace JSON, viewable in chrome://tracing or Perfetto"""
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+# collector that stages record into, None when profiling is off
+_ACTIVE: Optional[Collector] = None
+
+
+class _Stage:
+    """context manager that times a stage into the active collector"""
+
+    def __init__(self, collector: Collector, record: StageRecord) -> None:
+        self.collector = collector
+        self.record = record
+        self._child_cpu = 0.0
+
+    def __enter__(self) -> StageRecord:
+        self._child_cpu = _children_cpu()
+        self.record.cpu = time.thread_time()
+        self.record.start = time.perf_counter()
+        return self.record
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        rec = self.record
+        rec.wall = time.perf_counter() - rec.start
+        rec.cpu = time.thread_time() - rec.cpu
+        rec.child_cpu = _children_cpu() - self._child_cpu
+        if exc_type is not None:
+            rec.args["error"] = exc_type.__name__
+        self.collector.append(rec)
+
+
+class _NullRecord(StageRecord):
+    """record handed out when profiling is off: counts nothing"""
+
+    def add(self, bytes_read: int = 0, bytes_written: int = 0, rows: int = 0) -> None:
+        return None
+
+
+_NULL_RECORD = _NullRecord("", {})
+
+
+class _NullStage:
+    """stand-in when profiling is off"""
+
+    def __enter__(self) -> StageRecord:
+        return _NULL_RECORD
+
+    def __exit__(self, *args: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, /, **args: Any) -> _Stage | _NullStage:
+    """Time a block as a stage if profiling is on:
+
+    with stage("netlist.write", file=str(filename)) as rec:
+        ...
+        rec.add(bytes_written=size)
+    """
+    collector = _ACTIVE
+    if collector is None:
+        return _NULL_STAGE
+    return _Stage(collector, StageRecord(name, args))
+
+
+def is_profiling() -> bool:
+    """True while a collector is active"""
+    return _ACTIVE is not None
+
+
+@contextmanager
+def profile(collector: Optional[Collector] = None) -> Iterator[Collector]:
+    """Turn on profiling for the block, recording into collector (or a new one).
+    Stages from every thread of this process are recorded."""
+    global _ACTIVE
+    previous = _ACTIVE
+    _ACTIVE = collector if collector is not None else Collector()
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = previous
@@ -0,0 +1,223 @@
+"""Headless rendering of many plots to png files.
+
+Figures are created with the object-oriented matplotlib API on the Agg canvas,
+so no pyplot global state is touched and nothing has to be closed through
+pyplot. The oscilloscope style is applied with a style context once per batch.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import matplotlib as mpl
+from cycler import cycler
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from . import decimate
+from .globals_types import numpy_flt
+from .profiling import is_profiling, stage
+
+# type aliases
+Scale = Literal["linear", "log"]
+Limits = tuple[Optional[float], Optional[float], Optional[float], Optional[float]]
+
+# size of figures to display. set size to match screen monitor size
+FIG_SIZE: tuple[float, float] = (16, 8)
+
+# style properties to look like dark oscilloscope screen
+OSCILLOSCOPE_STYLE: dict[str, Any] = {
+    "lines.color": "#d8b200",
+    "patch.edgecolor": "#d8b200",
+    "text.color": "#d8b200",
+    "axes.facecolor": "black",
+    "axes.edgecolor": "#d8b200",
+    "axes.labelcolor": "#d8b200",
+    "axes.prop_cycle": cycler(color=["#00FF00", "#00ffff", "#ff00ff", "#ffd200"]),
+    "axes.grid": True,
+    "axes.grid.axis": "both",
+    "grid.linestyle": "dotted",
+    "xtick.minor.visible": True,
+    "ytick.minor.visible": True,
+    "xtick.color": "#d8b200",
+    "ytick.color": "#d8b200",
+    "grid.color": "#d8b200",
+    "figure.facecolor": "#282828",
+    "figure.edgecolor": "black",
+    "savefig.facecolor": "black",
+    "savefig.edgecolor": "black",
+    "legend.edgecolor": "#d8b200",
+    "legend.facecolor": "#282828",
+    "boxplot.boxprops.color": "white",
+    "boxplot.capprops.color": "white",
+    "boxplot.flierprops.color": "white",
+    "boxplot.flierprops.markeredgecolor": "white",
+    "boxplot.whiskerprops.color": "white",
+}
+
+
+def pixel_width(figure: Figure) -> int:
+    """width of the figure in pixels, the most x positions a trace can show"""
+    return int(figure.get_figwidth() * figure.dpi)
+
+
+def draw_traces(
+    axe: Axes,
+    x_data: numpy_flt,
+    y_data: list[numpy_flt],
+    y_names: list[str],
+    buckets: int,
+    decimated: bool = True,
+    log: bool = False,
+) -> None:
+    """Add a line for each y array. If decimated, each trace is reduced to the
+    min/max points of every pixel column (bucket) before plotting. Buckets are
+    evenly spaced in log10(x) if log."""
+    decimated = decimated and x_data.size > 0 and decimate.is_sorted(x_data)
+    for index, y_array in enumerate(y_data):
+        x_plot, y_plot = x_data, y_array
+        if decimated:
+            x_plot, y_plot = decimate.minmax(
+                x_data, y_array, float(x_data[0]), float(x_data[-1]), buckets, log
+            )
+        axe.plot(x_plot, y_plot, label=y_names[index])  # type: ignore
+
+
+def label_axes(
+    axe: Axes, x_info: tuple[str, str, Scale], y_info: tuple[str, str, Scale]
+) -> None:
+    """Define the x,y axes' labels (measure & units) and scale (linear or log)
+
+    Args:
+        axe (Axes): axes to label
+        x_info (tuple[str, str, Scale]): (measure, units, scale)
+        y_info (tuple[str, str, Scale]): (measure, units, scale)
+    """
+    x_measure = x_info[0]
+    y_measure = y_info[0]
+    x_units = x_info[1]
+    y_units = y_info[1]
+    x_scale: Scale = x_info[2]
+    if x_scale not in ["linear", "log"]:
+        x_scale = "linear"
+    y_scale: Scale = y_info[2]
+    if y_scale not in ["linear", "log"]:
+        y_scale = "linear"
+
+    axe.set_xlabel(f"{x_measure} ({x_units})")  # type: ignore
+    axe.set_ylabel(f"{y_measure} ({y_units})")  # type: ignore
+    axe.set_xscale(x_scale)  # type: ignore
+    axe.set_yscale(y_scale)  # type: ignore
+
+
+class PlotSpec:
+    """Everything needed to render one plot to a png, without creating it yet.
+    Specs only hold data, so they can be sent to worker processes."""
+
+    def __init__(
+        self,
+        name: str,
+        signals: list[numpy_flt],
+        sig_names: list[str],
+        results_path: Path,
+        title: str = "",
+        x_info: tuple[str, str, Scale] = ("x", "", "linear"),
+        y_info: tuple[str, str, Scale] = ("y", "", "linear"),
+        limits: Limits = (None, None, None, None),
+    ) -> None:
+        self.name = name
+        self.signals = signals
+        self.sig_names = sig_names
+        self.results_path: Path = results_path
+        self.title = title
+        self.x_info = x_info
+        self.y_info = y_info
+        self.limits: Limits = limits  # (xmin, xmax, ymin, ymax)
+
+    @property
+    def png_filename(self) -> Path:
+        """full path of the png file"""
+        return self.results_path / f"{self.name}.png"
+
+
+def render_png(spec: PlotSpec) -> Path:
+    """Render one spec to its png file with the current rcParams.
+    Use render_pngs() to render with the oscilloscope style."""
+    with stage("plot.render_png", file=str(spec.png_filename)) as rec:
+        _render_png(spec)
+        if is_profiling():
+            rec.add(bytes_written=spec.png_filename.stat().st_size)
+    return spec.png_filename
+
+
+def _render_png(spec: PlotSpec) -> None:
+    figure = Figure(figsize=FIG_SIZE)
+    FigureCanvasAgg(figure)
+    axe: Axes = figure.subplots()
+
+    # only decimate and draw the points inside the x limits
+    xmin, xmax, ymin, ymax = spec.limits
+    x_data, y_data = _visible(spec.signals[0], spec.signals[1:], xmin, xmax)
+
+    log = spec.x_info[2] == "log"
+    draw_traces(axe, x_data, y_data, spec.sig_names, pixel_width(figure), log=log)
+    axe.legend(title="Signals:")  # type: ignore
+    axe.set_title(spec.title)  # type: ignore
+    label_axes(axe, spec.x_info, spec.y_info)
+    if xmin is not None or xmax is not None:
+        axe.set_xlim(left=xmin, right=xmax)
+    if ymin is not None or ymax is not None:
+        axe.set_ylim(bottom=ymin, top=ymax)
+
+    figure.savefig(str(spec.png_filename))  # type: ignore
+    figure.clear()  # release the artists (and their data) right away
+
+
+def _visible(
+    x_data: numpy_flt,
+    y_data: list[numpy_flt],
+    xmin: Optional[float],
+    xmax: Optional[float],
+) -> tuple[numpy_flt, list[numpy_flt]]:
+    """x-axis and traces limited to xmin..xmax, plus one point on each side"""
+    if x_data.size == 0 or not decimate.is_sorted(x_data):
+        return x_data, y_data
+    start, stop = 0, x_data.size
+    if xmin is not None:
+        start = max(int(x_data.searchsorted(xmin, side="left")) - 1, 0)
+    if xmax is not None:
+        stop = min(int(x_data.searchsorted(xmax, side="right")) + 1, x_data.size)
+    return x_data[start:stop], [y_array[start:stop] for y_array in y_data]
+
+
+def _render_chunk(specs: list[PlotSpec]) -> list[Path]:
+    """render a list of specs, applying the style once"""
+    with mpl.rc_context(OSCILLOSCOPE_STYLE):  # type: ignore
+        return [render_png(spec) for spec in specs]
+
+
+def render_pngs(specs: list[PlotSpec], workers: int = 1) -> list[Path]:
+    """Render all specs to png files with the oscilloscope style.
+
+    Args:
+        specs (list[PlotSpec]): plots to render
+        workers (int): number of processes. 1 renders in this process.
+
+    Returns:
+        list[Path]: png filenames, in the same order as specs
+    """
+    if workers <= 1 or len(specs) <= 1:
+        return _render_chunk(specs)
+
+    # one chunk per worker so each process applies the style once
+    workers = min(workers, len(specs))
+    chunks = [specs[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = list(pool.map(_render_chunk, chunks))
+
+    # put the filenames back in the order of specs
+    filenames: list[Path] = [Path()] * len(specs)
+    for i, chunk in enumerate(rendered):
+        filenames[i::workers] = chunk
+    return filenames
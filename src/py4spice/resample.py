@@ -0,0 +1,155 @@
+"""Resample waveforms from one x-axis onto another"""
+
+from typing import Optional
+
+import numpy as np
+
+from .globals_types import numpy_flt
+
+# columns interpolated per block, limits the size of temporary arrays
+BLOCK_COLUMNS: int = 64
+
+
+class Resampler:
+    """Linear interpolation from x_in onto x_out.
+
+    ngspice transient results have non-uniform timesteps. The neighbouring
+    points and weights are found once (np.searchsorted) and then reused for
+    every column resampled, so many signals cost one search. Points outside
+    x_in are held at the first/last value, like np.interp.
+    """
+
+    def __init__(self, x_in: numpy_flt, x_out: numpy_flt) -> None:
+        self.x_in: numpy_flt = np.asarray(x_in, dtype=np.float64)
+        self.x_out: numpy_flt = np.asarray(x_out, dtype=np.float64)
+        if self.x_in.size < 2:
+            raise ValueError("x_in needs at least two points to interpolate")
+
+        index = np.searchsorted(self.x_in, self.x_out, side="right") - 1
+        self.index: np.ndarray = np.clip(index, 0, self.x_in.size - 2)
+
+        x_lo = self.x_in[self.index]
+        x_step = self.x_in[self.index + 1] - x_lo
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(x_step > 0, (self.x_out - x_lo) / x_step, 0.0)
+        self.weight: numpy_flt = np.clip(weight, 0.0, 1.0)
+
+    @property
+    def npts(self) -> int:
+        """number of points in the resampled x-axis"""
+        return int(self.x_out.size)
+
+    def __call__(self, y_in: numpy_flt) -> numpy_flt:
+        """Resample y_in (1D, or 2D with one column per signal) onto x_out
+
+        Args:
+            y_in (numpy_flt): values at x_in, one row per x_in point
+
+        Returns:
+            numpy_flt: values at x_out, same number of columns as y_in
+        """
+        y_in = np.asarray(y_in)
+        if not np.issubdtype(y_in.dtype, np.floating):
+            y_in = y_in.astype(np.float64)
+        if y_in.shape[0] != self.x_in.size:
+            raise ValueError("y_in must have one row per x_in point")
+        if y_in.ndim == 1:
+            return self._block(y_in[:, np.newaxis])[:, 0]
+
+        y_out = np.empty((self.npts, y_in.shape[1]), dtype=y_in.dtype)
+        for start in range(0, y_in.shape[1], BLOCK_COLUMNS):
+            stop = start + BLOCK_COLUMNS
+            y_out[:, start:stop] = self._block(y_in[:, start:stop])
+        return y_out
+
+    def _block(self, y_in: numpy_flt) -> numpy_flt:
+        """interpolate a 2D block of columns"""
+        y_lo: numpy_flt = y_in[self.index]
+        y_hi: numpy_flt = y_in[self.index + 1]
+        y_hi -= y_lo
+        y_hi *= self.weight[:, np.newaxis]
+        y_lo += y_hi
+        return y_lo
+
+
+def uniform(
+    x_in: numpy_flt, y_in: numpy_flt, x_begin: float, x_end: float, npts: int
+) -> tuple[numpy_flt, numpy_flt]:
+    """Resample onto npts evenly spaced points from x_begin to x_end
+
+    Args:
+        x_in (numpy_flt): original x-axis
+        y_in (numpy_flt): original values, 1D or one column per signal
+        x_begin (float): first x point
+        x_end (float): last x point
+        npts (int): number of evenly spaced points
+
+    Returns:
+        tuple[numpy_flt, numpy_flt]: new x-axis and resampled values
+    """
+    x_out = np.linspace(x_begin, x_end, npts)
+    return x_out, Resampler(x_in, x_out)(y_in)
+
+
+def adaptive(
+    x_in: numpy_flt,
+    y_in: numpy_flt,
+    rtol: float = 1e-3,
+    atol: float = 0.0,
+    max_points: Optional[int] = None,
+) -> tuple[numpy_flt, numpy_flt]:
+    """Keep the fewest native points whose linear interpolation stays within
+    tolerance of every point of every column.
+
+    Like Ramer-Douglas-Peucker, a segment between kept points is split at its
+    worst point while that point is out of tolerance; every segment is split
+    in the same pass, so a pass is a few whole-array operations and the number
+    of passes grows with log2 of the points kept. Points end up where the
+    signals bend (edges, ringing) and flat stretches keep only their ends.
+
+    Args:
+        x_in (numpy_flt): native x-axis, increasing
+        y_in (numpy_flt): values, 1D or one column per signal
+        rtol (float): allowed error relative to each column's peak-to-peak
+        atol (float): allowed absolute error, if larger
+        max_points (int): stop adding points at this count
+
+    Returns:
+        tuple[numpy_flt, numpy_flt]: kept x-axis and values (native samples,
+        not interpolated)
+    """
+    x_in = np.asarray(x_in)
+    y_in = np.asarray(y_in)
+    y_2d = y_in[:, np.newaxis] if y_in.ndim == 1 else y_in
+    count = x_in.size
+    if count <= 2:
+        return x_in, y_in
+
+    bound = np.maximum(atol, rtol * np.ptp(y_2d, axis=0))
+    bound = np.where(bound > 0, bound, np.inf)  # flat columns never split
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    points = np.arange(count)
+    while max_points is None or keep.sum() < max_points:
+        kept = np.flatnonzero(keep)
+        approx = Resampler(x_in[kept], x_in)(y_2d[kept])
+        approx -= y_2d
+        error: numpy_flt = np.max(np.abs(approx) / bound, axis=1)
+        error[keep] = 0.0
+
+        # worst point of every segment [kept[k], kept[k + 1])
+        segment = np.searchsorted(kept, points, side="right") - 1
+        worst = np.maximum.reduceat(error, kept[:-1])
+        split = np.flatnonzero(
+            (error > 1.0) & (error == worst[np.minimum(segment, worst.size - 1)])
+        )
+        if split.size == 0:
+            break
+        _, first = np.unique(segment[split], return_index=True)
+        new = split[first]  # one point per segment
+        if max_points is not None and keep.sum() + new.size > max_points:
+            room = max_points - int(keep.sum())
+            new = new[np.argsort(error[new])[::-1][:room]]
+        keep[new] = True
+
+    return x_in[keep], y_in[keep]
@@ -0,0 +1,205 @@
+"""Parallel batches ordered by estimated cost, with work stealing.
+
+Runtimes of earlier runs are kept in a CostModel, keyed by the netlist text
+(exact) and by its structure (element values masked) plus the analysis
+commands. New jobs are estimated from the closest key, handed out longest
+first to the least loaded worker, and a worker that runs out of jobs steals
+the shortest job of the most loaded one. The slow corners start first instead
+of being left for the end, so the batch finishes close to total CPU / workers.
+"""
+
+import hashlib
+import json
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from .simulate import RunResult
+from .supervisor import Supervisor
+
+# estimate when nothing similar was run before, in seconds
+DEFAULT_COST: float = 1.0
+
+ANALYSIS_COMMANDS = (
+    "ac",
+    "dc",
+    "disto",
+    "noise",
+    "op",
+    "pz",
+    "sens",
+    "sp",
+    "tf",
+    "tran",
+)
+_VALUE = re.compile(r"(?<![\w.])[+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?[a-z]*")
+
+
+def _is_analysis(line: str) -> bool:
+    first = line.split()[0].lstrip(".")
+    return first in ANALYSIS_COMMANDS
+
+
+def netlist_keys(text: str) -> tuple[str, str]:
+    """Keys of a netlist for the cost model: (exact, structure).
+
+    Comments and output lines (wrdata, print) are left out, they hold
+    timestamps and file paths. The structure key masks numbers in everything
+    but analysis commands, so the corners of one circuit share it.
+    """
+    lines = [line.strip().lower() for line in text.splitlines()]
+    lines = [
+        line for line in lines if line and not line.startswith(("*", "wrdata", "print"))
+    ]
+    structure = [
+        line if _is_analysis(line) else _VALUE.sub("#", line) for line in lines
+    ]
+    exact_key = hashlib.sha1("\n".join(lines).encode()).hexdigest()
+    structure_key = hashlib.sha1("\n".join(structure).encode()).hexdigest()
+    return exact_key, structure_key
+
+
+class CostModel:
+    """Mean runtime per netlist key, optionally kept in a JSON file"""
+
+    def __init__(self, filename: Optional[Path] = None) -> None:
+        self.filename = filename
+        # key -> (count, mean), of exact keys and of structure keys
+        self.runtimes: dict[str, tuple[int, float]] = {}
+        self.structures: dict[str, tuple[int, float]] = {}
+        if filename is not None and filename.exists():
+            saved = json.loads(filename.read_text())
+            self.runtimes = {k: (n, mean) for k, (n, mean) in saved["exact"].items()}
+            self.structures = {
+                k: (n, mean) for k, (n, mean) in saved["structure"].items()
+            }
+        self._lock = threading.Lock()
+
+    def record(self, text: str, seconds: float) -> None:
+        """add the runtime of a netlist"""
+        with self._lock:
+            keys = netlist_keys(text)
+            for table, key in zip((self.runtimes, self.structures), keys):
+                count, mean = table.get(key, (0, 0.0))
+                table[key] = (count + 1, mean + (seconds - mean) / (count + 1))
+
+    def estimate(self, text: str) -> float:
+        """expected runtime in seconds: same netlist, else same structure, else
+        the mean of every netlist recorded"""
+        exact_key, structure_key = netlist_keys(text)
+        if exact_key in self.runtimes:
+            return self.runtimes[exact_key][1]
+        if structure_key in self.structures:
+            return self.structures[structure_key][1]
+        if self.runtimes:
+            means = [mean for _, mean in self.runtimes.values()]
+            return sum(means) / len(means)
+        return DEFAULT_COST
+
+    def save(self) -> None:
+        if self.filename is not None:
+            self.filename.write_text(
+                json.dumps({"exact": self.runtimes, "structure": self.structures})
+            )
+
+
+def plan(costs: Sequence[float], workers: int) -> list[deque[int]]:
+    """Longest processing time first: each job, from the most to the least
+    costly, goes to the worker with the least work so far.
+
+    Returns:
+        list[deque[int]]: job indices per worker, most costly first
+    """
+    queues: list[deque[int]] = [deque() for _ in range(max(workers, 1))]
+    loads = [0.0] * len(queues)
+    for index in sorted(range(len(costs)), key=lambda i: -costs[i]):
+        least = loads.index(min(loads))
+        queues[least].append(index)
+        loads[least] += costs[index]
+    return queues
+
+
+def run_scheduled[T](
+    tasks: Sequence[Callable[[], T]], costs: Sequence[float], workers: int
+) -> list[T]:
+    """Run tasks on worker threads, planned with plan(). A worker takes the
+    next task of its own queue (the most costly) and, when its queue is
+    empty, steals the least costly task of the queue with the most estimated
+    work left. A worker whose task raises stops; the others still run the
+    tasks left in its queue, then the first error is raised.
+
+    Returns:
+        list[T]: task results in the order of tasks
+    """
+    queues = plan(costs, workers)
+    remaining = [sum(costs[i] for i in queue) for queue in queues]
+    lock = threading.Lock()
+    results: dict[int, T] = {}
+
+    def next_task(worker: int) -> Optional[int]:
+        with lock:
+            if queues[worker]:
+                index = queues[worker].popleft()
+                remaining[worker] -= costs[index]
+                return index
+            victim = max(range(len(queues)), key=lambda w: remaining[w])
+            if not queues[victim]:
+                return None
+            index = queues[victim].pop()
+            remaining[victim] -= costs[index]
+            return index
+
+    def serve(worker: int) -> None:
+        while (index := next_task(worker)) is not None:
+            results[index] = tasks[index]()
+
+    with ThreadPoolExecutor(len(queues)) as pool:
+        futures = [pool.submit(serve, worker) for worker in range(len(queues))]
+    for future in futures:
+        future.result()  # raises the error of a task
+    return [results[index] for index in range(len(tasks))]
+
+
+def _netlist_text(supervisor: Supervisor) -> str:
+    if supervisor.sim.netlist is not None:
+        return str(supervisor.sim.netlist)
+    return supervisor.sim.netlist_filename.read_text()
+
+
+def run_parallel(
+    supervisors: Sequence[Supervisor],
+    workers: int,
+    cost_model: Optional[CostModel] = None,
+) -> list[RunResult]:
+    """run_batch on several workers, slowest estimated simulations first. The
+    runtime of every simulation is recorded in cost_model (and saved).
+
+    Returns:
+        list[RunResult]: in the order of supervisors
+    """
+    model = cost_model if cost_model is not None else CostModel()
+    texts = [_netlist_text(supervisor) for supervisor in supervisors]
+
+    def task(index: int) -> Callable[[], RunResult]:
+        def run() -> RunResult:
+            start = time.perf_counter()
+            try:
+                result = supervisors[index].run()
+            except (OSError, ValueError, subprocess.SubprocessError) as err:
+                result = RunResult(
+                    supervisors[index].sim.name, "error", message=repr(err)
+                )
+            model.record(texts[index], time.perf_counter() - start)
+            return result
+
+        return run
+
+    tasks = [task(index) for index in range(len(supervisors))]
+    results = run_scheduled(tasks, [model.estimate(text) for text in texts], workers)
+    model.save()
+    return results
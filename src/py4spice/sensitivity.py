@@ -0,0 +1,308 @@
+"""Finite-difference sensitivities of any measurement to every component.
+
+ngspice's `sens` analysis covers dc small-signal sensitivities only. Here each
+R, C and L value of a netlist is changed by a relative delta and the circuit
+simulated again, so any measurement of any analysis (StepInfo properties,
+FreqInfo margins, a user function) can be differentiated.
+
+The variants do not need a netlist and an ngspice start each: every worker of
+a WorkerPool sources the circuit once and runs its share of the variants with
+`alter` (AlterJob). The normalized sensitivity of measurement M to component
+p is (dM / M) / (dp / p): 1 means M changes by 1% when p does.
+
+    step = {"name": "step", "analysis": "tr1", "kind": "step", "signal": "out",
+            "xbegin": 9e-6, "xend": 12e-6}
+    sens = Sensitivity(netlist, [tr1], [step], delta=0.01, central=True)
+    result = sens.run(ngspice_exe, results_path / "sens", workers=8)
+    print_section("sensitivities", result.report("step.settlingtime"))
+
+Measurements are spec dicts as in experiments.py, or functions that take the
+results of the analyses by name and return a float or a dict of floats.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from .analyses import Analyses
+from .experiments import measure
+from .globals_types import numpy_flt
+from .netlist import Netlist, spice_number
+from .sim_results import SimResults
+from .simulate import RunResult
+from .table_data import TableData, aligned_columns, eng_format
+from .worker_pool import AlterJob, WorkerPool
+
+Measurement = (
+    dict[str, Any] | Callable[[dict[str, SimResults]], float | dict[str, float]]
+)
+
+# elements whose value is the word after the two nodes and can be altered
+ALTERABLE = "rcl"
+
+
+def components_of(netlist: Netlist) -> dict[str, float]:
+    """R, C and L elements of the top level of netlist with a numeric value:
+    name -> value. Elements in subcircuits cannot be altered by name and
+    values given as expressions cannot be parsed, so both are left out."""
+    found: dict[str, float] = {}
+    depth = 0
+    in_control = False
+    for line in netlist.data:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == ".control":
+            in_control = True
+        elif words[0] == ".endc":
+            in_control = False
+        elif words[0] == ".subckt":
+            depth += 1
+        elif words[0] == ".ends":
+            depth -= 1
+        elif not in_control and depth == 0 and words[0][0] in ALTERABLE:
+            if len(words) < 4:
+                continue
+            try:
+                found[words[0]] = spice_number(words[3])
+            except ValueError:  # {expression}, r=..., model name
+                continue
+    return found
+
+
+def _without_control(netlist: Netlist) -> str:
+    """netlist text without its .control block (its quit would end a worker)"""
+    lines: list[str] = []
+    in_control = False
+    for line in netlist.data:
+        first = line.split()[0] if line.split() else ""
+        if first == ".control":
+            in_control = True
+        elif first == ".endc":
+            in_control = False
+        elif not in_control:
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def normalized(
+    nominal: numpy_flt,
+    up: numpy_flt,
+    down: Optional[numpy_flt],
+    delta: float,
+) -> numpy_flt:
+    """Normalized sensitivities (dM / M) / (dp / p).
+
+    Args:
+        nominal (numpy_flt): measurements of the nominal circuit
+        up (numpy_flt): one row per component changed by +delta
+        down (numpy_flt): one row per component changed by -delta (central
+            difference), or None (forward difference)
+        delta (float): relative change of the components
+
+    Returns:
+        numpy_flt: one row per component, NaN where a measurement is missing
+        or nominally 0
+    """
+    change = up - nominal if down is None else (up - down) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sensitivities: numpy_flt = change / (nominal * delta)
+    return np.where(np.isfinite(sensitivities), sensitivities, np.nan)
+
+
+class SensitivityResult:
+    """Measurements of all variants and the sensitivities derived from them"""
+
+    def __init__(
+        self,
+        components: list[str],
+        component_values: numpy_flt,
+        names: list[str],
+        measured: numpy_flt,
+        sensitivities: numpy_flt,
+        run_results: list[RunResult],
+    ) -> None:
+        self.components = components
+        self.component_values = component_values
+        self.names = names  # measurement names, "<measurement>.<property>"
+        self.measured = measured  # one row per variant, nominal first
+        self.sensitivities = sensitivities  # components x names
+        self.run_results = run_results  # one per worker job
+
+    @property
+    def nominal(self) -> dict[str, float]:
+        """measurements of the nominal circuit"""
+        return dict(zip(self.names, self.measured[0].tolist()))
+
+    def ranked(self, name: str) -> TableData:
+        """sensitivities to measurement name, largest magnitude first (NaN
+        last), as a TableData of component -> sensitivity"""
+        column = self.sensitivities[:, self.names.index(name)]
+        order = np.argsort(-np.nan_to_num(np.abs(column), nan=-1.0), kind="stable")
+        return TableData(np.array(self.components)[order], column[order])
+
+    def report(self, name: Optional[str] = None, limit: Optional[int] = 20) -> str:
+        """Components ranked by their largest sensitivity (or the one to
+        measurement name): value and the sensitivity to every measurement.
+
+        Args:
+            name (str): measurement to rank by, default the largest of all
+            limit (int): at most this many components, None for all
+
+        Returns:
+            str: aligned table, one component per line
+        """
+        magnitude = np.nan_to_num(np.abs(self.sensitivities), nan=-1.0)
+        if name is not None:
+            magnitude = magnitude[:, [self.names.index(name)]]
+        worst = magnitude.max(axis=1, initial=-1.0)
+        order = np.argsort(-worst, kind="stable")[:limit]
+        columns = [
+            np.array(self.components, dtype=np.str_)[order],
+            eng_format(self.component_values[order]),
+        ]
+        columns += [
+            np.char.mod("%.4g", self.sensitivities[order, i])
+            for i in range(len(self.names))
+        ]
+        return aligned_columns(["component", "value"] + self.names, columns)
+
+
+class Sensitivity:
+    """Perturbs the components of a netlist one at a time and measures"""
+
+    def __init__(
+        self,
+        netlist: Netlist,
+        analyses: list[Analyses],
+        measurements: Sequence[Measurement],
+        components: Optional[list[str]] = None,
+        delta: float = 0.01,
+        central: bool = False,
+    ) -> None:
+        """
+        Args:
+            netlist (Netlist): circuit, a .control block is dropped
+            analyses (list[Analyses]): analyses the measurements need
+            measurements: spec dicts (see experiments.measure) or functions
+            components (list[str]): elements to perturb, default every
+                alterable one (see components_of)
+            delta (float): relative change, 0.01 is +1%
+            central (bool): also run -delta, for central differences
+        """
+        self.netlist = netlist
+        self.analyses = analyses
+        self.measurements = measurements
+        self.delta = delta
+        self.central = central
+        found = components_of(netlist)
+        names = components if components is not None else list(found)
+        unknown = [name for name in names if name.lower() not in found]
+        if unknown:
+            raise ValueError(f"not alterable components: {', '.join(unknown)}")
+        self.components = [name.lower() for name in names]
+        self.values: numpy_flt = np.array([found[name] for name in self.components])
+
+    @property
+    def variants(self) -> list[tuple[str, list[str], list[str]]]:
+        """label, alter commands and restore commands of every variant, the
+        nominal circuit first, then each component up (and down)"""
+        variants: list[tuple[str, list[str], list[str]]] = [("nominal", [], [])]
+        steps = [("up", 1 + self.delta)]
+        if self.central:
+            steps.append(("down", 1 - self.delta))
+        for name, value in zip(self.components, self.values.tolist()):
+            restore = [f"alter {name} = {value:.12g}"]
+            for suffix, factor in steps:
+                alter = [f"alter {name} = {value * factor:.12g}"]
+                variants.append((f"{name}_{suffix}", alter, restore))
+        return variants
+
+    def _measure(self, results: dict[str, SimResults]) -> dict[str, float]:
+        values: dict[str, float] = {}
+        for measurement in self.measurements:
+            if isinstance(measurement, dict):
+                values.update(measure(results[measurement["analysis"]], measurement))
+                continue
+            value = measurement(results)
+            if isinstance(value, dict):
+                values.update(value)
+            else:
+                values[getattr(measurement, "__name__", "value")] = float(value)
+        return values
+
+    def run(
+        self,
+        ngspice_exe: Path,
+        directory: Path,
+        workers: int = 1,
+        timeout: float = 20,
+    ) -> SensitivityResult:
+        """Simulate all variants on persistent ngspice workers and measure.
+
+        Args:
+            ngspice_exe (Path): ngspice executable
+            directory (Path): netlist, and results in one subdirectory per
+                variant
+            workers (int): ngspice processes, each runs a share of the variants
+            timeout (float): seconds per variant
+
+        Returns:
+            SensitivityResult: NaN for measurements of failed variants
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        netlist_filename = directory / "sensitivity.cir"
+        netlist_filename.write_text(_without_control(self.netlist))
+
+        variants = self.variants
+        analyses: list[list[Analyses]] = []
+        for label, _, _ in variants:
+            results_loc = directory / label
+            results_loc.mkdir(exist_ok=True)
+            analyses.append(
+                [
+                    Analyses(a.name, a.cmd_type, a.cmd, a.vector, results_loc)
+                    for a in self.analyses
+                ]
+            )
+
+        shares = np.array_split(np.arange(len(variants)), min(workers, len(variants)))
+        jobs = [
+            AlterJob(
+                f"sensitivity{number}",
+                netlist_filename,
+                [(variants[i][1], analyses[i], variants[i][2]) for i in share],
+                directory / "transcript.txt",
+            )
+            for number, share in enumerate(shares)
+        ]
+        longest = max(len(share) for share in shares)
+        with WorkerPool(ngspice_exe, len(jobs), timeout=timeout * longest) as pool:
+            run_results = pool.run(jobs)
+
+        measured: list[dict[str, float]] = []
+        for group in analyses:
+            try:
+                results = {
+                    a.name: SimResults.from_file(a.cmd_type, a.results_filename)
+                    for a in group
+                }
+                measured.append(self._measure(results))
+            except (OSError, ValueError, KeyError, IndexError):  # failed variant
+                measured.append({})
+
+        names = list(dict.fromkeys(key for values in measured for key in values))
+        table = np.array(
+            [[values.get(key, np.nan) for key in names] for values in measured]
+        ).reshape(len(measured), len(names))
+        step = 2 if self.central else 1
+        sensitivities = normalized(
+            table[0],
+            table[1::step],
+            table[2::step] if self.central else None,
+            self.delta,
+        )
+        return SensitivityResult(
+            self.components, self.values, names, table, sensitivities, run_results
+        )
@@ -0,0 +1,132 @@
+"""Opt-in helper: results from worker processes without pickling their arrays.
+
+A worker process saves data_plot as a .npy file in a scratch directory
+(RAM-backed /dev/shm where there is one) and returns a ResultsHandle: analysis
+type, header, table and where the array is. The parent maps the file, so the
+array is neither copied through a pipe nor held twice in memory.
+
+    handles = pool.map(worker_function, jobs)   # each returns share(results, ...)
+    results = [handle.open() for handle in handles]
+
+parse_parallel() does this for parsing many results files at once; it is the
+only path in py4spice that uses it. The other parallel paths are unchanged:
+the job queue returns npz blobs (job_queue.pack_results), and run_parallel and
+run_scheduled return their values from threads, which share memory anyway.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Mapping, Optional
+
+import numpy as np
+
+from .globals_types import AnaType, numpy_flt
+from .sim_results import SimResults
+from .workspace import RunWorkspace
+
+
+class ArrayHandle:
+    """An array saved by another process, as a .npy file"""
+
+    def __init__(self, filename: Path, shape: tuple[int, ...], dtype: str) -> None:
+        self.filename = filename
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def save(cls, array: numpy_flt, filename: Path) -> "ArrayHandle":
+        np.save(filename, array)
+        return cls(filename, array.shape, array.dtype.str)
+
+    def open(self) -> numpy_flt:
+        """Map the file (copy-on-write): nothing is read until used, and
+        changing the array does not change the file.
+
+        The mapping stays valid after the file is deleted, except on Windows,
+        where the file cannot be deleted while mapped.
+        """
+        array: numpy_flt = np.load(self.filename, mmap_mode="c")
+        return array
+
+
+class ResultsHandle:
+    """SimResults of another process, with data_plot in an ArrayHandle"""
+
+    def __init__(
+        self,
+        analysis_type: AnaType,
+        header: list[str],
+        data_table: Mapping[str, float],
+        data: Optional[ArrayHandle],
+        x_axis: Optional[numpy_flt] = None,
+    ) -> None:
+        self.analysis_type: AnaType = analysis_type
+        self.header = header
+        self.data_table = data_table
+        self.data = data  # None: no plot data (op, tf, ...)
+        self.x_axis = x_axis  # float64 x of narrower data, small enough to pickle
+
+    def open(self) -> SimResults:
+        """SimResults whose data_plot maps the worker's file"""
+        data_plot = self.data.open() if self.data is not None else np.array([])
+        return SimResults(
+            self.analysis_type, self.header, data_plot, self.data_table, self.x_axis
+        )
+
+
+def share(results: SimResults, filename: Path) -> ResultsHandle:
+    """Called in a worker process: save the array of results to filename
+    (.npy) and return a handle to send to the parent instead of results."""
+    data = None
+    if results.data_plot.size:
+        data = ArrayHandle.save(results.data_plot, filename)
+    return ResultsHandle(
+        results.analysis_type, results.header, results.data_table, data, results.x_axis
+    )
+
+
+def _parse_and_share(
+    analysis_type: AnaType, filename: Path, shared_filename: Path
+) -> ResultsHandle:
+    return share(SimResults.from_file(analysis_type, filename), shared_filename)
+
+
+def parse_parallel(
+    files: list[tuple[AnaType, Path]],
+    workers: int = 1,
+    directory: Optional[Path] = None,
+) -> list[SimResults]:
+    """Parse results files in worker processes.
+
+    Args:
+        files (list[tuple[AnaType, Path]]): analysis type and results file
+        workers (int): number of processes. 1 parses in this process.
+        directory (Path): where the arrays are passed, default a scratch
+            directory in /dev/shm that is deleted once they are mapped
+
+    Returns:
+        list[SimResults]: in the order of files, data_plot mapped from disk
+    """
+    if workers <= 1 or len(files) <= 1:
+        return [SimResults.from_file(kind, filename) for kind, filename in files]
+
+    workspace = RunWorkspace("shared", use_shm=True) if directory is None else None
+    path = workspace.path if workspace is not None else directory
+    assert path is not None
+    shared = [
+        path / f"{index}_{filename.stem}.npy"
+        for index, (_, filename) in enumerate(files)
+    ]
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        handles = list(
+            pool.map(
+                _parse_and_share,
+                [kind for kind, _ in files],
+                [filename for _, filename in files],
+                shared,
+            )
+        )
+    results = [handle.open() for handle in handles]
+    if workspace is not None:
+        workspace.cleanup()  # the mappings outlive the files
+    return results
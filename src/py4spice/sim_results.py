@@ -1,17 +1,25 @@
 """Convert text file simulation results to objects"""
 
+import io
 from pathlib import Path
+from typing import Mapping, Optional, TextIO
 
 import numpy as np
-from matplotlib.ticker import EngFormatter
+import numpy.typing as npt
 
 from .globals_types import TABLE_DATA, AnaType, numpy_flt
+from .profiling import is_profiling, stage
+from .table_data import TableData
 
 
 class SimResults:
     """Create objects for results extracted from simulation text files.
     Depending on the analysis type, the data is stored in different ways:
     either a plot or a table (dictionary).
+
+    Plot data is float64 unless another dtype is asked for, e.g. float32 for
+    big archives. Column 0 then has the same dtype; the x-axis in full float64
+    resolution is kept in x_axis (see the x property).
     """
 
     def __init__(
@@ -19,12 +27,22 @@ class SimResults:
         analysis_type: AnaType,
         header: list[str],
         data_plot: numpy_flt,
-        data_table: dict[str, float],
+        data_table: Mapping[str, float],
+        x_axis: Optional[numpy_flt] = None,
     ):
         self.analysis_type: AnaType = analysis_type
         self.header: list[str] = header
         self.data_plot: numpy_flt = data_plot
-        self.data_table: dict[str, float] = data_table
+        # name -> value, as arrays (a dict is converted)
+        self.data_table: TableData = TableData.from_mapping(data_table)
+        self.x_axis: Optional[numpy_flt] = x_axis  # float64 x, if data_plot is not
+
+    @property
+    def x(self) -> numpy_flt:
+        """x-axis (time, frequency, ...) at the best resolution available"""
+        if self.x_axis is not None:
+            return self.x_axis
+        return self.data_plot[:, 0]
 
     def __str__(self) -> str:
         string = f"analysis_type: {self.analysis_type}\n\n"
@@ -34,32 +52,26 @@ class SimResults:
         return string
 
     @staticmethod
-    def _table_processing(filename: Path) -> dict[str, float]:
-        """Process a text file with table data and return a dictionary"""
-        data_dict: dict[str, float] = {}  # define empty dictionary
-        with open(filename, "r", encoding="utf-8") as file:
-            for line in file:  # for each line: 1st word: key, last word: value
-                words = line.split()
-                data_dict[str(words[0])] = float(words[-1])
-        return data_dict
+    def _table_processing(text: str) -> TableData:
+        """Process table data (one "name = value" per line)"""
+        return TableData.from_text(text)
 
     @staticmethod
-    def _plot_processing(filename: Path) -> tuple[list[str], numpy_flt]:
+    def _plot_processing(file: TextIO) -> tuple[list[str], numpy_flt]:
         """Convert simulation text data that is in the form of a plot.
 
         Args:
-            filename (Path): text file results from a simulation
+            file (TextIO): open results from a simulation, file or text
 
         Returns:
             tuple[list[str], numpy_flt]: header and footer data
         """
         # turn first row into list of words for header
-        with open(filename, "r", encoding="utf-8") as file:
-            first_line = file.readline().strip()
-            header = first_line.split()
+        first_line = file.readline().strip()
+        header = first_line.split()
 
-        # skip the header and put data to 2d numpy
-        data = np.genfromtxt(filename, dtype=float, skip_header=1)
+        # the rest to 2d numpy
+        data = np.genfromtxt(file, dtype=float)
 
         return header, data
 
@@ -131,16 +143,74 @@ class SimResults:
 
         return header_without_dups, data_without_dups
 
+    @staticmethod
+    def _storage(
+        data: numpy_flt, dtype: npt.DTypeLike, keep_x64: bool
+    ) -> tuple[numpy_flt, Optional[numpy_flt]]:
+        """cast parsed data to the storage dtype; the float64 x-axis if it
+        is kept separately"""
+        if np.dtype(dtype) == data.dtype:
+            return data, None
+        x_axis = data[:, 0].copy() if keep_x64 and data.size else None
+        return data.astype(dtype), x_axis
+
     @classmethod
-    def from_file(cls, analysis_type: AnaType, filename: Path) -> "SimResults":
+    def from_file(
+        cls,
+        analysis_type: AnaType,
+        filename: Path,
+        dtype: npt.DTypeLike = np.float64,
+        keep_x64: bool = True,
+    ) -> "SimResults":
         """Create a SimResults object from a text file. In other words,
         read in the simulation results file.
+
+        Args:
+            analysis_type (AnaType): analysis that wrote the file
+            filename (Path): results file
+            dtype: dtype of data_plot, e.g. np.float32 for half the memory
+            keep_x64 (bool): with a narrower dtype, keep the x-axis in float64
+                (x_axis) so time resolution is not lost
         """
+        with stage("sim_results.from_file", file=str(filename)) as rec:
+            with open(filename, "r", encoding="utf-8") as file:
+                results = cls._from_lines(analysis_type, file, dtype, keep_x64)
+            if is_profiling():  # stat() only when it is recorded
+                rows = len(results.data_table) or results.data_plot.shape[0]
+                rec.add(bytes_read=filename.stat().st_size, rows=rows)
+            return results
+
+    @classmethod
+    def from_text(
+        cls,
+        analysis_type: AnaType,
+        text: str,
+        dtype: npt.DTypeLike = np.float64,
+        keep_x64: bool = True,
+    ) -> "SimResults":
+        """Create a SimResults object from the text of a results file, e.g.
+        received through a pipe. dtype and keep_x64 as in from_file."""
+        with stage("sim_results.from_text") as rec:
+            results = cls._from_lines(analysis_type, io.StringIO(text), dtype, keep_x64)
+            rows = len(results.data_table) or results.data_plot.shape[0]
+            rec.add(bytes_read=len(text), rows=rows)
+            return results
+
+    @classmethod
+    def _from_lines(
+        cls,
+        analysis_type: AnaType,
+        file: TextIO,
+        dtype: npt.DTypeLike = np.float64,
+        keep_x64: bool = True,
+    ) -> "SimResults":
         if analysis_type in TABLE_DATA:
-            return cls(analysis_type, [], np.array([]), cls._table_processing(filename))
+            return cls(
+                analysis_type, [], np.array([]), cls._table_processing(file.read())
+            )
 
         # if not table data, then it is plot data
-        (header1, data_plot1) = cls._plot_processing(filename)
+        (header1, data_plot1) = cls._plot_processing(file)
 
         # if frequency analysis
         if analysis_type in ["ac", "noise"]:
@@ -148,24 +218,14 @@ class SimResults:
             (header2, data_plot2) = cls._mag_phase_convert(header1, data_plot1)
             # remove duplicate columns
             (header3, data_plot3) = cls._remove_dups(header2, data_plot2)
-            return cls(analysis_type, header3, data_plot3, {})
+            (data_plot4, x_axis) = cls._storage(data_plot3, dtype, keep_x64)
+            return cls(analysis_type, header3, data_plot4, {}, x_axis)
 
         # if not frequency analysis, time or valtage x-axis
         (header2, data_plot2) = cls._remove_dups(header1, data_plot1)
-        return cls(analysis_type, header2, data_plot2, {})
+        (data_plot3, x_axis) = cls._storage(data_plot2, dtype, keep_x64)
+        return cls(analysis_type, header2, data_plot3, {}, x_axis)
 
     def table_for_print(self) -> str:
         """Convert table data to a string for printing"""
-
-        # set up engineering notation function
-        engFormat: EngFormatter = EngFormatter(places=3, sep="")
-
-        max_key_len = max(len(key) for key in self.data_table)
-        result = ""
-        for key, value in self.data_table.items():
-            value_str: str = engFormat(value)  # use engineering notation
-            is_negative = value < 0  # Adjust padding based on sign
-            padding = max_key_len + (2 if not is_negative else 1)
-            formatted_row = f"{key:<{padding}}{value_str}"
-            result += formatted_row + "\n"
-        return result
+        return self.data_table.table_for_print()
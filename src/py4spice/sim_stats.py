@@ -0,0 +1,115 @@
+"""Solver statistics parsed from an ngspice transcript"""
+
+import re
+from typing import Optional
+
+# transcript key (lowercase) -> SimStats name. ngspice prints these for
+# `rusage all`; some appear twice with different wording between versions.
+STAT_KEYS: dict[str, str] = {
+    "total analysis time (seconds)": "analysis_time",
+    "total analysis time": "analysis_time",
+    "total elapsed time (seconds)": "elapsed_time",
+    "total iterations": "iterations",
+    "transient iterations": "tran_iterations",
+    "circuit equations": "equations",
+    "transient timepoints": "timepoints",
+    "accepted timepoints": "accepted",
+    "rejected timepoints": "rejected",
+    "transient time": "tran_time",
+    "matrix reordering time": "reorder_time",
+    "l-u decomposition time": "decomposition_time",
+    "matrix solve time": "solve_time",
+    "load time": "load_time",
+    "maximum ngspice program size": "memory_max",  # MB
+    "current ngspice program size": "memory",  # MB
+}
+
+# "Key words = number [units]"
+_STAT_LINE = re.compile(
+    r"^\s*([A-Za-z][A-Za-z \-()]*?)\s*=\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+)
+
+
+class SimStats:
+    """Solver statistics of one simulation run: times in seconds, memory in MB.
+    Statistics missing from the transcript are None. The control block must
+    run `rusage all` (see Control.add_stats) for ngspice to print them."""
+
+    def __init__(self, values: Optional[dict[str, float]] = None) -> None:
+        self.values: dict[str, float] = values if values is not None else {}
+
+    def __str__(self) -> str:
+        return "\n".join(f"{name} = {value:g}" for name, value in self.values.items())
+
+    def __bool__(self) -> bool:
+        return bool(self.values)
+
+    @classmethod
+    def from_transcript(cls, text: str) -> "SimStats":
+        """Parse the statistics in ngspice output. If they are printed more
+        than once (several rusage commands), the last values are kept."""
+        values: dict[str, float] = {}
+        for line in text.splitlines():
+            match = _STAT_LINE.match(line)
+            if match is None:
+                continue
+            name = STAT_KEYS.get(match.group(1).lower())
+            if name is not None:
+                values[name] = float(match.group(2))
+        return cls(values)
+
+    def get(self, name: str) -> Optional[float]:
+        """statistic by SimStats name (see STAT_KEYS), None if missing"""
+        return self.values.get(name)
+
+    @property
+    def analysis_time(self) -> Optional[float]:
+        """seconds spent in analyses"""
+        return self.get("analysis_time")
+
+    @property
+    def iterations(self) -> Optional[float]:
+        """Newton iterations of all analyses"""
+        return self.get("iterations")
+
+    @property
+    def timepoints(self) -> Optional[float]:
+        """transient timepoints"""
+        return self.get("timepoints")
+
+    @property
+    def accepted(self) -> Optional[float]:
+        """accepted transient timepoints"""
+        return self.get("accepted")
+
+    @property
+    def rejected(self) -> Optional[float]:
+        """rejected transient timepoints"""
+        return self.get("rejected")
+
+    @property
+    def equations(self) -> Optional[float]:
+        """size of the circuit matrix"""
+        return self.get("equations")
+
+    @property
+    def memory(self) -> Optional[float]:
+        """maximum ngspice program size in MB"""
+        return self.get("memory_max")
+
+    @property
+    def rejected_fraction(self) -> Optional[float]:
+        """rejected / (accepted + rejected) timepoints, a sign of a struggling
+        solver"""
+        accepted, rejected = self.accepted, self.rejected
+        if accepted is None or rejected is None or accepted + rejected == 0:
+            return None
+        return rejected / (accepted + rejected)
+
+    def measurements(self) -> dict[str, float]:
+        """all statistics found, plus rejected_fraction"""
+        result = dict(self.values)
+        fraction = self.rejected_fraction
+        if fraction is not None:
+            result["rejected_fraction"] = fraction
+        return result
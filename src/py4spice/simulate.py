@@ -1,8 +1,140 @@
 """setup or run an ngspice simulation"""
 
 import datetime
+import os
+import signal
 import subprocess
+import threading
+import time
 from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .analyses import Analyses
+from .globals_types import Outcome
+from .netlist import Netlist
+from .profiling import stage
+from .sim_results import SimResults
+from .sim_stats import SimStats
+
+# ngspice messages of a failed operating point or transient (lowercase)
+NONCONVERGENCE_MESSAGES: tuple[str, ...] = (
+    "timestep too small",
+    "no convergence",
+    "singular matrix",
+    "gmin stepping failed",
+    "source stepping failed",
+    "iteration limit reached",
+    "simulation(s) aborted",
+)
+
+# ngspice messages that end a run; the others above are also printed as
+# warnings by runs that recover and succeed
+ABORT_MESSAGES: tuple[str, ...] = ("simulation(s) aborted", "no convergence")
+
+
+class RunResult:
+    """Outcome of running ngspice: "ok", "timeout", "error" (ngspice failed
+    or could not start) or "nonconvergence" (the solver gave up)"""
+
+    def __init__(
+        self,
+        name: str,
+        outcome: Outcome,
+        returncode: Optional[int] = None,
+        elapsed: float = 0.0,
+        message: str = "",
+        stats: Optional[SimStats] = None,
+    ) -> None:
+        self.name = name
+        self.outcome: Outcome = outcome
+        self.returncode = returncode  # None if ngspice did not finish
+        self.elapsed = elapsed  # seconds
+        self.message = message  # reason of a failure
+        self.stats: SimStats = stats if stats is not None else SimStats()
+        self.attempts: int = 1  # set by Supervisor
+        self.options: dict[str, str] = {}  # .options added by Supervisor
+
+    def __str__(self) -> str:
+        string = f"{self.name}: {self.outcome} after {self.attempts} attempt(s)"
+        if self.message:
+            string += f" ({self.message})"
+        return string
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome == "ok"
+
+
+def classify(
+    returncode: int, output: str, missing_results: bool = False
+) -> tuple[Outcome, str]:
+    """Outcome of a finished ngspice run and the message that shows why.
+
+    Solver messages only count when the run failed: a nonzero exit code,
+    missing results or an aborted simulation. Otherwise they were warnings
+    of a run that recovered (e.g. "gmin stepping failed" before source
+    stepping succeeds).
+
+    Args:
+        returncode (int): exit code of ngspice
+        output (str): stdout and stderr of ngspice
+        missing_results (bool): the run did not write all its results
+
+    Returns:
+        tuple[Outcome, str]: outcome and message
+    """
+    lines = output.splitlines()
+    lowered = [line.lower() for line in lines]
+    aborted = any(abort in line for line in lowered for abort in ABORT_MESSAGES)
+    if returncode == 0 and not missing_results and not aborted:
+        return "ok", ""
+    for line, low in zip(lines, lowered):
+        if any(message in low for message in NONCONVERGENCE_MESSAGES):
+            return "nonconvergence", line.strip()
+    if returncode != 0:
+        last_lines = [line.strip() for line in lines if line.strip()]
+        message = last_lines[-1] if last_lines else ""
+        return "error", f"exit code {returncode}: {message}".rstrip(": ")
+    return "error", "no results"
+
+
+def _open_pipe(pipe: Path) -> tuple[int, int]:
+    """open both ends of a named pipe without waiting for ngspice
+
+    Returns:
+        (read fd, write fd); holding the write end keeps the reader from seeing
+        end of file before ngspice opens the pipe, closing it ends the read
+    """
+    read_fd = os.open(pipe, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        write_fd = os.open(pipe, os.O_WRONLY)  # does not block, a reader exists
+    except OSError:
+        os.close(read_fd)
+        raise
+    os.set_blocking(read_fd, True)
+    return read_fd, write_fd
+
+
+def _read_pipe(pipe: Path, read_fd: int, into: dict[Path, str]) -> None:
+    """read a named pipe until every writer, ours included, has closed it"""
+    with open(read_fd, "r", encoding="utf-8") as file:
+        text = file.read()
+    if text:  # empty when ngspice never wrote to it
+        into[pipe] = text
+
+
+def _kill(process: subprocess.Popen[str]) -> None:
+    """kill ngspice and anything it started"""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except ProcessLookupError:
+            return
+    process.kill()  # pragma: no cover
 
 
 class Simulate:
@@ -15,44 +147,152 @@ class Simulate:
         transcript_filename: Path,
         name: str,
         timeout: int = 20,  # Default 20 seconds
+        netlist: Optional[Netlist] = None,
+        results_pipes: Optional[list[Path]] = None,
     ) -> None:
+        """
+        Args:
+            netlist (Netlist): if given, it is streamed to ngspice over stdin
+                and netlist_filename is not read (nor written)
+            results_pipes (list[Path]): named pipes (os.mkfifo) that the control
+                block writes results to; they are read while ngspice runs,
+                into piped_results. See RunWorkspace.simulate(piped=True).
+        """
         self.ngspice_exe: Path = ngspice_exe
         self.netlist_filename: Path = netlist_filename
         self.transcript_filename: Path = transcript_filename
         self.name: str = name
         self.timeout: int = timeout
+        self.netlist: Optional[Netlist] = netlist
+        self.results_pipes: list[Path] = results_pipes or []
+        self.piped_results: dict[Path, str] = {}  # pipe -> text, filled by run()
         self.transcript_content: str = (
             f"\n-----------------\nSimulation name: {self.name}"
         )
+        self.stats: SimStats = SimStats()  # filled by run()
+        self.output: str = ""  # ngspice output of the last attempt
 
     @property
     def ngspice_command(self) -> list[str]:
         """define the ngspice command"""
-        return [str(self.ngspice_exe), "-b", str(self.netlist_filename)]
+        if self.netlist is not None:
+            return self.command_for(str(self.netlist))
+        return self.command_for(self.netlist_filename)
+
+    def command_for(self, netlist: Path | str) -> list[str]:
+        """ngspice command to simulate a netlist file, or netlist text that
+        is sent over stdin"""
+        if isinstance(netlist, str):
+            return [str(self.ngspice_exe), "-b"]
+        return [str(self.ngspice_exe), "-b", str(netlist)]
 
     def __str__(self) -> str:
         return " ".join(self.ngspice_command)
 
-    def run(self) -> None:
-        """Execute the ngspice simulation"""
-        try:
-            completed_sim = subprocess.run(
-                self.ngspice_command,
-                capture_output=True,
-                check=True,
-                text=True,
-                timeout=self.timeout,
+    def run(self) -> RunResult:
+        """Execute the ngspice simulation. Failures do not raise; they are
+        printed and returned. Use Supervisor for retries."""
+        netlist: Path | str = self.netlist_filename
+        if self.netlist is not None:
+            netlist = str(self.netlist)
+        result = self.attempt(netlist)
+        if not result.ok:
+            print(f"Simulation {result}")
+        return result
+
+    def results(
+        self, analysis: Analyses, dtype: npt.DTypeLike = np.float64
+    ) -> SimResults:
+        """results of an analysis of the last run, from its pipe or file"""
+        text = self.piped_results.get(analysis.results_filename)
+        if text is None:
+            return SimResults.from_file(
+                analysis.cmd_type, analysis.results_filename, dtype
+            )
+        return SimResults.from_text(analysis.cmd_type, text, dtype)
+
+    def attempt(self, netlist: Path | str, note: str = "") -> RunResult:
+        """Run ngspice once, killing it after timeout seconds, and append its
+        output to the transcript.
+
+        Args:
+            netlist (Path | str): netlist file, or netlist text for stdin
+            note (str): line added to the transcript, e.g. the retry options
+
+        Returns:
+            RunResult: outcome of the run
+        """
+        with stage("simulate.run", name=self.name) as rec:
+            result, output = self._run(netlist)
+            self.output = output
+            rec.add(
+                bytes_read=len(output) + sum(map(len, self.piped_results.values())),
+                bytes_written=len(netlist) if isinstance(netlist, str) else 0,
             )
-            # add timestamp to transcript
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.transcript_content += f"\nTimestamp: {timestamp}\n"
+            rec.args.update(self.stats.values, outcome=result.outcome)
 
-            # add simulation output to transcript
-            self.transcript_content += completed_sim.stdout
+        # add timestamp and simulation output to transcript
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        content = f"\nTimestamp: {timestamp}\n"
+        if note:
+            content += f"{note}\n"
+        content += output
+        if not result.ok:
+            content += f"\nOutcome: {result.outcome} {result.message}\n"
+        self.transcript_content += content
 
-            # append transcript to transcript file
-            with open(self.transcript_filename, "a") as file:
-                file.write(self.transcript_content)
+        # append transcript to transcript file
+        with open(self.transcript_filename, "a") as file:
+            file.write(f"\n-----------------\nSimulation name: {self.name}{content}")
+        return result
 
-        except subprocess.TimeoutExpired:
-            print("Simulation timed out.")
+    def _run(self, netlist: Path | str) -> tuple[RunResult, str]:
+        start = time.perf_counter()
+        stdin_text = netlist if isinstance(netlist, str) else None
+        self.piped_results = {}
+        readers: list[threading.Thread] = []
+        write_fds: list[int] = []
+        try:
+            for pipe in self.results_pipes:
+                read_fd, write_fd = _open_pipe(pipe)
+                write_fds.append(write_fd)
+                reader = threading.Thread(
+                    target=_read_pipe, args=(pipe, read_fd, self.piped_results)
+                )
+                reader.start()
+                readers.append(reader)
+            try:
+                process = subprocess.Popen(
+                    self.command_for(netlist),
+                    stdin=subprocess.DEVNULL if stdin_text is None else subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    start_new_session=True,  # so a timeout kills the whole group
+                )
+            except OSError as err:
+                return RunResult(self.name, "error", message=str(err)), ""
+
+            try:
+                stdout, stderr = process.communicate(stdin_text, self.timeout)
+            except subprocess.TimeoutExpired:
+                _kill(process)
+                stdout, stderr = process.communicate()
+                elapsed = time.perf_counter() - start
+                message = f"killed after {self.timeout} s"
+                return RunResult(self.name, "timeout", None, elapsed, message), stdout
+        finally:
+            # ngspice is gone; closing our write ends lets every reader finish
+            for write_fd in write_fds:
+                os.close(write_fd)
+            for reader in readers:
+                reader.join()
+
+        elapsed = time.perf_counter() - start
+        output = stdout + stderr
+        self.stats = SimStats.from_transcript(stdout)
+        outcome, message = classify(process.returncode, output)
+        result = RunResult(
+            self.name, outcome, process.returncode, elapsed, message, self.stats
+        )
+        return result, output
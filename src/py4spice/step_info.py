@@ -5,7 +5,6 @@ from typing import cast, overload
 
 import numpy as np
 import numpy.typing as npt
-from scipy.interpolate import interp1d
 
 numpy_flt = npt.NDArray[np.float64]
 
@@ -39,6 +38,8 @@ class StepInfo:
 
     def f_y(self, x_values: float | numpy_flt) -> np.float64 | numpy_flt:
         """Interpolate y value at a given x"""
+        from scipy.interpolate import interp1d  # slow import, only when used
+
         funct = interp1d(self.x_array_in, self.y_array_in, "linear")
         # return cast(float | numpy_flt, funct(x_values))
         return cast(np.float64 | numpy_flt, funct(x_values))
@@ -0,0 +1,162 @@
+"""Run simulations unattended: stale results removed, failures retried with
+convergence options, and a RunResult for every simulation of a batch"""
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .analyses import Analyses
+from .simulate import RunResult, Simulate, classify
+
+# .options of each attempt; later attempts relax the solver further
+CONVERGENCE_LADDER: list[dict[str, str]] = [
+    {},
+    {"itl1": "500", "itl4": "50"},
+    {"gmin": "1e-10", "reltol": "5e-3", "itl1": "1000", "itl4": "100"},
+    {
+        "gmin": "1e-9",
+        "reltol": "1e-2",
+        "itl1": "2000",
+        "itl4": "200",
+        "method": "gear",
+    },
+]
+
+
+def options_line(options: dict[str, str]) -> str:
+    """netlist line setting options, e.g. ".options gmin=1e-10 reltol=5e-3" """
+    return ".options " + " ".join(f"{key}={value}" for key, value in options.items())
+
+
+def add_options(text: str, options: dict[str, str]) -> str:
+    """netlist text with an .options line added before the .control block
+    (or .end). The text is not lowercased so file paths are kept."""
+    lines = text.splitlines()
+    lowered = [line.strip().lower() for line in lines]
+    index = len(lines)
+    for start in (".control", ".end"):
+        found = [i for i, line in enumerate(lowered) if line.startswith(start)]
+        if found:
+            index = found[0]
+            break
+    lines.insert(index, options_line(options))
+    return "\n".join(lines) + "\n"
+
+
+def with_options(netlist_filename: Path, options: dict[str, str]) -> Path:
+    """Copy a netlist file with an .options line (see add_options) to a
+    temporary file. It is hidden and placed next to the netlist so relative
+    .include paths still resolve; the caller deletes it.
+
+    Returns:
+        Path: the temporary netlist file
+    """
+    handle, name = tempfile.mkstemp(
+        suffix=netlist_filename.suffix,
+        prefix=f".{netlist_filename.stem}_retry_",
+        dir=netlist_filename.parent,
+    )
+    with os.fdopen(handle, "w") as file:
+        file.write(add_options(netlist_filename.read_text(), options))
+    return Path(name)
+
+
+class Supervisor:
+    """Runs a Simulate until it succeeds or the ladder of convergence options
+    is used up. Before every attempt the results files of the analyses are
+    deleted, so results of an earlier run are never read by mistake."""
+
+    def __init__(
+        self,
+        sim: Simulate,
+        analyses: list[Analyses],
+        ladder: Optional[list[dict[str, str]]] = None,
+        retry_timeouts: bool = False,
+    ) -> None:
+        """
+        Args:
+            sim (Simulate): simulation to run
+            analyses (list[Analyses]): analyses whose results files it writes
+            ladder (list[dict[str, str]]): options of each attempt, default
+                CONVERGENCE_LADDER. {} runs the netlist as is.
+            retry_timeouts (bool): also retry when ngspice is killed for taking
+                too long (a hidden convergence problem), not only on
+                nonconvergence
+        """
+        self.sim = sim
+        self.analyses = analyses
+        self.ladder = ladder if ladder is not None else CONVERGENCE_LADDER
+        self.retry_timeouts = retry_timeouts
+
+    @property
+    def results_filenames(self) -> list[Path]:
+        return [analysis.results_filename for analysis in self.analyses]
+
+    def invalidate(self) -> None:
+        """delete the results files of a previous run (pipes are kept, they
+        hold no results between runs)"""
+        for filename in self.results_filenames:
+            if filename not in self.sim.results_pipes:
+                filename.unlink(missing_ok=True)
+
+    def has_results(self, filename: Path) -> bool:
+        if filename in self.sim.results_pipes:
+            return filename in self.sim.piped_results
+        return filename.exists()
+
+    def run(self) -> RunResult:
+        """Simulate, retrying with the next options on nonconvergence"""
+        result = RunResult(self.sim.name, "error", message="empty ladder")
+        for attempt, options in enumerate(self.ladder, start=1):
+            self.invalidate()
+            netlist: Path | str = self.sim.netlist_filename
+            if self.sim.netlist is not None:  # piped over stdin
+                netlist = str(self.sim.netlist)
+            note = ""
+            if options:
+                note = f"Attempt {attempt}: {options_line(options)}"
+                if isinstance(netlist, str):
+                    netlist = add_options(netlist, options)
+                else:
+                    netlist = with_options(netlist, options)
+
+            try:
+                result = self.sim.attempt(netlist, note)
+            finally:
+                if isinstance(netlist, Path) and netlist != self.sim.netlist_filename:
+                    netlist.unlink(missing_ok=True)
+            result.attempts, result.options = attempt, options
+
+            if result.ok:
+                missing = [
+                    f.name for f in self.results_filenames if not self.has_results(f)
+                ]
+                if not missing:
+                    return result
+                # a run without results failed, solver warnings now count
+                result.outcome, result.message = classify(
+                    result.returncode or 0, self.sim.output, missing_results=True
+                )
+                if result.outcome == "error":
+                    result.message = f"no results: {', '.join(missing)}"
+            if result.outcome == "error":
+                return result  # not a solver problem, options will not help
+            if result.outcome == "timeout" and not self.retry_timeouts:
+                return result
+        return result
+
+
+def run_batch(supervisors: Iterable[Supervisor]) -> list[RunResult]:
+    """Run every simulation, in order. A failure, even a file or process
+    error raised by a run, becomes that simulation's RunResult and the batch
+    goes on."""
+    results: list[RunResult] = []
+    for supervisor in supervisors:
+        try:
+            result = supervisor.run()
+        except (OSError, ValueError, subprocess.SubprocessError) as err:
+            result = RunResult(supervisor.sim.name, "error", message=repr(err))
+        results.append(result)
+    return results
@@ -0,0 +1,173 @@
+"""Table results (op, tf, sens) as name/value arrays.
+
+An op of an extracted netlist has tens of thousands of node voltages and
+device currents. TableData keeps them as two parallel numpy arrays instead of
+a dict of Python floats: parsing splits the whole text at once, formatting is
+vectorized, and names are looked up through a hash index. It behaves like a
+read-only dict of name -> float, so code written for the old dict keeps
+working.
+"""
+
+from typing import Iterator, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from .globals_types import numpy_flt
+
+# SI prefixes by exponent / 3, from 1e-30 (index 0) to 1e30 (index 20)
+ENG_PREFIXES = np.array(
+    ["q", "r", "y", "z", "a", "f", "p", "n", "\N{MICRO SIGN}", "m", ""]
+    + ["k", "M", "G", "T", "P", "E", "Z", "Y", "R", "Q"]
+)
+ENG_LIMIT = 30  # largest exponent with a prefix
+
+
+def eng_format(values: numpy_flt, places: int = 3) -> npt.NDArray[np.str_]:
+    """Engineering notation of many values at once, e.g. 0.0123 -> "12.300m",
+    the format of matplotlib's EngFormatter(places=places, sep=""), unicode
+    minus sign included.
+
+    Args:
+        values (numpy_flt): numbers
+        places (int): digits after the decimal point
+
+    Returns:
+        NDArray[str_]: one string per value
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore"):
+        exponent = np.floor(np.log10(magnitude) / 3) * 3
+    exponent = np.where(np.isfinite(magnitude) & (magnitude > 0), exponent, 0)
+    exponent = np.clip(exponent, -ENG_LIMIT, ENG_LIMIT)
+    mantissa = np.round(values / 10.0**exponent, places)
+    mantissa += 0.0  # -0.0 (also from rounding) prints as 0.000, no sign
+    # 999.9999 rounds to 1000.000: move it to the next prefix
+    carry = (np.abs(mantissa) >= 1000) & (exponent < ENG_LIMIT)
+    exponent = np.where(carry, exponent + 3, exponent)
+    mantissa = np.where(carry, mantissa / 1000, mantissa)
+
+    numbers = np.char.mod(f"%.{places}f", mantissa)
+    numbers = np.char.replace(numbers, "-", "\N{MINUS SIGN}")
+    prefixes = ENG_PREFIXES[(exponent.astype(int) + ENG_LIMIT) // 3]
+    formatted: npt.NDArray[np.str_] = np.char.add(numbers, prefixes)
+    return formatted
+
+
+def aligned_columns(header: list[str], columns: list[npt.NDArray[np.str_]]) -> str:
+    """Text table of string columns under header, each column as wide as its
+    longest entry plus two spaces.
+
+    Returns:
+        str: one line per row, header first
+    """
+    rows = [np.concatenate(([title], column)) for title, column in zip(header, columns)]
+    width = [int(np.char.str_len(column).max()) + 2 for column in rows]
+    lines = np.char.ljust(rows[0], width[0])
+    for column, column_width in zip(rows[1:], width[1:]):
+        lines = np.char.add(lines, np.char.ljust(column, column_width))
+    return "\n".join(line.rstrip() for line in lines.tolist()) + "\n"
+
+
+class TableData(Mapping[str, float]):
+    """Names and values of a table result, as parallel arrays"""
+
+    def __init__(self, names: npt.ArrayLike, values: npt.ArrayLike) -> None:
+        self.name_array: npt.NDArray[np.str_] = np.asarray(names, dtype=np.str_)
+        self.value_array: numpy_flt = np.asarray(values, dtype=np.float64)
+        if self.name_array.shape != self.value_array.shape:
+            raise ValueError("names and values must have the same length")
+        self._index: dict[str, int] | None = None
+
+    @classmethod
+    def from_mapping(cls, table: Mapping[str, float]) -> "TableData":
+        if isinstance(table, TableData):
+            return table
+        return cls(list(table.keys()), list(table.values()))
+
+    @classmethod
+    def from_text(cls, text: str) -> "TableData":
+        """Parse `print line` output: the first word of each line is the name
+        and the last word the value. A later line with the same name wins,
+        like assigning to a dict."""
+        # one split of the whole text, a NUL word marking the end of each line
+        words = (" \0 ".join(text.splitlines()) + " \0").split()
+        count = len(words) // 4
+        if (
+            len(words) == 4 * count
+            and words[3::4].count("\0") == count
+            and words[1::4].count("=") == count
+        ):
+            # every line is "name = value" (what ngspice writes): no line loop
+            names = words[0::4]
+            values = np.fromiter(map(float, words[2::4]), np.float64, count)
+        else:
+            rows = [line.split() for line in text.splitlines()]
+            names = [row[0] for row in rows if row]
+            values = np.array([row[-1] for row in rows if row], dtype=np.float64)
+
+        index = dict(zip(names, range(len(names))))  # last occurrence wins
+        if len(index) < len(names):
+            values = values[list(index.values())]
+            index = dict(zip(index, range(len(index))))
+        table = cls(list(index), values)
+        table._index = index
+        return table
+
+    @property
+    def index(self) -> dict[str, int]:
+        """name -> position in name_array/value_array (hash index, built once)"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.name_array.tolist())}
+        return self._index
+
+    @property
+    def records(self) -> np.ndarray:
+        """the table as a structured array with "name" and "value" fields"""
+        table = np.empty(
+            self.name_array.size,
+            dtype=[("name", self.name_array.dtype), ("value", np.float64)],
+        )
+        table["name"] = self.name_array
+        table["value"] = self.value_array
+        return table
+
+    def lookup(self, names: list[str]) -> numpy_flt:
+        """values of many names at once, NaN for names not in the table"""
+        positions = np.array([self.index.get(name, -1) for name in names], dtype=int)
+        found: numpy_flt = np.full(positions.size, np.nan)
+        hit = positions >= 0
+        found[hit] = self.value_array[positions[hit]]
+        return found
+
+    def __getitem__(self, name: str) -> float:
+        return float(self.value_array[self.index[name]])
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.name_array.tolist())
+
+    def __len__(self) -> int:
+        return int(self.name_array.size)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def to_dict(self) -> dict[str, float]:
+        return dict(zip(self.name_array.tolist(), self.value_array.tolist()))
+
+    def table_for_print(self, places: int = 3) -> str:
+        """One "name value" line per entry, values in engineering notation,
+        aligned on the first digit (negative values one column left)"""
+        if not len(self):
+            return ""
+        width = int(np.char.str_len(self.name_array).max()) + 1
+        values = eng_format(self.value_array, places)
+        signs = np.where(self.value_array < 0, "", " ")
+        lines = np.char.add(
+            np.char.add(np.char.ljust(self.name_array, width), signs), values
+        )
+        return "\n".join(lines.tolist()) + "\n"
@@ -0,0 +1,241 @@
+"""Compare results against golden references within tolerance envelopes.
+
+The result is resampled onto the native x-axis of the reference (one
+searchsorted for all columns, see Resampler). Around every reference point
+the allowed band is the reference's min..max within +/- time_shift,
+widened by atol + rtol * |reference|. Every column is checked at once and the
+first violation of each signal is reported.
+
+    comparison = compare_waveforms(golden, new, atol=1e-3, rtol=1e-2,
+                                   time_shift=5e-9)
+    if not comparison.passed:
+        print_section("regression", comparison.report())
+"""
+
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from .globals_types import numpy_flt
+from .resample import Resampler
+from .sim_results import SimResults
+from .waveforms import Waveforms, WaveformsView
+
+Comparable = Waveforms | WaveformsView | SimResults
+
+# columns per block when building envelopes, limits temporary arrays
+BLOCK_COLUMNS: int = 16
+
+
+def _columns(results: Comparable, names: list[str]) -> tuple[numpy_flt, numpy_flt]:
+    """x-axis and the named columns (NaN for missing ones) as a 2D array"""
+    data = results.data_plot if isinstance(results, SimResults) else results.data
+    signals = results.header[1:]
+    found = [i for i, name in enumerate(names) if name in signals]
+    picked = [results.header.index(names[i]) for i in found]
+    if len(found) == len(names):
+        columns: numpy_flt = data[:, picked].astype(np.float64)  # one gather
+    else:
+        columns = np.full((results.x.size, len(names)), np.nan)
+        columns[:, found] = data[:, picked]
+    return np.asarray(results.x, dtype=np.float64), columns
+
+
+class WindowExtrema:
+    """Minimum and maximum of columns over x - half_width .. x + half_width,
+    on a non-uniform x-axis.
+
+    The window of every point is found once (np.searchsorted) and reused for
+    every column, like Resampler. A sparse table of power-of-two windows
+    answers each window with two overlapping lookups. Levels are built one at
+    a time and the points whose window needs a level are answered right away,
+    so only one level is kept in memory.
+    """
+
+    def __init__(self, x: numpy_flt, half_width: float) -> None:
+        self.start = np.searchsorted(x, x - half_width, side="left")
+        self.stop = np.searchsorted(x, x + half_width, side="right")  # exclusive
+        level = np.floor(np.log2(self.stop - self.start)).astype(int)
+        # points answered from each level
+        self.rows = [np.flatnonzero(level == k) for k in range(int(level.max()) + 1)]
+
+    def __call__(self, y: numpy_flt) -> tuple[numpy_flt, numpy_flt]:
+        """
+        Args:
+            y (numpy_flt): values at x, one row per point
+
+        Returns:
+            tuple[numpy_flt, numpy_flt]: minima and maxima, the shape of y
+        """
+        count = y.shape[0]
+        low = np.empty_like(y)
+        high = np.empty_like(y)
+        level_min = y
+        level_max = y
+        width = 1
+        for rows in self.rows:
+            if rows.size:
+                first = self.start[rows]
+                last = self.stop[rows] - width
+                low[rows] = np.minimum(level_min[first], level_min[last])
+                high[rows] = np.maximum(level_max[first], level_max[last])
+            valid = count - 2 * width + 1
+            if valid < 1:
+                break
+            level_min = np.minimum(level_min[:valid], level_min[width : width + valid])
+            level_max = np.maximum(level_max[:valid], level_max[width : width + valid])
+            width *= 2
+        return low, high
+
+
+class SignalCheck:
+    """Outcome of the comparison of one signal"""
+
+    def __init__(
+        self,
+        name: str,
+        violations: int,
+        worst: float,
+        first_x: Optional[float] = None,
+        value: float = np.nan,
+        low: float = np.nan,
+        high: float = np.nan,
+        missing: bool = False,
+    ) -> None:
+        self.name = name
+        self.violations = violations  # reference points out of the envelope
+        self.worst = worst  # largest distance outside the band / tolerance
+        self.first_x = first_x  # x of the first violation
+        self.value = value  # result there
+        self.low = low  # envelope there
+        self.high = high
+        self.missing = missing  # not in the result at all
+
+    @property
+    def passed(self) -> bool:
+        return self.violations == 0
+
+    def __str__(self) -> str:
+        if self.passed:
+            return f"{self.name}: ok"
+        if self.missing:
+            return f"{self.name}: missing"
+        return (
+            f"{self.name}: {self.violations} points out, first at x={self.first_x:.6g}:"
+            f" {self.value:.6g} not in [{self.low:.6g}, {self.high:.6g}],"
+            f" worst {self.worst:.3g}x tolerance"
+        )
+
+
+class WaveformComparison:
+    """Checks of all signals of a result against a reference"""
+
+    def __init__(self, checks: dict[str, SignalCheck], range_ok: bool) -> None:
+        self.checks = checks
+        self.range_ok = range_ok  # the result covers the reference's x-range
+
+    @property
+    def passed(self) -> bool:
+        return self.range_ok and all(check.passed for check in self.checks.values())
+
+    def failures(self) -> list[SignalCheck]:
+        """failed signals, in order of their first violation"""
+        failed = [check for check in self.checks.values() if not check.passed]
+        return sorted(failed, key=lambda check: check.first_x or 0.0)
+
+    def report(self) -> str:
+        """one line per failed signal"""
+        lines = [] if self.range_ok else ["x-range: result does not cover reference"]
+        lines += [str(check) for check in self.failures()]
+        return "\n".join(lines or ["all signals within tolerance"]) + "\n"
+
+
+def compare_waveforms(
+    reference: Comparable,
+    result: Comparable,
+    signals: Optional[list[str]] = None,
+    atol: float = 0.0,
+    rtol: float = 1e-3,
+    time_shift: float = 0.0,
+    log_x: bool = False,
+) -> WaveformComparison:
+    """Check result against a tolerance envelope around reference.
+
+    A point passes when the result is within atol + rtol * |reference| of
+    the range the reference spans within +/- time_shift of that point.
+
+    Args:
+        reference (Comparable): golden Waveforms, WaveformsView or SimResults
+        result (Comparable): new results, any native x-axis
+        signals (list[str]): columns to check, default all of the reference
+        atol (float): absolute tolerance
+        rtol (float): tolerance relative to the reference value
+        time_shift (float): allowed shift along x
+        log_x (bool): time_shift is in decades (ac results)
+
+    Returns:
+        WaveformComparison: per-signal checks
+    """
+    names = signals if signals is not None else reference.header[1:]
+    x_ref, y_ref = _columns(reference, names)
+    x_new, y_new = _columns(result, names)
+
+    x_shift = np.log10(x_ref) if log_x else x_ref
+    in_range = (x_new[0] <= x_ref[0] + _shift_at(x_ref[0], time_shift, log_x)) and (
+        x_new[-1] >= x_ref[-1] - _shift_at(x_ref[-1], time_shift, log_x)
+    )
+    inside = (x_ref >= x_new[0]) & (x_ref <= x_new[-1])
+    if not inside.any():
+        raise ValueError("result and reference x-ranges do not overlap")
+    x_ref, x_shift, y_ref = x_ref[inside], x_shift[inside], y_ref[inside]
+    y_aligned = Resampler(x_new, x_ref)(y_new)
+
+    extrema = WindowExtrema(x_shift, time_shift) if time_shift > 0 else None
+    checks: dict[str, SignalCheck] = {}
+    for block in range(0, len(names), BLOCK_COLUMNS):
+        columns = slice(block, block + BLOCK_COLUMNS)
+        reference_block = y_ref[:, columns]
+        if extrema is not None:
+            low, high = extrema(reference_block)
+        else:
+            low, high = reference_block.copy(), reference_block.copy()
+        tolerance = np.abs(reference_block)
+        tolerance *= rtol
+        tolerance += atol
+        low -= tolerance
+        high += tolerance
+        value = y_aligned[:, columns]
+        # distance outside the band, in place to spare temporaries
+        distance = np.subtract(low, value)
+        np.maximum(distance, value - high, out=distance)
+        outside: npt.NDArray[np.bool_] = distance > 0
+        outside |= np.isnan(value)
+        counts = outside.sum(axis=0)
+        first = outside.argmax(axis=0)
+        for j, name in enumerate(names[columns]):
+            if counts[j] == 0:
+                checks[name] = SignalCheck(name, 0, 0.0)
+                continue
+            rows = outside[:, j]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                excess = distance[rows, j] / tolerance[rows, j]
+            row = int(first[j])
+            checks[name] = SignalCheck(
+                name,
+                int(counts[j]),
+                float(np.max(np.nan_to_num(excess, nan=np.inf, posinf=np.inf))),
+                float(x_ref[row]),
+                float(value[row, j]),
+                float(low[row, j]),
+                float(high[row, j]),
+                name not in result.header[1:],
+            )
+    return WaveformComparison(checks, bool(in_range))
+
+
+def _shift_at(x: float, time_shift: float, log_x: bool) -> float:
+    """time_shift in units of x at x"""
+    if log_x:
+        return float(x * (10.0**time_shift - 1.0))
+    return time_shift
@@ -1,35 +1,140 @@
-from typing import TypeAlias
+from itertools import pairwise
+from typing import Optional, TypeAlias
 
 import numpy as np
 import numpy.typing as npt
-from scipy.interpolate import interp1d
+
+from .profiling import stage
+from .resample import Resampler, adaptive
 
 numpy_flt: TypeAlias = npt.NDArray[np.float64]
 
 
+def _window_rows(x: numpy_flt, x_begin: float, x_end: float) -> slice:
+    """rows of the native samples with x_begin <= x <= x_end"""
+    first = np.searchsorted(x, x_begin, side="left")
+    last = np.searchsorted(x, x_end, side="right")
+    return slice(int(first), int(last))
+
+
+def _column_key(columns: list[int]) -> slice | list[int]:
+    """columns as a slice where they are evenly spaced, so indexing with it
+    returns a view"""
+    if len(columns) == 1:
+        return slice(columns[0], columns[0] + 1)
+    step = columns[1] - columns[0]
+    regular = step > 0 and all(b - a == step for a, b in pairwise(columns))
+    if regular:
+        return slice(columns[0], columns[-1] + 1, step)
+    return columns
+
+
 class Waveforms:
     """Waveforms with a single x value and one or more y values in a 2D numpy array.
-    header defines the column names."""
+    header defines the column names.
 
-    def __init__(self, header: list[str], data: numpy_flt, npts: int = 1000):
+    By default the data is resampled onto npts evenly spaced points. With
+    npts=None the native (non-uniform) ngspice timesteps are kept, every
+    point of a fast edge included; with a tolerance as well, only the native
+    points needed to stay within that relative error (resample.adaptive).
+
+    data has the dtype of the input data (float64 unless given e.g. float32
+    results), or dtype if given. With a dtype narrower than float64 the x-axis
+    is also kept in float64 (x_axis) unless keep_x64 is False."""
+
+    def __init__(
+        self,
+        header: list[str],
+        data: numpy_flt,
+        npts: Optional[int] = 1000,
+        dtype: Optional[npt.DTypeLike] = None,
+        x_axis: Optional[numpy_flt] = None,
+        keep_x64: bool = True,
+        tolerance: Optional[float] = None,
+    ):
+        """
+        Args:
+            header (list[str]): column names, x-axis first
+            data (numpy_flt): 2D array, x-axis in column 0
+            npts (int): number of evenly spaced points to resample onto, None
+                to keep the native points
+            dtype: storage dtype, default the dtype of data
+            x_axis (numpy_flt): float64 x-axis of data, e.g. SimResults.x_axis
+            keep_x64 (bool): keep the x-axis in float64 with a narrower dtype
+            tolerance (float): with npts=None, drop native points that linear
+                interpolation recovers within tolerance * peak-to-peak
+        """
         self.header: list[str] = header
+        if dtype is None:
+            floating = np.issubdtype(data.dtype, np.floating)
+            dtype = data.dtype if floating else np.float64
+        self.keep_x64 = keep_x64
 
-        column_count: int = data.shape[1]  # number of columns
-        self.data: numpy_flt = np.zeros((npts, column_count))
-        self.data[:, 0] = np.linspace(data[0, 0], data[-1, 0], npts)
+        with stage("waveforms.resample") as rec:
+            x_in: numpy_flt = x_axis if x_axis is not None else data[:, 0]
+            if npts is not None:
+                x_out = np.linspace(x_in[0], x_in[-1], npts)
+                self._resample(x_in, data[:, 1:], x_out, dtype)
+            elif tolerance is not None:
+                x_kept, y_kept = adaptive(x_in, data[:, 1:], rtol=tolerance)
+                self._store(x_kept, y_kept, dtype)
+            else:
+                self._store(x_in, data[:, 1:], dtype)
+            rec.add(rows=data.shape[0])
 
-        # interpolate y-values for each column
-        x: numpy_flt = data[:, 0]
-        for i in range(1, column_count):
-            y: numpy_flt = data[:, i]
-            f = interp1d(x, y)
-            self.data[:, i] = f(self.data[:, 0])
+    def _resample(
+        self, x_in: numpy_flt, y_in: numpy_flt, x_out: numpy_flt, dtype: npt.DTypeLike
+    ) -> None:
+        """interpolate the y columns onto x_out and store them as dtype"""
+        self._store(x_out, Resampler(x_in, x_out)(y_in), dtype)
+
+    def _store(self, x: numpy_flt, y: numpy_flt, dtype: npt.DTypeLike) -> None:
+        """data (a new array) from an x-axis and y columns"""
+        self.data: numpy_flt = np.empty((x.size, y.shape[1] + 1), dtype=dtype)
+        self.data[:, 0] = x
+        self.data[:, 1:] = y
+        narrow = self.data.dtype.itemsize < np.dtype(np.float64).itemsize
+        self.x_axis: Optional[numpy_flt] = None
+        if narrow and self.keep_x64:
+            self.x_axis = np.array(x, dtype=np.float64)
+
+    @classmethod
+    def _wrap(
+        cls,
+        header: list[str],
+        data: numpy_flt,
+        x_axis: Optional[numpy_flt],
+        keep_x64: bool = True,
+    ) -> "Waveforms":
+        """a Waveforms holding data as it is, without resampling"""
+        waves = cls.__new__(cls)
+        waves.header = header
+        waves.data = data
+        waves.x_axis = x_axis
+        waves.keep_x64 = keep_x64
+        return waves
+
+    @property
+    def x(self) -> numpy_flt:
+        """x-axis at the best resolution available"""
+        if self.x_axis is not None:
+            return self.x_axis
+        return self.data[:, 0]
 
     @property
     def npts(self) -> int:
         """number of data points (rows) in the waveform"""
         return int(self.data.shape[0])
 
+    def window(self, x_begin: float, x_end: float) -> "WaveformsView":
+        """View of the samples with x_begin <= x <= x_end, without
+        interpolation or copying (see WaveformsView)"""
+        return WaveformsView(self).window(x_begin, x_end)
+
+    def columns(self, vecs: list[str]) -> "WaveformsView":
+        """View of the x-axis and the vecs columns, without copying"""
+        return WaveformsView(self).columns(vecs)
+
     def vec_subset(self, vecs: list[str]) -> None:
         """create a smaller subset of the header vectors
 
@@ -37,16 +142,14 @@ class Waveforms:
             vecs (list[str]): vector subset
         """
         if set(vecs).issubset(self.header):
-            indices_for_deletion = [
-                index for index, item in enumerate(self.header) if item not in vecs
+            # keep the x-axis and the vecs, in header order, with one copy
+            keep = [0] + [
+                index
+                for index, item in enumerate(self.header)
+                if index and item in vecs
             ]
-            indices_for_deletion.sort(reverse=True)
-            del indices_for_deletion[-1]  # remove index 0 (x-axis) from list
-
-            # Delete header names & data columns, starting from end, working backwards
-            for i in indices_for_deletion:
-                del self.header[i]
-                self.data = np.delete(self.data, i, axis=1)
+            self.header[:] = [self.header[i] for i in keep]
+            self.data = self.data[:, keep]
         else:
             print("Error: vecs is not a subset of the header list")
 
@@ -58,28 +161,25 @@ class Waveforms:
             x_end (float): new x end
             npts (int): number of linear points in new array
         """
-        x_orig = self.data[:, 0]
-        y_origs = self.data[:, 1:]
-        x_new = np.linspace(x_begin, x_end, npts)
-        new_array = np.zeros((npts, y_origs.shape[1] + 1))
-        new_array[:, 0] = x_new
-
-        # Interpolate y columns using interp1d
-        for i in range(y_origs.shape[1]):
-            funct = interp1d(x_orig, y_origs[:, i])
-            new_array[:, i + 1] = funct(x_new)
-
-        self.data = new_array
+        if not self.x[0] <= x_begin <= x_end <= self.x[-1]:
+            raise ValueError("x_begin and x_end must be inside the x-axis")
+        with stage("waveforms.x_range") as rec:
+            x_orig = self.x
+            x_new = np.linspace(x_begin, x_end, npts)
+            self._resample(x_orig, self.data[:, 1:], x_new, self.data.dtype)
+            rec.add(rows=x_orig.size)
 
     def single_column(self, signal_name: str) -> numpy_flt:
         """Returns a single Numpy Array for the wave"""
         index: int = self.header.index(signal_name)
+        if index == 0:
+            return self.x
         return self.data[:, index]
 
     def x_axis_and_sigs(self, signal_names: list[str]) -> list[numpy_flt]:
         """Returns X-Axis numpy and all the waves"""
 
-        list_of_numpys = [self.data[:, 0]]  # First, the x-axis (always 1st col.)
+        list_of_numpys = [self.x]  # First, the x-axis (always 1st col.)
         for signal_name in signal_names:
             list_of_numpys.append(self.single_column(signal_name))
 
@@ -88,6 +188,7 @@ class Waveforms:
     def new_wave(self, wave_name: str, column: numpy_flt) -> None:
         """Add a new waveform to the object"""
         self.header.append(wave_name)
+        column = np.asarray(column, dtype=self.data.dtype)  # no float64 promotion
         self.data = np.column_stack((self.data, column))
 
     def multiply(self, factor1_name: str, factor2_name: str, result_name: str) -> None:
@@ -113,3 +214,94 @@ class Waveforms:
         )
 
         self.new_wave(result_name, result)
+
+
+class WaveformsView:
+    """A window of rows and a subset of columns of a Waveforms that shares its
+    data: nothing is interpolated or copied until copy() is called. Columns
+    and the x-axis come out as numpy views, ready for Plot or StepInfo.
+
+        step = waves.window(9e-6, 12e-6).columns(["out"])
+        x_out, out = step.x_axis_and_sigs(["out"])
+        edge = step.copy()  # a Waveforms of its own
+
+    Writing into a view writes into the Waveforms. Operations that replace
+    the data of the Waveforms (x_range, new_wave, ...) leave the view on the
+    data it was created from.
+    """
+
+    def __init__(
+        self,
+        waves: Waveforms,
+        rows: slice = slice(None),
+        columns: Optional[list[int]] = None,
+    ) -> None:
+        self._data = waves.data
+        self._x_axis = waves.x_axis
+        self._keep_x64 = waves.keep_x64
+        self._rows = rows
+        self._columns = (
+            columns if columns is not None else list(range(len(waves.header)))
+        )
+        self.header: list[str] = [waves.header[i] for i in self._columns]
+
+    @property
+    def x(self) -> numpy_flt:
+        """x-axis at the best resolution available"""
+        if self._x_axis is not None:
+            return self._x_axis[self._rows]
+        return self._data[self._rows, 0]
+
+    @property
+    def npts(self) -> int:
+        """number of data points (rows) in the view"""
+        return int(self.x.size)
+
+    @property
+    def data(self) -> numpy_flt:
+        """the view as a 2D array, x-axis first: a view of the Waveforms' data
+        when the columns are evenly spaced in it, a copy otherwise"""
+        return self._data[self._rows, _column_key(self._columns)]
+
+    def _sub_view(
+        self, rows: slice, columns: list[int], header: list[str]
+    ) -> "WaveformsView":
+        view = WaveformsView.__new__(WaveformsView)
+        view._data = self._data
+        view._x_axis = self._x_axis
+        view._keep_x64 = self._keep_x64
+        view._rows = rows
+        view._columns = columns
+        view.header = header
+        return view
+
+    def window(self, x_begin: float, x_end: float) -> "WaveformsView":
+        """the samples of this view with x_begin <= x <= x_end"""
+        start = self._rows.start or 0
+        inner = _window_rows(self.x, x_begin, x_end)
+        rows = slice(start + inner.start, start + inner.stop)
+        return self._sub_view(rows, self._columns, self.header)
+
+    def columns(self, vecs: list[str]) -> "WaveformsView":
+        """the x-axis and the vecs columns of this view, in the order of vecs"""
+        columns = [self._columns[0]]
+        columns += [self._columns[self.header.index(vec)] for vec in vecs]
+        return self._sub_view(self._rows, columns, [self.header[0]] + vecs)
+
+    def single_column(self, signal_name: str) -> numpy_flt:
+        """one column of the view, as a view"""
+        index = self.header.index(signal_name)
+        if index == 0:
+            return self.x
+        return self._data[self._rows, self._columns[index]]
+
+    def x_axis_and_sigs(self, signal_names: list[str]) -> list[numpy_flt]:
+        """x-axis and the signal_names columns, as views"""
+        return [self.x] + [self.single_column(name) for name in signal_names]
+
+    def copy(self) -> Waveforms:
+        """a Waveforms with a copy of the view's data (native samples, not
+        resampled)"""
+        data = np.array(self.data)  # a copy, even when data is a view
+        x_axis = None if self._x_axis is None else self._x_axis[self._rows].copy()
+        return Waveforms._wrap(list(self.header), data, x_axis, self._keep_x64)
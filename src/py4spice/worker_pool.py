@@ -0,0 +1,413 @@
+"""Long-lived ngspice processes that run many simulations each.
+
+Every worker is one `ngspice -p` (pipe mode) process. A job is sent as
+commands: the analysis and output lines of its Analyses, then `destroy all` to
+free their vectors. An `echo` of a marker tells when the job is done. Process
+start-up and initialization (spinit, code models, startup commands) happen
+once per worker instead of once per run.
+
+A worker keeps its circuit loaded between jobs. The circuit, and the
+.include/.lib model libraries it pulls in, are parsed (`source`) only when a
+job brings a netlist the worker does not have loaded, by path and by the
+content of the netlist and its included files; the previous circuit is then
+freed with `remcirc`. Later jobs on the same circuit start from a `reset`, which
+undoes the `alter`s of earlier jobs, and idle workers prefer jobs on the
+circuit they have loaded. AlterJob runs many variants of one circuit in a job.
+
+The netlist of a job must not have a .control block: its `quit` would end the
+worker.
+"""
+
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from types import TracebackType
+from typing import Iterable, Optional, Self
+
+from .analyses import Analyses
+from .incremental import file_hash
+from .netlist import included_files
+from .profiling import stage
+from .sim_stats import SimStats
+from .simulate import RunResult, classify
+
+# sent once to every worker, like the beginning of Control
+STARTUP_COMMANDS: list[str] = ["set wr_singlescale", "set wr_vecnames"]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """resident memory of a process in MB, None where /proc is missing"""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return None
+
+
+class WorkerJob:
+    """One simulation for a WorkerPool"""
+
+    def __init__(
+        self,
+        name: str,
+        netlist_filename: Path,
+        analyses: list[Analyses],
+        transcript_filename: Optional[Path] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): simulation name
+            netlist_filename (Path): circuit, without a .control block
+            analyses (list[Analyses]): analyses to run and write
+            transcript_filename (Path): where to append the output, if given
+        """
+        self.name = name
+        self.netlist_filename = netlist_filename
+        self.analyses = analyses
+        self.transcript_filename = transcript_filename
+
+    @property
+    def circuit(self) -> tuple[str, ...]:
+        """netlist path and hashes of it and its included files: a worker
+        with this circuit loaded runs the job without sourcing it again"""
+        text = self.netlist_filename.read_text(errors="replace")
+        includes = included_files(text, self.netlist_filename.parent)
+        hashes = [file_hash(path) for path in [self.netlist_filename] + includes]
+        return (str(self.netlist_filename.resolve()), *hashes)
+
+    @property
+    def commands(self) -> list[str]:
+        """run on the loaded circuit, free the vectors"""
+        lines: list[str] = []
+        for analysis in self.analyses:
+            lines.extend(analysis.lines_for_cntl())
+        return lines + ["destroy all"]
+
+
+class AlterJob(WorkerJob):
+    """Variants of one circuit in one job. Each variant is `alter` commands,
+    its analyses and the commands that undo the alter. A variant that does not converge leaves its results missing and
+    the next one still runs."""
+
+    def __init__(
+        self,
+        name: str,
+        netlist_filename: Path,
+        variants: list[tuple[list[str], list[Analyses], list[str]]],
+        transcript_filename: Optional[Path] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): simulation name
+            netlist_filename (Path): circuit, without a .control block
+            variants: per variant the alter commands, the analyses (each
+                variant writing its own results files) and the commands
+                that restore the circuit
+            transcript_filename (Path): where to append the output, if given
+        """
+        analyses = [analysis for _, group, _ in variants for analysis in group]
+        super().__init__(name, netlist_filename, analyses, transcript_filename)
+        self.variants = variants
+
+    @property
+    def commands(self) -> list[str]:
+        lines: list[str] = []
+        for alters, analyses, restores in self.variants:
+            lines.extend(alters)
+            for analysis in analyses:
+                lines.extend(analysis.lines_for_cntl())
+            lines.extend(restores + ["destroy all"])
+        return lines
+
+
+class NgspiceWorker:
+    """One ngspice process in pipe mode"""
+
+    def __init__(self, ngspice_exe: Path, startup: Optional[list[str]] = None) -> None:
+        self.ngspice_exe = ngspice_exe
+        self.startup = STARTUP_COMMANDS + (startup or [])
+        self.process: Optional[subprocess.Popen[str]] = None
+        self.lines: queue.Queue[Optional[str]] = queue.Queue()  # None at EOF
+        self.jobs_done = 0
+        self.starts = 0
+        self.sources = 0  # circuits parsed
+        self.circuit: Optional[tuple[str, ...]] = None  # WorkerJob.circuit loaded
+        self._markers = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, timeout: float = 20) -> None:
+        """start ngspice and send the startup commands"""
+        self.process = subprocess.Popen(
+            [str(self.ngspice_exe), "-p"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        self.lines = queue.Queue()
+        threading.Thread(
+            target=self._read, args=(self.process, self.lines), daemon=True
+        ).start()
+        self.jobs_done = 0
+        self.circuit = None
+        self.starts += 1
+        self.send(self.startup, timeout)
+
+    @staticmethod
+    def _read(
+        process: subprocess.Popen[str], lines: queue.Queue[Optional[str]]
+    ) -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def stop(self) -> None:
+        """kill the process (and anything it started)"""
+        if self.process is None:
+            return
+        if self.alive:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError):  # no killpg on Windows
+                self.process.kill()
+        self.process.wait()
+        self.process = None
+        self.circuit = None
+
+    def send(self, commands: list[str], timeout: float) -> str:
+        """Send commands and return their output once ngspice has done them.
+
+        Raises:
+            TimeoutError: not done within timeout seconds
+            EOFError: ngspice exited
+        """
+        if self.process is None or self.process.stdin is None:
+            raise EOFError("worker is not running")
+        self._markers += 1
+        marker = f"py4spice-done-{self._markers}"
+        try:
+            self.process.stdin.write("\n".join(commands + [f"echo {marker}"]) + "\n")
+            self.process.stdin.flush()
+        except BrokenPipeError as err:
+            raise EOFError("ngspice exited") from err
+
+        output: list[str] = []
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty as err:
+                raise TimeoutError("".join(output)) from err
+            if line is None:
+                raise EOFError("".join(output))
+            if marker in line:
+                return "".join(output)
+            output.append(line)
+
+    def run(
+        self, job: WorkerJob, timeout: float, circuit: Optional[tuple[str, ...]] = None
+    ) -> tuple[RunResult, str]:
+        """Run one job; on a crash or timeout the worker is stopped.
+
+        Args:
+            job (WorkerJob): job to run
+            timeout (float): seconds
+            circuit (tuple): job.circuit, if already known
+        """
+        start = time.perf_counter()
+        circuit = circuit if circuit is not None else job.circuit
+        if circuit == self.circuit:
+            load = ["reset"]  # back to the circuit as sourced
+        else:
+            load = ["remcirc"] if self.circuit is not None else []
+            load.append(f"source {job.netlist_filename}")
+            self.circuit = None  # until the source is done
+            self.sources += 1
+        try:
+            output = self.send(load + job.commands, timeout)
+        except TimeoutError as err:
+            self.stop()
+            message = f"killed after {timeout} s"
+            elapsed = time.perf_counter() - start
+            return RunResult(job.name, "timeout", None, elapsed, message), str(err)
+        except EOFError as err:
+            returncode = self.process.wait() if self.process is not None else None
+            self.stop()
+            output = str(err)
+            outcome, message = classify(returncode or 1, output)
+            elapsed = time.perf_counter() - start
+            return RunResult(job.name, outcome, returncode, elapsed, message), output
+
+        self.jobs_done += 1
+        self.circuit = circuit
+        outcome, message = classify(0, output)
+        elapsed = time.perf_counter() - start
+        stats = SimStats.from_transcript(output)
+        return RunResult(job.name, outcome, 0, elapsed, message, stats), output
+
+
+class WorkerPool:
+    """Runs WorkerJobs on a fixed number of persistent ngspice workers. Each
+    idle worker takes the next job. Workers that crash, time out, grow past
+    memory_limit_mb or have done max_jobs are restarted.
+
+        with WorkerPool(ngspice_exe, workers=8) as pool:
+            results = pool.run(jobs)
+    """
+
+    def __init__(
+        self,
+        ngspice_exe: Path,
+        workers: Optional[int] = None,
+        startup: Optional[list[str]] = None,
+        timeout: float = 20,
+        memory_limit_mb: Optional[float] = None,
+        max_jobs: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            ngspice_exe (Path): ngspice executable
+            workers (int): number of processes, default the number of CPUs
+            startup (list[str]): commands every worker runs once, e.g. setting
+                options or loading code models
+            timeout (float): seconds per job
+            memory_limit_mb (float): restart a worker above this resident memory
+            max_jobs (int): restart a worker after this many jobs
+        """
+        count = workers if workers is not None else os.cpu_count() or 1
+        self.workers = [NgspiceWorker(ngspice_exe, startup) for _ in range(count)]
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs = max_jobs
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @property
+    def restarts(self) -> int:
+        """workers started again after a crash, timeout or limit"""
+        return sum(max(worker.starts - 1, 0) for worker in self.workers)
+
+    def close(self) -> None:
+        """stop all workers"""
+        for worker in self.workers:
+            worker.stop()
+
+    def _needs_restart(self, worker: NgspiceWorker) -> bool:
+        if not worker.alive:
+            return True
+        if self.max_jobs is not None and worker.jobs_done >= self.max_jobs:
+            return True
+        if self.memory_limit_mb is not None and worker.process is not None:
+            memory = rss_mb(worker.process.pid)
+            return memory is not None and memory > self.memory_limit_mb
+        return False
+
+    def _ready(self, worker: NgspiceWorker) -> None:
+        """(re)start a worker that needs it"""
+        if worker.process is not None and not self._needs_restart(worker):
+            return
+        worker.stop()
+        worker.start(self.timeout)
+
+    def _run_job(
+        self,
+        worker: NgspiceWorker,
+        job: WorkerJob,
+        circuit: Optional[tuple[str, ...]] = None,
+    ) -> RunResult:
+        for analysis in job.analyses:  # never read a previous run's results
+            analysis.results_filename.unlink(missing_ok=True)
+        with stage("worker_pool.job", name=job.name) as rec:
+            try:
+                self._ready(worker)
+                result, output = worker.run(job, self.timeout, circuit)
+            except (OSError, EOFError, TimeoutError) as err:  # could not start
+                worker.stop()
+                result, output = RunResult(job.name, "error", message=repr(err)), ""
+            missing = [a.name for a in job.analyses if not a.results_filename.exists()]
+            if result.ok and missing:
+                result.outcome = "error"
+                result.message = f"no results: {', '.join(missing)}"
+            rec.add(bytes_read=len(output))
+            rec.args.update(outcome=result.outcome)
+        if job.transcript_filename is not None:
+            with open(job.transcript_filename, "a") as file:
+                file.write(f"\n-----------------\nSimulation name: {job.name}\n")
+                file.write(output)
+        return result
+
+    def run(self, jobs: Iterable[WorkerJob]) -> list[RunResult]:
+        """Run jobs on the workers. Returns a RunResult per job, in the order
+        of jobs; a failed job does not stop the others. A worker takes the
+        next job on the circuit it has loaded, else the first job of the
+        earliest circuit still queued."""
+        job_list = list(jobs)
+        results: list[Optional[RunResult]] = [None] * len(job_list)
+        circuits: list[Optional[tuple[str, ...]]] = []
+        # circuit -> its jobs in order; a job whose netlist cannot be read
+        # gets a queue of its own
+        todo: dict[tuple[str, ...], deque[int]] = {}
+        for index, job in enumerate(job_list):
+            try:
+                circuits.append(job.circuit)
+            except OSError:
+                circuits.append(None)
+            todo.setdefault(circuits[-1] or ("", str(index)), deque()).append(index)
+        lock = threading.Lock()
+
+        def take(worker: NgspiceWorker) -> Optional[int]:
+            with lock:
+                key = (
+                    worker.circuit if worker.circuit in todo else next(iter(todo), None)
+                )
+                if key is None:
+                    return None
+                index = todo[key].popleft()
+                if not todo[key]:
+                    del todo[key]
+                return index
+
+        def serve(worker: NgspiceWorker) -> None:
+            while (index := take(worker)) is not None:
+                job = job_list[index]
+                try:
+                    results[index] = self._run_job(worker, job, circuits[index])
+                except OSError as err:  # results or transcript file
+                    results[index] = RunResult(job.name, "error", message=repr(err))
+
+        threads = [
+            threading.Thread(target=serve, args=(worker,)) for worker in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [
+            result
+            if result is not None
+            else RunResult(job.name, "error", message="not run")  # serve() died
+            for job, result in zip(job_list, results)
+        ]
@@ -0,0 +1,222 @@
+"""Scratch directories that keep concurrent simulations apart"""
+
+import os
+import re
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from types import TracebackType
+from typing import Iterable, Optional, Self
+
+from .analyses import Analyses
+from .control import Control
+from .netlist import Netlist
+from .simulate import Simulate
+
+# RAM-backed directory on Linux
+SHM_DIR = Path("/dev/shm")
+# parent of the fallback root, used when the system temporary directory has
+# uppercase letters (e.g. TMPDIR=/scratch/Build)
+FALLBACK_TMP = Path("/tmp")
+
+
+def _survives_lowercase(path: Path) -> bool:
+    """the lowercased path is the same directory (lowercase already, or a
+    case-insensitive file system)"""
+    lowered = Path(str(path).lower())
+    return lowered == path or (lowered.exists() and lowered.samefile(path))
+
+
+def _fallback_root() -> Optional[Path]:
+    """a lowercase directory of this user in /tmp, None where there is none"""
+    if not hasattr(os, "getuid") or not FALLBACK_TMP.is_dir():
+        return None
+    root = FALLBACK_TMP / f"py4spice_{os.getuid()}"
+    root.mkdir(mode=0o700, exist_ok=True)
+    return root
+
+
+class RunWorkspace:
+    """A unique scratch directory for one simulation run: its netlist,
+    results files and transcript. Runs with the same analysis names do not
+    overwrite each other, and with use_shm the files never touch the disk.
+
+    The directory is deleted by cleanup(), at the end of a with block, or when
+    the workspace is garbage collected, unless keep is True.
+
+        with RunWorkspace("sim1", use_shm=True) as work:
+            analyses = work.rebase(analyses)
+            control = work.control(analyses)
+            ...  # netlist with str(control)
+            sim = work.simulate(ngspice_exe, netlist)
+            sim.run()
+            results = SimResults.from_file("tran", analyses[0].results_filename)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        root: Optional[Path] = None,
+        use_shm: bool = False,
+        keep: bool = False,
+    ) -> None:
+        """
+        Args:
+            name (str): simulation name, used in the directory name
+            root (Path): where to create the directory, default the system
+                temporary directory, or /tmp/py4spice_<uid> if that path has
+                uppercase letters
+            use_shm (bool): create it in /dev/shm if there is one (ignored
+                if root is given)
+            keep (bool): leave the directory in place for debugging
+
+        Raises:
+            ValueError: the directory path has uppercase letters on a
+                case-sensitive file system and no lowercase one could be
+                used instead. Netlist lowercases its lines, so ngspice would
+                write results to the lowercased path.
+        """
+        default_root = root is None
+        if root is None:
+            root = SHM_DIR if use_shm and SHM_DIR.is_dir() else None
+        # lowercase: Netlist lowercases lines, paths in them must survive
+        prefix = re.sub(r"[^a-z0-9_]", "_", name.lower())
+        self.name = name
+        path = Path(tempfile.mkdtemp(prefix=f"py4spice_{prefix}_", dir=root))
+        if not _survives_lowercase(path):
+            path.rmdir()
+            fallback = _fallback_root() if default_root else None
+            if fallback is None:
+                raise ValueError(
+                    f"workspace path {path} has uppercase letters, which "
+                    "netlists lowercase; give a lowercase root"
+                )
+            path = Path(tempfile.mkdtemp(prefix=f"py4spice_{prefix}_", dir=fallback))
+        self.path = path
+        self.keep = keep
+        self._finalizer = weakref.finalize(
+            self, shutil.rmtree, self.path, ignore_errors=True
+        )
+        if keep:
+            self._finalizer.detach()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.cleanup()
+
+    def cleanup(self) -> None:
+        """delete the directory (unless keep)"""
+        if not self.keep:
+            self._finalizer()
+
+    @property
+    def netlist_filename(self) -> Path:
+        return self.path / f"{self.path.name}.cir"
+
+    @property
+    def transcript_filename(self) -> Path:
+        return self.path / "transcript.log"
+
+    def rebase(self, analyses: list[Analyses]) -> list[Analyses]:
+        """copies of analyses that write their results in the workspace"""
+        return [
+            Analyses(a.name, a.cmd_type, a.cmd, a.vector, self.path) for a in analyses
+        ]
+
+    def control(self, analyses: list[Analyses]) -> Control:
+        """control block running analyses with results in the workspace"""
+        control = Control()
+        for analysis in self.rebase(analyses):
+            control.insert_lines(analysis.lines_for_cntl())
+        return control
+
+    def simulate(
+        self,
+        ngspice_exe: Path,
+        netlist: Netlist,
+        timeout: int = 20,
+        piped: bool = False,
+        analyses: Optional[list[Analyses]] = None,
+    ) -> Simulate:
+        """Set up the simulation of netlist, with a transcript of its own.
+
+        Args:
+            ngspice_exe (Path): ngspice executable
+            netlist (Netlist): netlist, control block made with control()
+            timeout (int): seconds
+            piped (bool): stream the netlist over stdin instead of writing it,
+                and, where named pipes exist (not on Windows), receive the
+                results of analyses through pipes instead of files. Read them
+                with Simulate.results().
+            analyses (list[Analyses]): analyses of the control block, for piped
+
+        Returns:
+            Simulate: ready to run
+        """
+        if not piped:
+            netlist.write_to_file(self.netlist_filename)
+            return Simulate(
+                ngspice_exe,
+                self.netlist_filename,
+                self.transcript_filename,
+                self.name,
+                timeout,
+            )
+
+        pipes: list[Path] = []
+        if hasattr(os, "mkfifo"):
+            for analysis in self.rebase(analyses or []):
+                filename = analysis.results_filename
+                if not filename.exists():
+                    os.mkfifo(filename)
+                pipes.append(filename)
+        return Simulate(
+            ngspice_exe,
+            self.netlist_filename,
+            self.transcript_filename,
+            self.name,
+            timeout,
+            netlist=netlist,
+            results_pipes=pipes,
+        )
+
+    def collect(
+        self, analyses: list[Analyses], destination: Optional[Path] = None
+    ) -> list[Path]:
+        """Move results out of the workspace before it is cleaned up.
+
+        Args:
+            analyses (list[Analyses]): the original (not rebased) analyses
+            destination (Path): directory, default each analysis' results_loc
+
+        Returns:
+            list[Path]: where the results files are now
+        """
+        moved: list[Path] = []
+        for original, rebased in zip(analyses, self.rebase(analyses)):
+            target = (destination or original.results_loc) / f"{original.name}.txt"
+            if rebased.results_filename.is_file():  # not a pipe
+                shutil.move(rebased.results_filename, target)
+                moved.append(target)
+        return moved
+
+
+def merge_transcripts(
+    workspaces: Iterable[RunWorkspace], transcript_filename: Path
+) -> None:
+    """Append the transcripts of finished runs to one file, in the order of
+    workspaces. Each run wrote its own file, so no run waited for a lock; call
+    this once, after the runs."""
+    with open(transcript_filename, "a") as merged:
+        for workspace in workspaces:
+            if workspace.transcript_filename.exists():
+                with open(workspace.transcript_filename, "r") as file:
+                    shutil.copyfileobj(file, merged)
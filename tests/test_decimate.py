@@ -0,0 +1,39 @@
+"""decimate.py unit test"""
+
+from pathlib import Path
+
+import numpy as np
+
+import py4spice as spi
+from py4spice import decimate
+
+
+def test_minmax_keeps_peaks() -> None:
+    """every bucket's min and max survive decimation"""
+    rng = np.random.default_rng(7)
+    x_data = np.sort(rng.uniform(0, 1, 200_000))
+    y_data = rng.normal(size=x_data.size)
+    y_data[12345] = 50.0  # a single-sample spike
+
+    x_dec, y_dec = decimate.minmax(x_data, y_data, 0.0, 1.0, 500)
+
+    assert x_dec.size <= 2 * 502 + 2
+    assert y_dec.max() == 50.0
+    assert y_dec.min() == y_data.min()
+    assert x_dec[0] == x_data[0] and x_dec[-1] == x_data[-1]
+    assert decimate.is_sorted(x_dec)
+
+
+def test_plot_zoom_redecimates(tmp_path: Path) -> None:
+    """zooming in plots the native points of the narrower range"""
+    x_data = np.linspace(0, 1, 1_000_000)
+    y_data = np.sin(2 * np.pi * 50 * x_data)
+
+    my_plot = spi.Plot("dec", [x_data, y_data], ["sig"], tmp_path)
+    full = my_plot.axe.get_lines()[0].get_xdata()
+    assert len(full) < 10_000
+
+    my_plot.zoom(xmin=0.5, xmax=0.5001)
+    zoomed = np.asarray(my_plot.axe.get_lines()[0].get_xdata())
+    assert zoomed.min() < 0.5 and zoomed.max() > 0.5001
+    assert 100 <= len(zoomed) <= 104  # native points plus one beyond each edge
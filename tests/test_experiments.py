@@ -0,0 +1,66 @@
+"""experiments.py unit test: a TOML spec runs, measures and caches"""
+
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+SPEC = """
+[GLOBAL]
+NGSPICE_EXE_STR = "{exe}"
+NETLISTS_DIR_STR = "netlists"
+RESULTS_DIR_STR = "sim_results"
+SIM_TRANSCRIPT_STR = "sim_transcript.log"
+
+[PROJECT]
+PROJ_PATH_STR = "."
+COMMON = ["dut.cir"]
+WORKERS = 2
+
+[EXPERIMENTS.part1]
+fragments = ["load.cir"]
+analyses = [{{ name = "op1", type = "op", cmd = "op" }}]
+measurements = [{{ name = "op", analysis = "op1", kind = "table", keys = ["out"] }}]
+
+[EXPERIMENTS.part2]
+fragments = ["load.cir"]
+lines = ["c1 out 0 1u"]
+analyses = [{{ name = "tr1", type = "tran", cmd = "tran 1u 1m", vectors = "out" }}]
+
+[[EXPERIMENTS.part2.measurements]]
+name = "out"
+analysis = "tr1"
+kind = "periodic"
+signal = "out"
+xbegin = 0.0
+xend = 1e-3
+properties = ["average", "ymax"]
+"""
+
+
+def test_experiments(tmp_path: Path) -> None:
+    netlists = tmp_path / "netlists"
+    netlists.mkdir()
+    (netlists / "dut.cir").write_text("vin in 0 1\nr1 in out 1k\n")
+    (netlists / "load.cir").write_text("r2 out 0 10k\n")
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=50)
+    spec = tmp_path / "experiments.toml"
+    spec.write_text(SPEC.format(exe=exe))
+
+    first = spi.ExperimentRunner.from_file(spec).run()
+    assert list(first) == ["part1", "part2"]
+    assert all(result.ok and result.run_result is not None for result in first.values())
+    assert list(first["part1"].measurements) == ["op.out"]
+    assert list(first["part2"].measurements) == ["out.average", "out.ymax"]
+    assert (tmp_path / "sim_results" / "part2" / "tr1.txt").exists()
+    assert (tmp_path / "sim_results" / "part2" / "part2.cir").exists()
+    assert sorted(path.name for path in netlists.iterdir()) == ["dut.cir", "load.cir"]
+
+    second = spi.ExperimentRunner.from_file(spec).run()  # nothing changed
+    assert all(result.run_result is None for result in second.values())
+    assert second["part2"].measurements == first["part2"].measurements
+
+    (netlists / "load.cir").write_text("r2 out 0 20k\n")
+    runner = spi.ExperimentRunner.from_file(spec)
+    assert runner.runner().stale() == ["part1", "part2"]
+    assert "op.out" in runner.run(["part1"])["part1"].table_for_print()
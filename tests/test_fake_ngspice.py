@@ -0,0 +1,55 @@
+"""fake_ngspice.py unit test: Simulate end to end without ngspice"""
+
+from pathlib import Path
+
+import numpy as np
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+
+def simulate(tmp_path: Path, analyses: list[spi.Analyses]) -> None:
+    """write a netlist with a control block for analyses and simulate it"""
+    control = spi.Control()
+    for analysis in analyses:
+        control.insert_lines(analysis.lines_for_cntl())
+    netlist = (
+        spi.Netlist("* divider\nvin in 0 12\nr1 in out 10k\nr2 out 0 10k")
+        + spi.Netlist(str(control))
+        + spi.Netlist(".end")
+    )
+    netlist_filename = tmp_path / "top.cir"
+    netlist.write_to_file(netlist_filename)
+
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=200)
+    transcript = tmp_path / "transcript.log"
+    spi.Simulate(exe, netlist_filename, transcript, "sim1").run()
+    assert "Circuit: * divider" in transcript.read_text()
+
+
+def test_results_parse(tmp_path: Path) -> None:
+    """results of every kind of analysis parse into SimResults"""
+    vec_all = spi.Vectors("all")
+    analyses = [
+        spi.Analyses("op1", "op", "op", vec_all, tmp_path),
+        spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("in out"), tmp_path),
+        spi.Analyses("ac1", "ac", "ac dec 10 1 1meg", spi.Vectors("out"), tmp_path),
+    ]
+    simulate(tmp_path, analyses)
+
+    op1, tr1, ac1 = (
+        spi.SimResults.from_file(a.cmd_type, a.results_filename) for a in analyses
+    )
+    assert set(op1.data_table) == {"in", "out", "vin#branch"}
+    assert tr1.header[0] == "time" and tr1.data_plot.shape == (200, 3)
+    assert ac1.header == ["frequency", "out-mag", "out-phase"]
+    assert ac1.data_plot.shape == (61, 3)
+
+
+def test_deterministic(tmp_path: Path) -> None:
+    """same netlist, same results"""
+    tr1 = spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path)
+    simulate(tmp_path, [tr1])
+    first = np.loadtxt(tr1.results_filename, skiprows=1)
+    simulate(tmp_path, [tr1])
+    assert np.array_equal(first, np.loadtxt(tr1.results_filename, skiprows=1))
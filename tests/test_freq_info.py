@@ -0,0 +1,60 @@
+"""freq_info.py unit test"""
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+
+
+def loop_gain(freq: np.ndarray, dc_gain: float, poles: list[float]) -> np.ndarray:
+    """complex response with real poles (Hz)"""
+    s = 1j * freq
+    response = np.full(freq.shape, dc_gain, dtype=complex)
+    for pole in poles:
+        response /= 1 + s / pole
+    return response
+
+
+def test_single_pole() -> None:
+    """bandwidth and crossover of a single pole match the analytic values"""
+    freq = np.logspace(0, 7, 701)
+    resp = loop_gain(freq, 1000.0, [1e3])
+    gain = 20 * np.log10(np.abs(resp))
+    phase = np.degrees(np.angle(resp))
+
+    meas = spi.FreqInfo(freq, gain, phase)
+
+    assert meas.bandwidth[0] == pytest.approx(1e3, rel=1e-2)
+    assert meas.unity_gain_freq[0] == pytest.approx(1e6, rel=1e-2)
+    assert meas.phase_margin[0] == pytest.approx(90.0, abs=0.5)
+    assert np.isnan(meas.gain_margin[0])  # phase never reaches -180
+
+
+def test_many_columns() -> None:
+    """each column is measured on its own"""
+    freq = np.logspace(0, 8, 801)
+    resps = [loop_gain(freq, 1e4, [10.0, p2, 1e6]) for p2 in (1e4, 1e5)]
+    gain = np.column_stack([20 * np.log10(np.abs(r)) for r in resps])
+    phase = np.column_stack([np.degrees(np.angle(r)) for r in resps])
+
+    meas = spi.FreqInfo(freq, gain, phase)
+
+    assert meas.signal_count == 2
+    assert meas.phase_margin[0] < meas.phase_margin[1]
+    assert np.all(meas.gain_margin > 0)
+    assert np.all(meas.phase_crossover_freq > meas.unity_gain_freq)
+
+
+def test_from_columns() -> None:
+    """mag/phase columns are found by name, as SimResults stores them"""
+    freq = np.logspace(-2, 5, 200)
+    gain = -20 * np.log10(np.sqrt(1 + (freq / 100) ** 2)) + 6
+    phase = -np.degrees(np.arctan(freq / 100))
+    header = ["frequency", "out-mag", "out-phase"]
+    data = np.column_stack((freq, gain, phase))
+
+    meas = spi.FreqInfo.from_columns(header, data, ["out"])
+
+    assert meas.dc_gain[0] == pytest.approx(6.0, abs=1e-3)
+    assert meas.bandwidth[0] == pytest.approx(100.0, rel=1e-2)
+    assert meas.peaking[0] == pytest.approx(0.0, abs=1e-3)
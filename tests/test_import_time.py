@@ -0,0 +1,48 @@
+"""import time benchmark: `import py4spice` must not pull in plotting or scipy"""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ("matplotlib", "scipy")
+
+# generous limit for a cold interpreter; eager matplotlib/scipy imports are ~1s
+IMPORT_SECONDS_LIMIT = 0.6
+
+
+def run_python(code: str) -> str:
+    """run code in a fresh interpreter (this one has already imported things)"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return completed.stdout.strip()
+
+
+def test_heavy_modules_not_imported() -> None:
+    """plotting and interpolation libraries load only when first used"""
+    code = (
+        "import sys, py4spice\n"
+        f"print(sorted(m for m in sys.modules if m.startswith({HEAVY_MODULES})))"
+    )
+    assert run_python(code) == "[]"
+
+
+def test_lazy_name_loads_on_use() -> None:
+    """lazy names still work, with from-imports too"""
+    code = (
+        "import sys\n"
+        "from py4spice import Plot\n"
+        "print(Plot.__name__, 'matplotlib.pyplot' in sys.modules)"
+    )
+    assert run_python(code) == "Plot True"
+
+
+def test_import_time() -> None:
+    """best of three cold imports stays under the limit"""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import py4spice\n"
+        "print(time.perf_counter() - start)"
+    )
+    best = min(float(run_python(code)) for _ in range(3))
+    assert best < IMPORT_SECONDS_LIMIT
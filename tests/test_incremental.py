@@ -0,0 +1,66 @@
+"""incremental.py unit test: only steps with changed inputs rerun"""
+
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+from py4spice.incremental import Step
+
+
+def test_incremental(tmp_path: Path) -> None:
+    (tmp_path / "dut.cir").write_text("vin in 0 1\nr1 in out 1k\n.include models.lib\n")
+    (tmp_path / "models.lib").write_text(".model d1 d\n")
+    (tmp_path / "rc.cir").write_text("c1 out 0 1u\n")
+    (tmp_path / "load.cir").write_text("r2 out 0 10k\n")
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=20)
+
+    def runner() -> spi.IncrementalRunner:
+        """the script: build the netlists and register the steps"""
+        run = spi.IncrementalRunner(exe, tmp_path / "manifest.json", tmp_path / "t.log")
+        dut = spi.Netlist(tmp_path / "dut.cir")
+        for name, part in (("sim1", "load.cir"), ("sim2", "rc.cir")):
+            analysis = spi.Analyses(
+                name, "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path
+            )
+            control = spi.Control()
+            control.insert_lines(analysis.lines_for_cntl())
+            top = dut + spi.Netlist(tmp_path / part) + spi.Netlist(str(control))
+            run.add(name, top, [analysis], tmp_path / f"{name}.cir")
+        return run
+
+    first = runner()
+    assert first.dependents(tmp_path / "models.lib") == ["sim1", "sim2"]
+    assert first.dependents(tmp_path / "rc.cir") == ["sim2"]
+    assert all(result is not None and result.ok for result in first.run().values())
+
+    assert runner().stale() == []  # a new Control timestamp does not matter
+
+    (tmp_path / "rc.cir").write_text("c1 out 0 2u\n")
+    second = runner()
+    assert second.stale() == ["sim2"]
+    outcomes = second.run()
+    assert outcomes["sim1"] is None and outcomes["sim2"] is not None
+    assert second.results("sim1")[0].data_plot.shape == (20, 2)
+
+    (tmp_path / "models.lib").write_text(".model d1 d is=1e-15\n")
+    (tmp_path / "sim1.txt").unlink()
+    assert runner().stale() == ["sim1", "sim2"]
+
+
+def test_nested_includes(tmp_path: Path) -> None:
+    """a change two includes deep is seen, and include cycles end"""
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "top.cir").write_text("vin in 0 1\n.INCLUDE lib/models.lib\n")
+    (tmp_path / "lib" / "models.lib").write_text(".include diodes.lib\n")
+    (tmp_path / "lib" / "diodes.lib").write_text(".model d1 d\n.lib models.lib tt\n")
+
+    netlist = spi.Netlist(tmp_path / "top.cir")
+    assert netlist.sources == [
+        (tmp_path / name).resolve()
+        for name in ("top.cir", "lib/models.lib", "lib/diodes.lib")
+    ]
+    analysis = spi.Analyses("sim1", "op", "op", spi.Vectors("all"), tmp_path)
+    step = Step("sim1", netlist, [analysis], tmp_path / "sim1.cir")
+    key = step.key
+    (tmp_path / "lib" / "diodes.lib").write_text(".model d1 d is=1e-15\n")
+    assert step.key != key
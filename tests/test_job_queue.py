@@ -0,0 +1,57 @@
+"""job_queue.py unit test: a sweep run by two worker processes"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+
+def test_workers(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=25)
+    queue = spi.SqliteQueue(tmp_path / "sweep.db")
+    analyses = [
+        spi.Analyses("op1", "op", "op", spi.Vectors("all"), tmp_path),
+        spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path),
+    ]
+    jobs = [
+        spi.QueueJob(f"r{r}", f"* r{r}\nvin in 0 1\nr1 in out {r}k\n.end", analyses)
+        for r in range(1, 7)
+    ]
+    jobs.append(spi.QueueJob("crash", "* crash\n*fake: crash\nvin in 0 1", analyses))
+    job_ids = queue.submit_all(jobs)
+
+    env = dict(os.environ, PYTHONPATH=str(Path(spi.__file__).parent.parent))
+    command = [sys.executable, "-m", "py4spice.job_queue", str(tmp_path / "sweep.db")]
+    command += ["--ngspice", str(exe), "--idle-exit", "1"]
+    workers = [subprocess.Popen(command, env=env) for _ in range(2)]
+    results = queue.wait(job_ids, timeout=60)
+    for worker in workers:
+        assert worker.wait(timeout=30) == 0
+
+    assert [r.name for r in results] == [job.name for job in jobs]
+    assert [r.outcome for r in results] == ["ok"] * 6 + ["error"]
+    assert queue.pending() == 0
+    first = results[0].results
+    assert set(first["op1"].data_table) == {"in", "out", "vin#branch"}
+    assert first["tr1"].header[0] == "time" and first["tr1"].data_plot.shape == (25, 2)
+    assert results[0].worker
+    queue.close()
+
+
+def test_expired_lease(tmp_path: Path) -> None:
+    """a worker whose lease expired cannot overwrite the new holder's result"""
+    queue = spi.SqliteQueue(tmp_path / "lease.db", lease=0.0)
+    job_id = queue.submit(spi.QueueJob("r1", "* r1\nvin in 0 1", []))
+    assert queue.claim("slow") is not None
+    time.sleep(0.01)
+    assert queue.claim("fast") is not None  # re-leased
+
+    assert queue.finish(job_id, "fast", "ok", "", {"elapsed": 1.0}, {})
+    assert not queue.finish(job_id, "slow", "error", "late", {}, {})
+    result = queue.result(job_id)
+    assert result is not None and result.worker == "fast" and result.ok
+    queue.close()
@@ -0,0 +1,27 @@
+"""op_diff.py unit test: align, flag and rank differences between runs"""
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+
+
+def test_op_diff() -> None:
+    typ = {"v(out)": 5.0, "v(in)": 15.0, "i(vin)": -1e-3}
+    slow = {"v(out)": 5.2, "v(in)": 15.0, "i(vin)": -1e-3}  # 4% off
+    fast = {"i(vin)": -1.0004e-3, "v(out)": 5.001, "v(extra)": 1.0}  # no v(in)
+    diff = spi.OpDiff([typ, slow, fast], labels=["typ", "slow", "fast"], rtol=1e-3)
+
+    assert diff.names.tolist() == ["v(out)", "v(in)", "i(vin)", "v(extra)"]
+    assert np.isnan(diff.values[2, 1]) and diff.values[2, 0] == 5.001
+    assert diff.delta[1, 0] == pytest.approx(0.2)
+    assert diff.relative[1, 0] == pytest.approx(0.04)
+    assert diff.run_summary() == {"typ": 0, "slow": 1, "fast": 2}
+    # missing on one side ranks first, then the largest excess over tolerance
+    assert diff.flagged()[-1] == "v(out)"
+    assert set(diff.flagged()) == {"v(in)", "v(extra)", "v(out)"}
+
+    lines = diff.report().splitlines()
+    assert lines[0].split() == ["name", "typ", "run", "value", "delta", "rel"]
+    assert lines[-1].split()[:3] == ["v(out)", "5.000", "slow"]
+    assert spi.OpDiff([typ, typ]).report() == "no differences out of tolerance\n"
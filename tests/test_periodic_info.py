@@ -0,0 +1,37 @@
+"""periodic_info.py unit test"""
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+
+
+def test_sine_with_harmonic() -> None:
+    """measurements of a sine with 10% 3rd harmonic on non-uniform timesteps"""
+    rng = np.random.default_rng(1)
+    time = np.sort(rng.uniform(0, 10e-3, 20000))
+    time = np.concatenate(([0.0], time, [10e-3]))
+    fund = 1e3
+    sig1 = 2.5 + np.sin(2 * np.pi * fund * time) + 0.1 * np.sin(6 * np.pi * fund * time)
+    sig2 = np.where(np.mod(time * fund, 1.0) < 0.25, 1.0, 0.0)  # 25% duty
+
+    meas = spi.PeriodicInfo(time, np.column_stack((sig1, sig2)), 0, 10e-3, 2**14)
+
+    assert meas.signal_count == 2
+    assert meas.frequency == pytest.approx([fund, fund], rel=1e-3)
+    assert meas.average[0] == pytest.approx(2.5, abs=1e-3)
+    assert meas.thd[0] == pytest.approx(0.1, rel=2e-2)
+    assert meas.duty_cycle[1] == pytest.approx(0.25, abs=1e-2)
+    assert meas.ac_rms[0] == pytest.approx(np.sqrt((1 + 0.01) / 2), rel=1e-3)
+
+
+def test_resampler_shared_columns() -> None:
+    """one Resampler interpolates every column like np.interp"""
+    x_in = np.array([0.0, 1.0, 1.5, 4.0])
+    y_in = np.column_stack((x_in**2, -x_in))
+    x_out = np.linspace(-1, 5, 13)
+
+    y_out = spi.Resampler(x_in, x_out)(y_in)
+
+    for col in range(2):
+        assert y_out[:, col] == pytest.approx(np.interp(x_out, x_in, y_in[:, col]))
@@ -0,0 +1,54 @@
+"""profiling.py unit test: stages of a simulation flow are recorded"""
+
+import json
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+from py4spice.profiling import stage
+
+
+def test_flow_stages(tmp_path: Path) -> None:
+    """each stage of netlist -> simulate -> results -> waveforms is recorded"""
+    tr1 = spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path)
+    control = spi.Control()
+    control.insert_lines(tr1.lines_for_cntl())
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=300)
+
+    with spi.profile() as prof:
+        netlist = spi.Netlist("* rc\nvin in 0 1\nr1 in out 1k") + spi.Netlist(
+            str(control)
+        )
+        netlist.write_to_file(tmp_path / "top.cir")
+        control.content_to_file(tmp_path / "cntl.spi")
+        sim = spi.Simulate(exe, tmp_path / "top.cir", tmp_path / "t.log", "sim1")
+        sim.run()
+        results = spi.SimResults.from_file("tran", tr1.results_filename)
+        spi.Waveforms(results.header, results.data_plot, npts=100)
+
+    totals = prof.totals()
+    assert list(totals) == [
+        "netlist.add",
+        "netlist.write",
+        "control.write",
+        "simulate.run",
+        "sim_results.from_file",
+        "waveforms.resample",
+    ]
+    assert totals["sim_results.from_file"]["rows"] == 300
+    assert totals["sim_results.from_file"]["read"] > 0
+    assert totals["simulate.run"]["wall"] > 0
+    assert "simulate.run" in prof.summary()
+
+    prof.to_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert len(events) == 6 and all(e["ph"] == "X" for e in events)
+
+    # nothing is recorded once the block ends
+    spi.Netlist("* more") + spi.Netlist(".end")
+    assert len(prof.records) == 6
+
+    # profiling off: every stage hands out the same record, which counts nothing
+    with stage("a") as first, stage("b") as second:
+        first.add(rows=5)
+    assert first is second and first.rows == 0
@@ -0,0 +1,46 @@
+"""render.py unit test"""
+
+from pathlib import Path
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+import py4spice as spi
+
+
+def test_render_pngs(tmp_path: Path) -> None:
+    """specs render in worker processes without touching pyplot or rcParams"""
+    x_data = np.linspace(0, 1e-3, 50_000)
+    specs = [
+        spi.PlotSpec(
+            f"plot{i}",
+            [x_data, np.sin(2 * np.pi * (i + 1) * 1e3 * x_data)],
+            ["out"],
+            tmp_path,
+            title=f"plot {i}",
+            x_info=("time", "sec", "linear"),
+            y_info=("voltage", "V", "linear"),
+            limits=(0.0, 5e-4, None, None),
+        )
+        for i in range(3)
+    ]
+    facecolor = mpl.rcParams["axes.facecolor"]
+
+    filenames = spi.render_pngs(specs, workers=2)
+
+    assert filenames == [tmp_path / f"plot{i}.png" for i in range(3)]
+    assert all(filename.stat().st_size > 0 for filename in filenames)
+    assert mpl.rcParams["axes.facecolor"] == facecolor
+
+
+def test_plot_png_closes_figure(tmp_path: Path) -> None:
+    """headless, Plot.png() leaves no pyplot figure behind"""
+    plt.switch_backend("agg")
+    before = len(plt.get_fignums())
+    x_data = np.linspace(0, 1e-3, 100)
+    for i in range(3):
+        plot = spi.Plot(f"p{i}", [x_data, np.sin(x_data * 1e4)], ["out"], tmp_path)
+        plot.png()
+    assert len(plt.get_fignums()) == before
+    assert (tmp_path / "p2.png").exists()
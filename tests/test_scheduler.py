@@ -0,0 +1,77 @@
+"""scheduler.py unit test: cost model, plan and parallel batches"""
+
+from pathlib import Path
+
+import pytest
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+from py4spice.scheduler import netlist_keys, plan, run_scheduled
+
+
+def test_keys() -> None:
+    slow = (
+        "* corner ss\nr1 in out 10k\nc1 out 0 1u\ntran 1u 1m\nwrdata /tmp/a/tr.txt out"
+    )
+    fast = (
+        "* corner ff\nr1 in out 1k\nc1 out 0 2u\ntran 1u 1m\nwrdata /tmp/b/tr.txt out"
+    )
+    longer = "r1 in out 1k\nc1 out 0 2u\ntran 1u 10m"
+    assert netlist_keys(slow)[0] != netlist_keys(fast)[0]
+    assert netlist_keys(slow)[1] == netlist_keys(fast)[1]  # same structure
+    assert netlist_keys(longer)[1] != netlist_keys(fast)[1]  # other analysis
+
+    model = spi.CostModel()
+    model.record(slow, 20.0)
+    assert model.estimate(slow) == 20.0
+    assert model.estimate(fast) == 20.0  # from the structure
+    model.record(fast, 1.0)
+    assert model.estimate(fast) == 1.0
+    model.record(longer, 4.0)
+    # nothing similar: the mean per netlist, structures not counted again
+    assert model.estimate("q1 c b e qmod\nop") == pytest.approx(25.0 / 3)
+
+
+def test_plan() -> None:
+    """longest first, on the least loaded worker"""
+    queues = plan([1, 20, 1, 1, 5, 1, 1], 2)
+    assert list(queues[0]) == [1]
+    assert list(queues[1]) == [4, 0, 2, 3, 5, 6]
+
+
+def test_stealing() -> None:
+    """tasks all run once and come back in order"""
+    tasks = [lambda i=i: i * i for i in range(20)]
+    assert run_scheduled(tasks, [1.0] * 20, 4) == [i * i for i in range(20)]
+
+
+def test_task_error() -> None:
+    """the error of a task is raised after the other tasks ran"""
+    done: list[int] = []
+
+    def task(i: int) -> int:
+        if i == 0:
+            raise ValueError("task 0")
+        done.append(i)
+        return i
+
+    tasks = [lambda i=i: task(i) for i in range(8)]
+    with pytest.raises(ValueError, match="task 0"):
+        run_scheduled(tasks, [1.0] * 8, 2)
+    assert sorted(done) == list(range(1, 8))
+
+
+def test_run_parallel(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=20)
+    supervisors = []
+    for r in range(4):
+        netlist_filename = tmp_path / f"r{r}.cir"
+        netlist_filename.write_text(f"* r{r}\nvin in 0 1\nr1 in out {r + 1}k\nop\n")
+        sim = spi.Simulate(exe, netlist_filename, tmp_path / f"r{r}.log", f"r{r}")
+        supervisors.append(spi.Supervisor(sim, []))
+
+    model = spi.CostModel(tmp_path / "costs.json")
+    results = spi.run_parallel(supervisors, 2, model)
+    assert [r.name for r in results] == ["r0", "r1", "r2", "r3"]
+    assert all(r.ok for r in results)
+    assert spi.CostModel(tmp_path / "costs.json").estimate("r1 in out 9k\nop") > 0
@@ -0,0 +1,73 @@
+"""sensitivity.py unit test: components, alter variants, normalized values"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+from py4spice.sensitivity import components_of, normalized
+
+NETLIST = """* rc filter
+vin in 0 1
+r1 in mid 1k
+c1 mid 0 10n
+rx mid out {rval}
+.subckt buf a b
+r9 a b 1meg
+.ends
+r2 out 0 4.7k
+.control
+op
+.endc
+.end"""
+
+
+def test_components_and_variants() -> None:
+    netlist = spi.Netlist(NETLIST)
+    assert components_of(netlist) == {"r1": 1e3, "c1": 10e-9, "r2": 4.7e3}
+
+    op1 = spi.Analyses("op1", "op", "op", spi.Vectors("all"), Path("."))
+    sens = spi.Sensitivity(netlist, [op1], [], ["R1", "c1"], delta=0.05, central=True)
+    labels = [label for label, _, _ in sens.variants]
+    assert labels == ["nominal", "r1_up", "r1_down", "c1_up", "c1_down"]
+    assert sens.variants[2][1:] == (["alter r1 = 950"], ["alter r1 = 1000"])
+    with pytest.raises(ValueError):
+        spi.Sensitivity(netlist, [op1], [], ["rx"])
+
+    nominal = np.array([2.0, 0.0])
+    up = np.array([[2.02, 1.0], [1.96, 1.0]])
+    down = np.array([[1.98, 1.0], [2.04, 1.0]])
+    assert normalized(nominal, up, down, 0.01)[:, 0] == pytest.approx([1.0, -2.0])
+    assert np.isnan(normalized(nominal, up, None, 0.01)[:, 1]).all()
+
+
+def test_run(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=20)
+    netlist = spi.Netlist(NETLIST)
+    op1 = spi.Analyses("op1", "op", "op", spi.Vectors("v(out) v(mid)"), tmp_path)
+    spec = {"name": "op", "analysis": "op1", "kind": "table", "keys": ["v(out)"]}
+
+    def ratio(results: dict[str, spi.SimResults]) -> float:
+        table = results["op1"].data_table
+        return table["v(out)"] / table["v(mid)"]
+
+    sens = spi.Sensitivity(netlist, [op1], [spec, ratio], central=True)
+    result = sens.run(exe, tmp_path / "sens", workers=2)
+
+    assert [r.outcome for r in result.run_results] == ["ok", "ok"]
+    assert result.names == ["op.v(out)", "ratio"]
+    assert result.measured.shape == (7, 2)  # nominal and 3 components up/down
+    assert (tmp_path / "sens" / "c1_down" / "op1.txt").exists()
+    expected = (result.measured[1, 0] - result.measured[2, 0]) / (
+        2 * 0.01 * result.measured[0, 0]
+    )
+    assert result.sensitivities[0, 0] == pytest.approx(expected)
+
+    ranked = result.ranked("ratio")
+    magnitudes = np.abs(ranked.value_array)
+    assert list(magnitudes) == sorted(magnitudes, reverse=True)
+    lines = result.report().splitlines()
+    assert lines[0].split() == ["component", "value", "op.v(out)", "ratio"]
+    assert len(lines) == 4
@@ -0,0 +1,35 @@
+"""shared_results.py unit test: arrays from worker processes are mapped, not copied"""
+
+from pathlib import Path
+
+import numpy as np
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+
+def test_parse_parallel(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=500)
+    analyses = [
+        spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("in out"), tmp_path),
+        spi.Analyses("op1", "op", "op", spi.Vectors("all"), tmp_path),
+    ]
+    control = spi.Control()
+    for analysis in analyses:
+        control.insert_lines(analysis.lines_for_cntl())
+    netlist = spi.Netlist("* shared\nvin in 0 1\nr1 in out 1k\nr2 out 0 1k")
+    netlist += spi.Netlist(str(control)) + spi.Netlist(".end")
+    netlist.write_to_file(tmp_path / "top.cir")
+    spi.Simulate(exe, tmp_path / "top.cir", tmp_path / "t.log", "sim1").run()
+
+    files = [(a.cmd_type, a.results_filename) for a in analyses]
+    tran, op = spi.parse_parallel(files, workers=2)
+    expected = spi.SimResults.from_file("tran", analyses[0].results_filename)
+    assert isinstance(tran.data_plot, np.memmap)
+    assert np.array_equal(tran.data_plot, expected.data_plot)
+    assert tran.header == expected.header
+    assert op.data_plot.size == 0 and op.data_table
+
+    tran.data_plot[0, 1] = 123.0  # copy-on-write: writable, file unchanged
+    handle = spi.share(expected, tmp_path / "tr1.npy")
+    assert np.array_equal(handle.open().data_plot, expected.data_plot)
@@ -0,0 +1,55 @@
+"""sim_stats.py unit test: solver statistics from ngspice output"""
+
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+TRANSCRIPT = """
+No. of Data Rows : 1043
+v(out) = 5.000000e+00
+Total analysis time (seconds) = 0.021
+Total elapsed time (seconds) = 0.058
+
+Total DRAM available = 15869.207 MB.
+Maximum ngspice program size =   48.215 MB.
+Current ngspice program size =   47.902 MB.
+
+Total iterations = 3871
+Transient iterations = 3850
+Circuit Equations = 12
+Transient timepoints = 1100
+Accepted timepoints = 1043
+Rejected timepoints = 57
+"""
+
+
+def test_parse() -> None:
+    stats = spi.SimStats.from_transcript(TRANSCRIPT)
+    assert stats.analysis_time == 0.021
+    assert stats.iterations == 3871
+    assert stats.equations == 12
+    assert stats.memory == 48.215
+    assert stats.rejected_fraction == 57 / 1100
+    assert "v(out)" not in str(stats)  # printed results are not statistics
+    assert not spi.SimStats.from_transcript("no statistics here")
+
+
+def test_simulate_stats(tmp_path: Path) -> None:
+    """Control.add_stats makes Simulate.stats available"""
+    control = spi.Control()
+    control.insert_lines(["tran 1u 1m"])
+    control.add_stats()
+    control.add_stats()  # only once
+    assert control.ending == ["rusage all", "quit", ".endc"]
+    netlist = spi.Netlist("* rc\nvin in 0 1\nr1 in out 1k\nc1 out 0 1u") + spi.Netlist(
+        str(control)
+    )
+    netlist.write_to_file(tmp_path / "top.cir")
+
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=100)
+    sim = spi.Simulate(exe, tmp_path / "top.cir", tmp_path / "t.log", "sim1")
+    sim.run()
+    assert sim.stats.accepted == 100
+    assert sim.stats.equations == 3  # in, out, vin#branch
+    assert sim.stats.timepoints == 100 + sim.stats.rejected
@@ -0,0 +1,76 @@
+"""supervisor.py unit test: outcomes, retries and batches with a fake ngspice"""
+
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+from py4spice.simulate import classify
+
+
+def supervisor(
+    tmp_path: Path, name: str, fault: str, timeout: int = 20
+) -> spi.Supervisor:
+    """supervisor of a tran simulation whose netlist has a "*fake:" line"""
+    tr1 = spi.Analyses(f"{name}_tr", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path)
+    control = spi.Control()
+    control.insert_lines(tr1.lines_for_cntl())
+    netlist_filename = tmp_path / f"{name}.cir"
+    netlist_filename.write_text(
+        f"* {name}\n{fault}\nvin in 0 1\nr1 in out 1k\nc1 out 0 1u\n{control}\n.end\n"
+    )
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=50)
+    sim = spi.Simulate(exe, netlist_filename, tmp_path / f"{name}.log", name, timeout)
+    return spi.Supervisor(sim, [tr1])
+
+
+def test_retry_until_converged(tmp_path: Path) -> None:
+    """nonconvergence is retried until an attempt sets gmin"""
+    sup = supervisor(tmp_path, "sim1", "*fake: nonconvergence gmin")
+    result = sup.run()
+    assert result.ok and result.attempts == 3
+    assert result.options["gmin"] == "1e-10"
+    assert sup.analyses[0].results_filename.exists()
+    transcript = (tmp_path / "sim1.log").read_text()
+    assert "Attempt 3: .options gmin=1e-10" in transcript
+    assert "Timestep too small" in transcript
+    assert not list(tmp_path.glob(".sim1_retry*"))  # retry netlists removed
+
+
+def test_classify_recovered_warnings() -> None:
+    """solver warnings of a run that recovered are not a failure"""
+    transcript = (
+        "Warning: singular matrix:  check node out\n"
+        "Warning: gmin stepping failed\n"
+        "Supplies reduced to   0.0000% Supplies reduced to  50.0000%\n"
+        "Note: source stepping completed\n"
+        "No. of Data Rows : 501\n"
+    )
+    assert classify(0, transcript) == ("ok", "")
+    outcome, message = classify(0, transcript, missing_results=True)
+    assert outcome == "nonconvergence" and "singular matrix" in message
+    aborted = transcript + "tran simulation(s) aborted\n"
+    assert classify(0, aborted)[0] == "nonconvergence"
+    assert classify(0, "", missing_results=True) == (
+        "error",
+        "no results",
+    )
+
+
+def test_batch_outcomes(tmp_path: Path) -> None:
+    """every kind of failure gets its outcome and the batch goes on"""
+    sups = [
+        supervisor(tmp_path, "good", ""),
+        supervisor(tmp_path, "stuck", "*fake: nonconvergence"),
+        supervisor(tmp_path, "crash", "*fake: crash"),
+        supervisor(tmp_path, "hang", "*fake: hang", timeout=1),
+    ]
+    # a stale result from an earlier run must not survive
+    stale = sups[1].analyses[0].results_filename
+    stale.write_text("time v(out)\n0 1\n")
+
+    results = spi.run_batch(sups)
+    assert [r.outcome for r in results] == ["ok", "nonconvergence", "error", "timeout"]
+    assert results[1].attempts == len(spi.supervisor.CONVERGENCE_LADDER)
+    assert not stale.exists()
+    assert "fake crash" in results[2].message
+    assert results[3].returncode is None
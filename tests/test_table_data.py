@@ -0,0 +1,52 @@
+"""table_data.py unit test: parsing, lookup and formatting of table results"""
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+from py4spice.table_data import eng_format
+
+TEXT = "v(out) = 2.5e+00\nvin#branch = -1.2e-03\n\ntransfer_function 4.7e3\n"
+
+
+def test_parse_and_lookup() -> None:
+    results = spi.SimResults("op", [], np.array([]), {})
+    results.data_table = spi.SimResults._table_processing(TEXT)
+    table = results.data_table
+    assert dict(table) == {
+        "v(out)": 2.5,
+        "vin#branch": -1.2e-3,
+        "transfer_function": 4.7e3,
+    }
+    assert table["vin#branch"] == pytest.approx(-1.2e-3)
+    assert "v(in)" not in table
+    assert np.isnan(table.lookup(["v(out)", "v(in)"])).tolist() == [False, True]
+    assert table.records["name"].tolist() == list(table)
+    assert spi.TableData.from_text("a = 1\na = 2\n")["a"] == 2.0  # like a dict
+
+
+def test_parse_other_layouts() -> None:
+    """lines that are not all "name = value": first word name, last value"""
+    assert dict(spi.TableData.from_text("v(1) 3\nv(2) 4\nv(3) 5\n")) == {
+        "v(1)": 3.0,
+        "v(2)": 4.0,
+        "v(3)": 5.0,
+    }
+    assert dict(spi.TableData.from_text("a b 3\nd = 1\n")) == {"a": 3.0, "d": 1.0}
+    # six words with "=" second and fifth, but not three per line
+    assert dict(spi.TableData.from_text("a = 1 2\n= 3\n")) == {"a": 2.0, "=": 3.0}
+
+
+def test_formatting() -> None:
+    values = np.array([0.0, -0.0, 1.5e-6, -2.3e3, 999.9999, 12.67])
+    assert eng_format(values).tolist() == [
+        "0.000",
+        "0.000",
+        "1.500\N{MICRO SIGN}",
+        "\N{MINUS SIGN}2.300k",
+        "1.000k",
+        "12.670",
+    ]
+    lines = spi.TableData.from_text(TEXT).table_for_print().splitlines()
+    assert lines[0] == "v(out)             2.500"
+    assert lines[1] == "vin#branch        \N{MINUS SIGN}1.200m"
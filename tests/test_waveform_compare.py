@@ -0,0 +1,62 @@
+"""waveform_compare.py unit test: envelopes, time shift, first violation"""
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+from py4spice.waveform_compare import WindowExtrema
+
+
+def test_window_extrema() -> None:
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0.0, 1.0, 500))
+    y = rng.normal(size=(500, 3))
+    low, high = WindowExtrema(x, 0.03)(y)
+    for i in range(0, 500, 37):
+        near = np.abs(x - x[i]) <= 0.03
+        assert np.array_equal(low[i], y[near].min(axis=0))
+        assert np.array_equal(high[i], y[near].max(axis=0))
+
+
+def test_compare_waveforms() -> None:
+    def pulse(time: np.ndarray, delay: float) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-np.clip((time - delay) / 1e-8, -50, 50)))
+
+    t_ref = np.linspace(0.0, 1e-6, 2001)
+    t_new = np.sort(np.concatenate((np.linspace(0.0, 1e-6, 777), [3.3e-7, 6.6e-7])))
+    header = ["time", "a", "b", "c"]
+    reference = spi.Waveforms(
+        header,
+        np.column_stack((t_ref, pulse(t_ref, 5e-7), pulse(t_ref, 5e-7), t_ref * 1e6)),
+        npts=None,
+    )
+    bump = np.where(np.abs(t_new - 8e-7) < 2e-9, 0.1, 0.0)
+    result = spi.Waveforms(
+        ["time", "c", "b", "a"],  # other column order, other timesteps
+        np.column_stack(
+            (t_new, t_new * 1e6 + bump, pulse(t_new, 5.04e-7), pulse(t_new, 5e-7))
+        ),
+        npts=None,
+    )
+
+    strict = spi.compare_waveforms(reference, result, atol=1e-3, rtol=1e-2)
+    assert strict.range_ok and not strict.passed
+    assert strict.checks["a"].passed
+    assert [check.name for check in strict.failures()] == ["b", "c"]
+    check_c = strict.checks["c"]
+    assert check_c.first_x == pytest.approx(8e-7, abs=3e-9)
+    assert check_c.value > check_c.high
+
+    shifted = spi.compare_waveforms(
+        reference, result, ["a", "b"], atol=1e-3, rtol=1e-2, time_shift=5e-9
+    )
+    assert shifted.passed and list(shifted.checks) == ["a", "b"]
+    assert "all signals within tolerance" in shifted.report()
+
+    short = spi.Waveforms(
+        ["time", "a"], reference.data[:1000, :2], npts=None
+    )  # first half only, no b or c
+    partial = spi.compare_waveforms(reference, short)
+    assert not partial.range_ok and partial.checks["a"].passed
+    assert str(partial.checks["b"]) == "b: missing"
+    assert partial.report().startswith("x-range")
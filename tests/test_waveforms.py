@@ -0,0 +1,80 @@
+"""waveforms.py unit test: float32 storage, views"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import py4spice as spi
+
+
+def test_float32_storage(tmp_path: Path) -> None:
+    time = np.linspace(1.0, 1.0 + 1e-6, 201)  # steps far below float32 resolution
+    out = np.sin(2 * np.pi * 1e6 * (time - 1.0))
+    results_file = tmp_path / "tr1.txt"
+    np.savetxt(
+        results_file, np.column_stack((time, out)), header="time out", comments=""
+    )
+
+    full = spi.SimResults.from_file("tran", results_file)
+    small = spi.SimResults.from_file("tran", results_file, dtype=np.float32)
+    assert full.x_axis is None and full.data_plot.dtype == np.float64
+    assert small.data_plot.dtype == np.float32
+    assert np.array_equal(small.x, time)  # the float32 column has lost it
+    assert np.unique(small.data_plot[:, 0]).size < time.size
+
+    waves = spi.Waveforms(small.header, small.data_plot, 101, x_axis=small.x_axis)
+    assert waves.data.dtype == np.float32 and waves.x.dtype == np.float64
+    reference = spi.Waveforms(full.header, full.data_plot, 101)
+    assert waves.single_column("out") == pytest.approx(
+        reference.single_column("out"), abs=1e-6
+    )
+
+    waves.x_range(1.0 + 2e-7, 1.0 + 4e-7, 50)
+    waves.scaler(2.0, "out", "out2")
+    waves.multiply("out", "out2", "prod")
+    assert waves.data.dtype == np.float32
+    assert waves.x_axis_and_sigs(["prod"])[0][0] == 1.0 + 2e-7
+    with pytest.raises(ValueError):
+        waves.x_range(0.0, 1.0)
+
+
+def test_views_share_data() -> None:
+    time = np.linspace(0.0, 1.0, 11)
+    data = np.column_stack((time, time, 2 * time, 3 * time))
+    waves = spi.Waveforms(["time", "a", "b", "c"], data, 11)
+
+    view = waves.window(0.2, 0.5).columns(["a", "c"])
+    assert view.header == ["time", "a", "c"] and view.npts == 4
+    assert view.x == pytest.approx([0.2, 0.3, 0.4, 0.5])
+    x_axis, c_col = view.x_axis_and_sigs(["c"])
+    assert np.shares_memory(c_col, waves.data)
+    assert np.shares_memory(waves.window(0.2, 0.5).data, waves.data)
+    assert c_col == pytest.approx(3 * x_axis)
+
+    narrower = view.window(0.3, 0.4)
+    assert narrower.single_column("a") == pytest.approx([0.3, 0.4])
+
+    copied = view.copy()
+    assert isinstance(copied, spi.Waveforms)
+    assert not np.shares_memory(copied.data, waves.data)
+    copied.data[:, 1] = 0.0
+    assert waves.single_column("a")[2] == pytest.approx(0.2)
+
+
+def test_native_and_adaptive() -> None:
+    """native timesteps are kept; adaptive keeps the edge, not the flat part"""
+    time = np.concatenate(
+        (np.linspace(0, 1e-3, 2001), np.linspace(1e-3, 1.01e-3, 401)[1:])
+    )
+    out = 1.0 - np.exp(-np.maximum(time - 1e-3, 0.0) / 1e-6)
+    data = np.column_stack((time, out))
+
+    native = spi.Waveforms(["time", "out"], data, npts=None)
+    assert np.array_equal(native.x, time)
+
+    reduced = spi.Waveforms(["time", "out"], data, npts=None, tolerance=1e-3)
+    assert reduced.npts < 100
+    assert (reduced.x > 1e-3).sum() > (reduced.x < 1e-3).sum()
+    error = np.interp(time, reduced.x, reduced.single_column("out")) - out
+    assert np.abs(error).max() <= 1e-3
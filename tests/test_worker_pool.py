@@ -0,0 +1,74 @@
+"""worker_pool.py unit test: persistent workers with a fake ngspice"""
+
+from pathlib import Path
+
+import py4spice as spi
+from py4spice.fake_ngspice import write_fake_ngspice
+
+
+def job(tmp_path: Path, name: str, fault: str = "") -> spi.WorkerJob:
+    """tran job of an rc circuit without a control block"""
+    netlist_filename = tmp_path / f"{name}.cir"
+    netlist_filename.write_text(f"* {name}\n{fault}\nvin in 0 1\nr1 in out 1k\n.end\n")
+    analysis = spi.Analyses(name, "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path)
+    return spi.WorkerJob(name, netlist_filename, [analysis], tmp_path / "t.log")
+
+
+def test_pool(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=30)
+    jobs = [job(tmp_path, f"j{i}") for i in range(6)]
+    jobs.insert(2, job(tmp_path, "crash", "*fake: crash"))
+    jobs.insert(4, job(tmp_path, "hang", "*fake: hang"))
+
+    with spi.WorkerPool(exe, workers=2, timeout=2) as pool:
+        results = pool.run(jobs)
+
+    outcomes = {r.name: r.outcome for r in results}
+    assert outcomes.pop("crash") == "error"
+    assert outcomes.pop("hang") == "timeout"
+    assert set(outcomes.values()) == {"ok"}
+    assert 1 <= pool.restarts <= 2  # restarted when it takes its next job
+
+    tr = spi.SimResults.from_file("tran", jobs[0].analyses[0].results_filename)
+    assert tr.data_plot.shape == (30, 2)
+
+
+def test_results_in_job_order(tmp_path: Path) -> None:
+    """a job that fails outside ngspice still gets its slot"""
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=10)
+    jobs = [job(tmp_path, f"j{i}") for i in range(3)]
+    jobs[1].transcript_filename = tmp_path / "missing" / "t.log"
+
+    with spi.WorkerPool(exe, workers=2) as pool:
+        results = pool.run(jobs)
+
+    assert [r.name for r in results] == ["j0", "j1", "j2"]
+    assert [r.outcome for r in results] == ["ok", "error", "ok"]
+    assert "No such file" in results[1].message
+
+
+def test_circuit_sourced_once_per_worker(tmp_path: Path) -> None:
+    """jobs on one circuit parse it once per worker, until an include changes"""
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=10)
+    models = tmp_path / "models.lib"
+    models.write_text("* models\n")
+    netlist_filename = tmp_path / "rc.cir"
+    netlist_filename.write_text("* rc\n.include models.lib\nvin in 0 1\nr1 in out 1k\n")
+    transcript = tmp_path / "t.log"
+
+    def rc_job(name: str) -> spi.WorkerJob:
+        analysis = spi.Analyses(
+            name, "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path
+        )
+        return spi.WorkerJob(name, netlist_filename, [analysis], transcript)
+
+    with spi.WorkerPool(exe, workers=2) as pool:
+        results = pool.run([rc_job(f"j{i}") for i in range(8)])
+        assert all(r.ok for r in results)
+        used = [w for w in pool.workers if w.jobs_done]
+        assert [w.sources for w in used] == [1] * len(used)
+        assert transcript.read_text().count("Circuit: * rc") == len(used)
+
+        models.write_text("* models, new version\n")
+        assert pool.run([rc_job("changed")])[0].ok
+        assert sum(w.sources for w in pool.workers) == len(used) + 1
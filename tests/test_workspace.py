@@ -0,0 +1,121 @@
+"""workspace.py unit test: concurrent runs with the same analysis names"""
+
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import py4spice as spi
+from py4spice import simulate
+from py4spice.fake_ngspice import write_fake_ngspice
+
+
+def test_concurrent_runs(tmp_path: Path) -> None:
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=40)
+    analyses = [spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path)]
+    workspaces = [spi.RunWorkspace(f"Run{r}", root=tmp_path) for r in ("1k", "2k")]
+
+    def run(work: spi.RunWorkspace, resistor: str) -> spi.SimResults:
+        rebased = work.rebase(analyses)
+        netlist = spi.Netlist(f"* {work.name}\nvin in 0 1\nr1 in out {resistor}")
+        netlist += spi.Netlist(str(work.control(analyses))) + spi.Netlist(".end")
+        work.simulate(exe, netlist).run()
+        return spi.SimResults.from_file("tran", rebased[0].results_filename)
+
+    with ThreadPoolExecutor(2) as pool:
+        first, second = pool.map(run, workspaces, ["1k", "2k"])
+    assert (first.data_plot != second.data_plot).any()
+
+    transcript = tmp_path / "transcript.log"
+    spi.merge_transcripts(workspaces, transcript)
+    text = transcript.read_text()
+    assert text.index("Simulation name: Run1k") < text.index("Simulation name: Run2k")
+
+    moved = workspaces[0].collect(analyses)
+    assert moved == [tmp_path / "tr1.txt"] and moved[0].exists()
+
+    for work in workspaces:
+        work.cleanup()
+        assert not work.path.exists()
+
+
+def test_piped(tmp_path: Path) -> None:
+    """netlist over stdin, results through named pipes: no files written"""
+    exe = write_fake_ngspice(tmp_path / "ngspice", points=40)
+    analyses = [
+        spi.Analyses("op1", "op", "op", spi.Vectors("all"), tmp_path),
+        spi.Analyses("tr1", "tran", "tran 1u 1m", spi.Vectors("out"), tmp_path),
+    ]
+    with spi.RunWorkspace("piped", root=tmp_path) as work:
+        netlist = spi.Netlist(
+            "* piped\n*fake: nonconvergence itl1\nvin in 0 1\nr1 in out 1k"
+        )
+        netlist += spi.Netlist(str(work.control(analyses))) + spi.Netlist(".end")
+        sim = work.simulate(exe, netlist, piped=True, analyses=analyses)
+        result = spi.Supervisor(sim, work.rebase(analyses)).run()
+
+        assert result.ok and result.attempts == 2  # itl1 set by the 2nd attempt
+        assert not work.netlist_filename.exists()
+        assert all(not path.is_file() for path in sim.results_pipes)
+        op1, tr1 = (sim.results(a) for a in work.rebase(analyses))
+        assert set(op1.data_table) == {"in", "out", "vin#branch"}
+        assert tr1.data_plot.shape == (40, 2)
+
+
+def test_piped_never_opened(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """ngspice exits, or never starts, before the readers get going: no hang"""
+    quits = tmp_path / "quits"
+    quits.write_text("#!/bin/sh\nexit 1\n")
+    quits.chmod(0o755)
+    analyses = [spi.Analyses("op1", "op", "op", spi.Vectors("all"), tmp_path)]
+    read_pipe = simulate._read_pipe
+
+    def late_read_pipe(*args: Any) -> None:
+        time.sleep(0.2)  # ngspice is gone before the reader starts
+        read_pipe(*args)
+
+    monkeypatch.setattr(simulate, "_read_pipe", late_read_pipe)
+    results: list[spi.RunResult] = []
+
+    def run() -> None:
+        for exe in (quits, tmp_path / "missing"):
+            with spi.RunWorkspace("never", root=tmp_path) as work:
+                netlist = spi.Netlist(str(work.control(analyses)))
+                sim = work.simulate(exe, netlist, piped=True, analyses=analyses)
+                results.append(sim.run())
+
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(timeout=30)
+    assert not runner.is_alive()
+    assert [result.ok for result in results] == [False, False]
+
+
+def test_uppercase_root(tmp_path: Path) -> None:
+    """a root that netlists would lowercase is rejected, and nothing is left"""
+    root = tmp_path / "Upper"
+    root.mkdir()
+    if Path(str(root).lower()).exists():  # case-insensitive file system
+        return
+    with pytest.raises(ValueError, match="uppercase"):
+        spi.RunWorkspace("run", root=root)
+    assert not any(root.iterdir())
+
+
+def test_uppercase_tmpdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """with the default root, an uppercase TMPDIR falls back to /tmp"""
+    tmpdir = tmp_path / "Build"
+    tmpdir.mkdir()
+    if Path(str(tmpdir).lower()).exists():  # case-insensitive file system
+        return
+    monkeypatch.setenv("TMPDIR", str(tmpdir))
+    monkeypatch.setattr(tempfile, "tempdir", None)  # re-read TMPDIR
+    with spi.RunWorkspace("Run1") as work:
+        assert str(work.path) == str(work.path).lower()
+        assert work.path.parent == Path("/tmp") / f"py4spice_{os.getuid()}"
+    assert not work.path.exists() and not any(tmpdir.iterdir())